@@ -0,0 +1,88 @@
+"""Benchmark of the package import time.
+
+Each module is imported in a fresh interpreter with the `-X importtime` option
+after Django has been set up, and only the modules loaded by the import itself are counted.
+Run from the repository root:
+
+    python benchmarks/import_time.py --repeat 5
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+DEFAULT_MODULES = (
+    'graphene_django_filter',
+    'graphene_django_filter.filterset',
+    'graphene_django_filter.connection_field',
+    'graphene_django_filter.filter_arguments_factory',
+    'graphene_django_filter.input_data_factories',
+)
+SETUP_CODE = """
+import django
+from django.conf import settings
+settings.configure(
+    INSTALLED_APPS=['django.contrib.contenttypes', 'django.contrib.auth'],
+    DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+)
+django.setup()
+"""
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+
+
+def measure(code: str) -> Dict[str, int]:
+    """Return self import times in microseconds of modules imported by the code."""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    times: Dict[str, int] = {}
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            times[match.group(4)] = int(match.group(1))
+    return times
+
+
+def measure_module(module: str) -> Tuple[int, int, List[Tuple[str, int]]]:
+    """Return total and own import times of a module and the most expensive dependencies."""
+    baseline = measure(SETUP_CODE)
+    times = {
+        name: value for name, value in measure(f'{SETUP_CODE}\nimport {module}\n').items()
+        if name not in baseline
+    }
+    own = sum(value for name, value in times.items() if name.startswith('graphene_django_filter'))
+    dependencies = sorted(
+        (
+            (name, value) for name, value in times.items()
+            if not name.startswith('graphene_django_filter')
+        ),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    return sum(times.values()), own, dependencies
+
+
+def main() -> None:
+    """Print the median import time of each module."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    parser.add_argument('--repeat', type=int, default=5, help='Number of measurements')
+    parser.add_argument('--top', type=int, default=5, help='Number of dependencies to show')
+    args = parser.parse_args()
+    for module in args.modules:
+        results = [measure_module(module) for _ in range(args.repeat)]
+        total = statistics.median(result[0] for result in results)
+        own = statistics.median(result[1] for result in results)
+        print(f'{module}: {total / 1000:.1f} ms total, {own / 1000:.1f} ms own')
+        for name, value in results[-1][2][:args.top]:
+            print(f'    {name}: {value / 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
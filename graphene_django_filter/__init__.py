@@ -2,5 +2,49 @@
 
 __version__ = '0.6.5'
 
-from .connection_field import AdvancedDjangoFilterConnectionField
-from .filterset import AdvancedFilterSet
+from importlib import import_module
+from typing import Any, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .connection_field import AdvancedDjangoFilterConnectionField
+    from .execution import ConcurrentExecutionContext
+    from .fields import HasResultsField, SearchRankField, TotalCountField, TotalCountLabelField
+    from .filterset import AdvancedFilterSet
+
+__all__ = [
+    'AdvancedDjangoFilterConnectionField',
+    'AdvancedFilterSet',
+    'ConcurrentExecutionContext',
+    'HasResultsField',
+    'SearchRankField',
+    'TotalCountField',
+    'TotalCountLabelField',
+]
+
+LAZY_IMPORTS = {
+    'AdvancedDjangoFilterConnectionField': '.connection_field',
+    'AdvancedFilterSet': '.filterset',
+    'ConcurrentExecutionContext': '.execution',
+    'HasResultsField': '.fields',
+    'SearchRankField': '.fields',
+    'TotalCountField': '.fields',
+    'TotalCountLabelField': '.fields',
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import a public class on first access.
+
+    The package is imported by Django at startup as an installed application,
+    so classes and their dependencies are loaded only when they are used.
+    """
+    if name not in LAZY_IMPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module(LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """Return module attributes including lazily imported classes."""
+    return sorted([*globals(), *LAZY_IMPORTS])
@@ -3,12 +3,43 @@
 from typing import Any, Dict, Optional, Union
 
 from django.conf import settings as django_settings
-from django.db import connection
-from django.test.signals import setting_changed
+from django.core.signals import setting_changed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+FIXED_SETTINGS_KEYS = ('IS_POSTGRESQL', 'HAS_TRIGRAM_EXTENSION')
+FIXED_SETTINGS: Dict[str, Dict[str, bool]] = {}
+DEFAULT_SETTINGS = {
+    'FILTER_KEY': 'filter',
+    'AND_KEY': 'and',
+    'OR_KEY': 'or',
+    'NOT_KEY': 'not',
+    'FAIL_FAST_VALIDATION': False,
+    'OPTIMIZE_FILTERS': True,
+    'EXISTS_SUBQUERIES': True,
+    'ALIAS_FILTER_ANNOTATIONS': False,
+    'MAX_FILTER_DEPTH': None,
+    'MAX_FILTER_NODES': None,
+    'MAX_FILTER_FAN_OUT': None,
+    'MAX_FILTER_LIST_LENGTH': None,
+    'MAX_SEARCH_QUERY_DEPTH': None,
+    'MAX_SEARCH_CLAUSES': None,
+    'MAX_CONCURRENT_CONNECTIONS': 4,
+    'PARALLEL_COUNT': False,
+    'PARALLEL_COUNT_SNAPSHOT': False,
+    'COUNT_STRATEGY': 'exact',
+    'LAZY_COUNT': False,
+    'COUNT_CACHE_ALIAS': 'default',
+    'COUNT_CACHE_TIMEOUT': 60,
+    'COUNT_CAP': 10000,
+    'TRIGRAM_SIMILARITY_THRESHOLD': None,
+    'TRIGRAM_WORD_SIMILARITY_THRESHOLD': None,
+}
+DJANGO_SETTINGS_KEY = 'GRAPHENE_DJANGO_FILTER'
 
 
-def get_fixed_settings() -> Dict[str, bool]:
-    """Return fixed settings."""
+def detect_fixed_settings(using: str) -> Dict[str, bool]:
+    """Detect fixed settings by inspecting the database with the `using` alias."""
+    connection = connections[using]
     is_postgresql = connection.vendor == 'postgresql'
     has_trigram_extension = False
     if is_postgresql:
@@ -21,14 +52,24 @@ def get_fixed_settings() -> Dict[str, bool]:
     }
 
 
-FIXED_SETTINGS = get_fixed_settings()
-DEFAULT_SETTINGS = {
-    'FILTER_KEY': 'filter',
-    'AND_KEY': 'and',
-    'OR_KEY': 'or',
-    'NOT_KEY': 'not',
-}
-DJANGO_SETTINGS_KEY = 'GRAPHENE_DJANGO_FILTER'
+def get_fixed_settings(using: Optional[str] = None) -> Dict[str, bool]:
+    """Return fixed settings for the database with the `using` alias.
+
+    The database is inspected the first time the settings are requested
+    and the result is cached until `refresh_fixed_settings` is called.
+    """
+    using = using or DEFAULT_DB_ALIAS
+    if using not in FIXED_SETTINGS:
+        FIXED_SETTINGS[using] = detect_fixed_settings(using)
+    return FIXED_SETTINGS[using]
+
+
+def refresh_fixed_settings(using: Optional[str] = None) -> None:
+    """Drop cached fixed settings for the `using` alias or for all aliases if it is not set."""
+    if using is None:
+        FIXED_SETTINGS.clear()
+    else:
+        FIXED_SETTINGS.pop(using, None)
 
 
 class Settings:
@@ -36,6 +77,8 @@ class Settings:
 
     Settings consist of fixed ones that depend on the user environment
     and others that can be set with Django settings.py module.
+    Fixed settings read as attributes describe the default database,
+    use `get_fixed_settings` to get them for another database alias.
     """
 
     def __init__(self, user_settings: Optional[dict] = None) -> None:
@@ -48,12 +91,12 @@ class Settings:
             self._user_settings = getattr(django_settings, DJANGO_SETTINGS_KEY, {})
         return self._user_settings
 
-    def __getattr__(self, name: str) -> Union[str, bool]:
+    def __getattr__(self, name: str) -> Union[str, bool, int, None]:
         """Return a setting value."""
-        if name not in FIXED_SETTINGS and name not in DEFAULT_SETTINGS:
+        if name not in FIXED_SETTINGS_KEYS and name not in DEFAULT_SETTINGS:
             raise AttributeError(f'Invalid Graphene setting: `{name}`')
-        if name in FIXED_SETTINGS:
-            return FIXED_SETTINGS[name]
+        if name in FIXED_SETTINGS_KEYS:
+            return get_fixed_settings()[name]
         elif name in self.user_settings:
             return self.user_settings[name]
         else:
@@ -65,9 +108,10 @@ settings = Settings(None)
 
 def reload_settings(setting: str, value: Any, **kwargs) -> None:
     """Reload settings in response to the `setting_changed` signal."""
-    global settings
     if setting == DJANGO_SETTINGS_KEY:
-        settings = Settings(value)
+        settings._user_settings = value
+    elif setting == 'DATABASES':
+        refresh_fixed_settings()
 
 
 setting_changed.connect(reload_settings)
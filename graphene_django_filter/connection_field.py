@@ -4,20 +4,42 @@ Use the `AdvancedDjangoFilterConnectionField` class from this
 module instead of the `DjangoFilterConnectionField` from graphene-django.
 """
 
+import asyncio
+import inspect
 import warnings
-from typing import Any, Callable, Dict, Iterable, Optional, Type, Union
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Type, Union
 
 import graphene
-from django.core.exceptions import ValidationError
+from asgiref.sync import sync_to_async
+from django.core.exceptions import SynchronousOnlyOperation, ValidationError
 from django.db import models
+from graphene.relay.connection import connection_adapter, page_info_adapter
 from graphene_django import DjangoObjectType
 from graphene_django.filter import DjangoFilterConnectionField
+from graphene_django.utils import maybe_queryset
+from graphql_relay import connection_from_array_slice, get_offset_with_default, offset_to_cursor
+from promise import Promise
 
 from .conf import settings
-from .filter_arguments_factory import FilterArgumentsFactory
+from .counting import COUNT_STRATEGIES, LazyCount, count_queryset, get_count_queryset
 from .filterset import AdvancedFilterSet
 from .filterset_factories import get_filterset_class
-from .input_data_factories import tree_input_type_to_data
+
+WINDOW_COUNT_NAME = 'window_total_count'
+
+
+class ForwardPage(NamedTuple):
+    """Slice of a queryset fetching a page requested with `first` without the count.
+
+    If `has_next_page` is not known before the page is fetched,
+    the slice has one more row than `first` to determine it.
+    """
+
+    queryset: models.QuerySet
+    after_offset: int
+    first: Optional[int]
+    has_next_page: Optional[bool]
 
 
 class AdvancedDjangoFilterConnectionField(DjangoFilterConnectionField):
@@ -31,6 +53,10 @@ class AdvancedDjangoFilterConnectionField(DjangoFilterConnectionField):
         extra_filter_meta: Optional[dict] = None,
         filterset_class: Optional[Type[AdvancedFilterSet]] = None,
         filter_input_type_prefix: Optional[str] = None,
+        max_query_cost: Optional[float] = None,
+        max_query_rows: Optional[float] = None,
+        keyset_pagination: bool = False,
+        count_strategy: Optional[str] = None,
         *args,
         **kwargs
     ) -> None:
@@ -47,6 +73,12 @@ class AdvancedDjangoFilterConnectionField(DjangoFilterConnectionField):
             self.provided_filterset_class, AdvancedFilterSet,
         ), 'Use the `AdvancedFilterSet` class with the `AdvancedDjangoFilterConnectionField`'
         self._filter_input_type_prefix = filter_input_type_prefix
+        self.max_query_cost = max_query_cost
+        self.max_query_rows = max_query_rows
+        self.keyset_pagination = keyset_pagination
+        assert count_strategy is None or count_strategy in COUNT_STRATEGIES, \
+            f'Invalid count strategy: `{count_strategy}`'
+        self.count_strategy = count_strategy
         if self._filter_input_type_prefix is None and self._provided_filterset_class:
             warnings.warn(
                 'The `filterset_class` argument without `filter_input_type_prefix` '
@@ -90,12 +122,364 @@ class AdvancedDjangoFilterConnectionField(DjangoFilterConnectionField):
     def filtering_args(self) -> dict:
         """Return filtering args from the filterset."""
         if not self._filtering_args:
+            from .filter_arguments_factory import FilterArgumentsFactory
             self._filtering_args = FilterArgumentsFactory(
                 self.filterset_class,
                 self.filter_input_type_prefix,
             ).arguments
         return self._filtering_args
 
+    @classmethod
+    def connection_resolver(
+        cls,
+        resolver: Callable,
+        connection: Type[graphene.Connection],
+        default_manager: models.Manager,
+        queryset_resolver: Callable,
+        max_limit: Optional[int],
+        enforce_first_or_last: bool,
+        root: Any,
+        info: graphene.ResolveInfo,
+        count_strategy: Optional[str] = None,
+        **args
+    ) -> Any:
+        """Resolve a connection asynchronously if it is resolved in an event loop."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            return cls.async_connection_resolver(
+                resolver,
+                connection,
+                default_manager,
+                queryset_resolver,
+                max_limit,
+                enforce_first_or_last,
+                root,
+                info,
+                count_strategy,
+                **args
+            )
+        cls.validate_pagination_args(info, args, max_limit, enforce_first_or_last)
+        iterable = resolver(root, info, **args)
+        if iterable is None:
+            iterable = default_manager
+        iterable = queryset_resolver(connection, iterable, info, args)
+        on_resolve = partial(
+            cls.resolve_connection,
+            connection,
+            args,
+            max_limit=max_limit,
+            count_strategy=count_strategy,
+        )
+        if Promise.is_thenable(iterable):
+            return Promise.resolve(iterable).then(on_resolve)
+        return on_resolve(iterable)
+
+    @classmethod
+    async def async_connection_resolver(
+        cls,
+        resolver: Callable,
+        connection: Type[graphene.Connection],
+        default_manager: models.Manager,
+        queryset_resolver: Callable,
+        max_limit: Optional[int],
+        enforce_first_or_last: bool,
+        root: Any,
+        info: graphene.ResolveInfo,
+        count_strategy: Optional[str] = None,
+        **args
+    ) -> graphene.Connection:
+        """Resolve a connection with the async ORM.
+
+        Filters are validated in the event loop. If the validation or the queryset building
+        needs the database, for example to clean model choices, it runs in a thread.
+        """
+        cls.validate_pagination_args(info, args, max_limit, enforce_first_or_last)
+        iterable = resolver(root, info, **args)
+        if inspect.isawaitable(iterable):
+            iterable = await iterable
+        if iterable is None:
+            iterable = default_manager
+        try:
+            iterable = queryset_resolver(connection, iterable, info, args)
+        except SynchronousOnlyOperation:
+            iterable = await sync_to_async(queryset_resolver)(connection, iterable, info, args)
+        if inspect.isawaitable(iterable):
+            iterable = await iterable
+        return await cls.async_resolve_connection(
+            connection,
+            args,
+            iterable,
+            max_limit,
+            count_strategy,
+        )
+
+    @staticmethod
+    def validate_pagination_args(
+        info: graphene.ResolveInfo,
+        args: Dict[str, Any],
+        max_limit: Optional[int],
+        enforce_first_or_last: bool,
+    ) -> None:
+        """Check pagination arguments as `DjangoConnectionField` does."""
+        first, last = args.get('first'), args.get('last')
+        if enforce_first_or_last:
+            assert first or last, (
+                'You must provide a `first` or `last` value '
+                f'to properly paginate the `{info.field_name}` connection.'
+            )
+        for name, value in (('first', first), ('last', last)):
+            if max_limit and value:
+                assert value <= max_limit, (
+                    f'Requesting {value} records on the `{info.field_name}` connection '
+                    f'exceeds the `{name}` limit of {max_limit} records.'
+                )
+        if args.get('offset') is not None:
+            assert args.get('before') is None, (
+                "You can't provide a `before` value at the same time as an `offset` value "
+                f'to properly paginate the `{info.field_name}` connection.'
+            )
+
+    @classmethod
+    async def async_resolve_connection(
+        cls,
+        connection: Type[graphene.Connection],
+        args: Dict[str, Any],
+        iterable: Iterable,
+        max_limit: Optional[int] = None,
+        count_strategy: Optional[str] = None,
+    ) -> graphene.Connection:
+        """Resolve a connection fetching the page with the async ORM.
+
+        Pages requested with `first` are fetched without the count, which is counted after them
+        or lazily if `LAZY_COUNT` is enabled.
+        Pages requested with `last` are counted exactly with the async ORM,
+        and connections with the `window` count strategy are resolved in a thread.
+        """
+        iterable = maybe_queryset(iterable)
+        if not isinstance(iterable, models.QuerySet):
+            return cls.resolve_connection(connection, args, iterable, max_limit)
+        count_strategy = count_strategy or settings.COUNT_STRATEGY
+        if args.get('last') is None and count_strategy != 'window':
+            cls.prepare_pagination_args(args, max_limit)
+            length = LazyCount(iterable, count_strategy)
+            if not settings.LAZY_COUNT:
+                length = await length.aget()
+            page = cls.get_forward_page(args, iterable)
+            items = [item async for item in page.queryset]
+            return cls.connection_from_forward_page(connection, iterable, page, items, length)
+        if count_strategy != 'exact':
+            return await sync_to_async(cls.resolve_connection)(
+                connection, args, iterable, max_limit, count_strategy,
+            )
+        cls.prepare_pagination_args(args, max_limit)
+        array_length = await get_count_queryset(iterable).acount()
+        slice_start = min(get_offset_with_default(args.get('after'), -1) + 1, array_length)
+        create_connection = partial(
+            connection_from_array_slice,
+            args=args,
+            slice_start=slice_start,
+            array_length=array_length,
+            array_slice_length=array_length - slice_start,
+            connection_type=partial(connection_adapter, connection),
+            edge_type=connection.Edge,
+            page_info_type=page_info_adapter,
+        )
+        page_slice = PageSlice()
+        create_connection(page_slice)
+        page_slice.items = [item async for item in iterable[slice_start:][page_slice.key]]
+        resolved_connection = create_connection(page_slice)
+        resolved_connection.iterable = iterable
+        resolved_connection.length = array_length
+        return resolved_connection
+
+    @classmethod
+    def resolve_connection(
+        cls,
+        connection: Type[graphene.Connection],
+        args: Dict[str, Any],
+        iterable: Iterable,
+        max_limit: Optional[int] = None,
+        count_strategy: Optional[str] = None,
+    ) -> graphene.Connection:
+        """Resolve a connection fetching the page without the count if it is not needed for it.
+
+        The exact count is fetched in parallel with the page if `PARALLEL_COUNT` is enabled.
+        The page can be fetched without the count only if it is sliced from the start,
+        so connections paginated with `last` are resolved serially and counted exactly.
+        """
+        from .execution import fetch_page_with_count, is_in_transaction
+        iterable = maybe_queryset(iterable)
+        if not isinstance(iterable, models.QuerySet) or args.get('last') is not None:
+            return super().resolve_connection(connection, args, iterable, max_limit)
+        count_strategy = count_strategy or settings.COUNT_STRATEGY
+        cls.prepare_pagination_args(args, max_limit)
+        if count_strategy == 'window' and not iterable.query.distinct:
+            return cls.resolve_window_counted_connection(connection, args, iterable)
+        if count_strategy != 'exact' or not settings.PARALLEL_COUNT or is_in_transaction():
+            return cls.resolve_forward_connection(connection, args, iterable, count_strategy)
+        after_offset = get_offset_with_default(args.get('after'), -1) + 1
+        first = args.get('first')
+        page_end = None if first is None else after_offset + first
+        array_length, items = fetch_page_with_count(
+            get_count_queryset(iterable),
+            iterable[after_offset:page_end],
+            settings.PARALLEL_COUNT_SNAPSHOT,
+        )
+        return cls.connection_from_page(
+            connection, args, iterable, items, after_offset, array_length,
+        )
+
+    @classmethod
+    def resolve_window_counted_connection(
+        cls,
+        connection: Type[graphene.Connection],
+        args: Dict[str, Any],
+        queryset: models.QuerySet,
+    ) -> graphene.Connection:
+        """Resolve a connection fetching the page and the count in one query.
+
+        Rows of the page are annotated with `COUNT(*) OVER ()`, which is computed
+        before `LIMIT` and `OFFSET`, so the count is read from the first row.
+        A page without rows, for example a page after the last one, is counted separately.
+        """
+        after_offset = get_offset_with_default(args.get('after'), -1) + 1
+        first = args.get('first')
+        page_end = None if first is None else after_offset + first
+        page = queryset.annotate(**{WINDOW_COUNT_NAME: models.Window(models.Count('*'))})
+        items = list(page[after_offset:page_end])
+        if items:
+            array_length = getattr(items[0], WINDOW_COUNT_NAME)
+        else:
+            array_length = count_queryset(queryset, 'exact')
+        return cls.connection_from_page(
+            connection, args, queryset, items, after_offset, array_length,
+        )
+
+    @staticmethod
+    def connection_from_page(
+        connection: Type[graphene.Connection],
+        args: Dict[str, Any],
+        iterable: models.QuerySet,
+        items: List[Any],
+        after_offset: int,
+        array_length: int,
+    ) -> graphene.Connection:
+        """Create a connection from a page fetched after the offset and the iterable length."""
+        slice_start = min(after_offset, array_length)
+        resolved_connection = connection_from_array_slice(
+            items,
+            args,
+            slice_start=slice_start,
+            array_length=array_length,
+            array_slice_length=array_length - slice_start,
+            connection_type=partial(connection_adapter, connection),
+            edge_type=connection.Edge,
+            page_info_type=page_info_adapter,
+        )
+        resolved_connection.iterable = iterable
+        resolved_connection.length = array_length
+        return resolved_connection
+
+    @classmethod
+    def resolve_forward_connection(
+        cls,
+        connection: Type[graphene.Connection],
+        args: Dict[str, Any],
+        queryset: models.QuerySet,
+        count_strategy: Optional[str] = None,
+    ) -> graphene.Connection:
+        """Resolve a connection paginated with `first` without the exact count.
+
+        The length is counted with the count strategy, on first access if `LAZY_COUNT` is enabled.
+        """
+        length = LazyCount(queryset, count_strategy)
+        if not settings.LAZY_COUNT:
+            length = length.get()
+        page = cls.get_forward_page(args, queryset)
+        return cls.connection_from_forward_page(
+            connection, queryset, page, list(page.queryset), length,
+        )
+
+    @staticmethod
+    def get_forward_page(args: Dict[str, Any], queryset: models.QuerySet) -> ForwardPage:
+        """Return the slice of a queryset fetching a page requested with `first`."""
+        after_offset = get_offset_with_default(args.get('after'), -1) + 1
+        before_offset = get_offset_with_default(args.get('before'), None)
+        first = args.get('first')
+        page_end = None if first is None else after_offset + first
+        if before_offset is not None:
+            has_next_page = page_end is not None and page_end < before_offset
+            if page_end is None or page_end > before_offset:
+                page_end = max(after_offset, before_offset)
+            return ForwardPage(queryset[after_offset:page_end], after_offset, None, has_next_page)
+        page_end = None if page_end is None else page_end + 1
+        return ForwardPage(queryset[after_offset:page_end], after_offset, first, None)
+
+    @staticmethod
+    def connection_from_forward_page(
+        connection: Type[graphene.Connection],
+        queryset: models.QuerySet,
+        page: ForwardPage,
+        items: List[Any],
+        length: Union[int, LazyCount],
+    ) -> graphene.Connection:
+        """Create a connection from a fetched page and the length of the queryset."""
+        has_next_page = page.has_next_page
+        if has_next_page is None:
+            has_next_page = page.first is not None and len(items) > page.first
+            items = items[:page.first]
+        edges = [
+            connection.Edge(node=item, cursor=offset_to_cursor(page.after_offset + i))
+            for i, item in enumerate(items)
+        ]
+        resolved_connection = connection_adapter(
+            connection,
+            edges,
+            page_info_adapter(
+                startCursor=edges[0].cursor if edges else None,
+                endCursor=edges[-1].cursor if edges else None,
+                hasPreviousPage=False,
+                hasNextPage=has_next_page,
+            ),
+        )
+        resolved_connection.iterable = queryset
+        resolved_connection.length = length
+        return resolved_connection
+
+    @staticmethod
+    def prepare_pagination_args(args: Dict[str, Any], max_limit: Optional[int]) -> None:
+        """Convert the offset to the `after` cursor and impose the maximum limit."""
+        offset = args.pop('offset', None)
+        if offset:
+            after = args.get('after')
+            if after:
+                offset += get_offset_with_default(after, -1) + 1
+            args['after'] = offset_to_cursor(offset - 1)
+        if max_limit is not None and args.get('first') is None and args.get('last') is None:
+            args['first'] = max_limit
+
+    def wrap_resolve(self, parent_resolver: Callable) -> Callable:
+        """Return a connection resolver with the count strategy of the field.
+
+        The resolver paginates with keyset cursors if it is enabled.
+        """
+        resolver = super().wrap_resolve(parent_resolver)
+        if self.keyset_pagination:
+            from .keyset import KeysetConnectionField
+            resolver = partial(KeysetConnectionField.connection_resolver, *resolver.args)
+        return partial(resolver, count_strategy=self.count_strategy)
+
+    def get_queryset_resolver(self) -> Callable:
+        """Return a queryset resolver with query cost thresholds."""
+        return partial(
+            super().get_queryset_resolver(),
+            max_query_cost=self.max_query_cost,
+            max_query_rows=self.max_query_rows,
+        )
+
     @classmethod
     def resolve_queryset(
         cls,
@@ -105,17 +489,44 @@ class AdvancedDjangoFilterConnectionField(DjangoFilterConnectionField):
         args: Dict[str, Any],
         filtering_args: Dict[str, graphene.InputField],
         filterset_class: Type[AdvancedFilterSet],
+        max_query_cost: Optional[float] = None,
+        max_query_rows: Optional[float] = None,
     ) -> models.QuerySet:
-        """Return a filtered QuerySet."""
+        """Return a filtered QuerySet.
+
+        If query cost thresholds are set, the QuerySet is checked with the planner estimate.
+        """
+        from .input_data_factories import tree_input_type_to_data
+        from .limits import check_filter_limits
+        from .query_cost import check_query_cost
+        filter_arg = args.get(settings.FILTER_KEY) or {}
+        check_filter_limits(filter_arg)
         qs = super(DjangoFilterConnectionField, cls).resolve_queryset(
             connection, iterable, info, args,
         )
-        filter_arg = args.get(settings.FILTER_KEY) or {}
         filterset = filterset_class(
             data=tree_input_type_to_data(filterset_class, filter_arg),
             queryset=qs,
             request=info.context,
         )
         if filterset.form.is_valid():
+            check_query_cost(filterset.qs, max_query_cost, max_query_rows)
             return filterset.qs
         raise ValidationError(filterset.form.errors.as_json())
+
+
+class PageSlice:
+    """Slice of a connection page fetched in advance.
+
+    The first connection building records the slice of the page,
+    and the second one gets the fetched items of the slice.
+    """
+
+    def __init__(self) -> None:
+        self.key: slice = slice(None)
+        self.items: List[Any] = []
+
+    def __getitem__(self, key: slice) -> List[Any]:
+        """Record the slice and return fetched items."""
+        self.key = key
+        return self.items
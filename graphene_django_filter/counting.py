@@ -0,0 +1,157 @@
+"""Counting strategies of filtered connections.
+
+An exact `COUNT(*)` reads all rows of a filtered queryset, and it is usually
+the most expensive query of a connection. Strategies trade its precision for cost:
+`estimate` reads the planner estimate, `cached` reuses an exact count of the same filter
+for a while, and `capped` stops counting after a number of rows.
+The `window` strategy keeps the exact count, but connections read it from the page query.
+"""
+
+import asyncio
+import hashlib
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.db import connections, models
+
+from .conf import settings
+
+COUNT_STRATEGIES = ('exact', 'window', 'estimate', 'cached', 'capped')
+CACHE_KEY_PREFIX = 'graphene_django_filter_count'
+
+
+def get_count_queryset(queryset: models.QuerySet) -> models.QuerySet:
+    """Return a queryset without ordering, related objects and annotations unused by the count.
+
+    Annotations are kept if they can change the number of rows,
+    that is if the queryset is distinct or grouped or if an annotation is an aggregate.
+    """
+    query = queryset.query
+    if query.low_mark or query.high_mark is not None:
+        return queryset
+    queryset = queryset.order_by().select_related(None).prefetch_related(None)
+    query = queryset.query
+    if not query.distinct and query.group_by is None and not any(
+        getattr(annotation, 'contains_aggregate', True) for annotation in query.annotations.values()
+    ):
+        query.annotations = {}
+        query.set_annotation_mask(None)
+    return queryset
+
+
+def count_queryset(queryset: models.QuerySet, strategy: Optional[str] = None) -> int:
+    """Count a queryset with a counting strategy, `COUNT_STRATEGY` by default.
+
+    The `window` strategy counts exactly if the count cannot be read from a page.
+    """
+    strategy = strategy or settings.COUNT_STRATEGY
+    assert strategy in COUNT_STRATEGIES, f'Invalid count strategy: `{strategy}`'
+    if queryset.query.is_empty():
+        return 0
+    queryset = get_count_queryset(queryset)
+    if strategy == 'estimate':
+        estimate = estimate_count(queryset)
+        if estimate is not None:
+            return estimate
+    elif strategy == 'cached':
+        return get_cached_count(queryset)
+    elif strategy == 'capped':
+        return get_capped_count(queryset)
+    return queryset.count()
+
+
+class LazyCount:
+    """Count of a queryset computed on first access.
+
+    Connections store it as their length if `LAZY_COUNT` is enabled, so they are not counted
+    unless a count field, such as `TotalCountField`, is requested.
+    It converts to `int`, so resolvers returning the length of a connection keep working
+    in synchronous execution.
+    """
+
+    def __init__(self, queryset: models.QuerySet, strategy: Optional[str] = None) -> None:
+        self.queryset = queryset
+        self.strategy = strategy
+        self.value: Optional[int] = None
+        self.future: Optional[asyncio.Future] = None
+
+    def get(self) -> int:
+        """Return the count, counting the queryset on the first call."""
+        if self.value is None:
+            self.value = count_queryset(self.queryset, self.strategy)
+        return self.value
+
+    def __int__(self) -> int:
+        """Return the count."""
+        return self.get()
+
+    def __index__(self) -> int:
+        """Return the count."""
+        return self.get()
+
+    async def aget(self) -> int:
+        """Return the count, counting the queryset in an event loop on the first call.
+
+        The exact count uses the async ORM, other strategies run in a thread.
+        Concurrent calls share one count.
+        """
+        if self.value is None:
+            if self.future is None:
+                if (self.strategy or settings.COUNT_STRATEGY) == 'exact':
+                    count = get_count_queryset(self.queryset).acount()
+                else:
+                    count = sync_to_async(count_queryset)(self.queryset, self.strategy)
+                self.future = asyncio.ensure_future(count)
+            self.value = await self.future
+        return self.value
+
+
+def estimate_count(queryset: models.QuerySet) -> Optional[int]:
+    """Return the planner estimate of the number of rows or None if it is not available.
+
+    The estimate of a queryset without conditions is read from `pg_class.reltuples`,
+    which is updated by `VACUUM` and `ANALYZE`, other querysets are estimated with `EXPLAIN`.
+    """
+    from .query_cost import estimate_query_cost
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    query = queryset.query
+    if not query.where and not query.distinct and len(query.alias_map) <= 1:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+        if row is not None and row[0] >= 0:
+            return int(row[0])
+    return int(estimate_query_cost(queryset).rows)
+
+
+def get_count_fingerprint(queryset: models.QuerySet) -> str:
+    """Return a key identifying the rows counted by a queryset.
+
+    The key is a hash of the SQL and parameters of the count queryset,
+    so it does not depend on the ordering and on the order in which annotations were added.
+    """
+    sql, params = get_count_queryset(queryset).query.sql_with_params()
+    digest = hashlib.sha256(f'{queryset.db}:{sql}:{params!r}'.encode('utf-8')).hexdigest()
+    return f'{CACHE_KEY_PREFIX}:{digest}'
+
+
+def get_cached_count(queryset: models.QuerySet) -> int:
+    """Return an exact count cached for `COUNT_CACHE_TIMEOUT` seconds."""
+    cache = caches[settings.COUNT_CACHE_ALIAS]
+    key = get_count_fingerprint(queryset)
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def get_capped_count(queryset: models.QuerySet) -> int:
+    """Count at most `COUNT_CAP` + 1 rows, so a greater result means more than `COUNT_CAP` rows."""
+    return queryset[:settings.COUNT_CAP + 1].count()
@@ -0,0 +1,177 @@
+"""Concurrent execution of sibling filtered connections.
+
+GraphQL executes fields of a selection set one after another in synchronous execution.
+The `ConcurrentExecutionContext` class resolves sibling `AdvancedDjangoFilterConnectionField`
+fields in a bounded thread pool, so the latency of a request with several filtered connections
+is close to the latency of the slowest one.
+Each worker thread uses its own database connection.
+Fields are resolved serially if the request runs in a transaction, for example with
+`ATOMIC_REQUESTS`, because other connections do not see its uncommitted changes,
+and in worker threads, so nested connections do not wait for workers of their own pool.
+
+The `fetch_page_with_count` function counts a connection queryset in a worker thread
+while its page is fetched, optionally within a snapshot shared by both PostgreSQL connections.
+"""
+
+import inspect
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from threading import Lock, local
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import close_old_connections, connections, models, transaction
+from graphql import FieldNode, GraphQLObjectType
+from graphql.execution import ExecutionContext
+from graphql.execution.execute import get_field_def
+from graphql.pyutils import Path, Undefined
+
+from .conf import settings
+from .connection_field import AdvancedDjangoFilterConnectionField
+
+EXECUTORS: Dict[Tuple[str, int], ThreadPoolExecutor] = {}
+EXECUTORS_LOCK = Lock()
+WORKER_STATE = local()
+
+
+def get_executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """Return a shared thread pool with the name and the maximum number of workers.
+
+    Tasks of different pools can wait for each other without a deadlock,
+    but a task must not wait for tasks of its own pool, because all workers can be waiting.
+    """
+    with EXECUTORS_LOCK:
+        if (name, max_workers) not in EXECUTORS:
+            EXECUTORS[(name, max_workers)] = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix=f'graphene_django_filter_{name}',
+            )
+        return EXECUTORS[(name, max_workers)]
+
+
+def is_in_transaction() -> bool:
+    """Determine whether a database connection of the current thread is in a transaction."""
+    return any(connection.in_atomic_block for connection in connections.all(initialized_only=True))
+
+
+def fetch_page_with_count(
+    queryset: models.QuerySet,
+    page: models.QuerySet,
+    snapshot: bool = False,
+) -> Tuple[int, List[Any]]:
+    """Count a queryset in a worker thread while its page is fetched in the current thread.
+
+    If `snapshot` is set and the database is PostgreSQL, the page is fetched in a repeatable read
+    transaction, and the count uses its exported snapshot, so both queries see the same rows.
+    """
+    executor = get_executor('counts', settings.MAX_CONCURRENT_CONNECTIONS)
+    connection = connections[queryset.db]
+    if not snapshot or connection.vendor != 'postgresql':
+        future = executor.submit(count_in_worker, queryset)
+        items = list(page)
+        return future.result(), items
+    with transaction.atomic(using=queryset.db):
+        with connection.cursor() as cursor:
+            cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+            cursor.execute('SELECT pg_export_snapshot()')
+            snapshot_id = cursor.fetchone()[0]
+        future = executor.submit(count_in_worker, queryset, snapshot_id)
+        try:
+            items = list(page)
+        finally:
+            wait([future])
+    return future.result(), items
+
+
+def count_in_worker(queryset: models.QuerySet, snapshot_id: Optional[str] = None) -> int:
+    """Count a queryset in a worker thread, importing the snapshot if it is provided."""
+    close_old_connections()
+    try:
+        if snapshot_id is None:
+            return queryset.count()
+        with transaction.atomic(using=queryset.db):
+            with connections[queryset.db].cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+                cursor.execute('SET TRANSACTION SNAPSHOT %s', [snapshot_id])
+            return queryset.count()
+    finally:
+        close_old_connections()
+
+
+class ConcurrentExecutionContext(ExecutionContext):
+    """Execution context resolving sibling filtered connections concurrently.
+
+    The number of worker threads is set with the `MAX_CONCURRENT_CONNECTIONS` setting.
+    The context is intended for synchronous execution.
+    """
+
+    def is_filtered_connection(self, parent_type: GraphQLObjectType, field_node: FieldNode) -> bool:
+        """Determine whether a field is resolved by `AdvancedDjangoFilterConnectionField`."""
+        field_def = get_field_def(self.schema, parent_type, field_node)
+        func = getattr(field_def and field_def.resolve, 'func', None)
+        return inspect.ismethod(func) and isinstance(func.__self__, type) and \
+            issubclass(func.__self__, AdvancedDjangoFilterConnectionField)
+
+    def execute_fields(
+        self,
+        parent_type: GraphQLObjectType,
+        source_value: Any,
+        path: Optional[Path],
+        fields: Dict[str, List[FieldNode]],
+    ) -> Any:
+        """Execute fields resolving filtered connections in worker threads."""
+        concurrent_names = [
+            response_name for response_name, field_nodes in fields.items()
+            if self.is_filtered_connection(parent_type, field_nodes[0])
+        ]
+        if len(concurrent_names) < 2 or is_in_transaction() or \
+                getattr(WORKER_STATE, 'in_worker', False):
+            return super().execute_fields(parent_type, source_value, path, fields)
+        executor = get_executor('connections', settings.MAX_CONCURRENT_CONNECTIONS)
+        futures: Dict[str, Future] = {
+            response_name: executor.submit(
+                self.execute_field_in_worker,
+                parent_type,
+                source_value,
+                fields[response_name],
+                Path(path, response_name, parent_type.name),
+            )
+            for response_name in concurrent_names
+        }
+        results = {}
+        for response_name, field_nodes in fields.items():
+            if response_name in futures:
+                continue
+            result = self.execute_field(
+                parent_type,
+                source_value,
+                field_nodes,
+                Path(path, response_name, parent_type.name),
+            )
+            if result is not Undefined:
+                results[response_name] = result
+        for response_name, future in futures.items():
+            result = future.result()
+            if result is not Undefined:
+                results[response_name] = result
+        return {
+            response_name: results[response_name]
+            for response_name in fields if response_name in results
+        }
+
+    def execute_field_in_worker(
+        self,
+        parent_type: GraphQLObjectType,
+        source: Any,
+        field_nodes: List[FieldNode],
+        path: Path,
+    ) -> Any:
+        """Execute a field in a worker thread closing expired database connections.
+
+        Nested fields of the field are resolved serially in the worker thread.
+        """
+        close_old_connections()
+        WORKER_STATE.in_worker = True
+        try:
+            return self.execute_field(parent_type, source, field_nodes, path)
+        finally:
+            WORKER_STATE.in_worker = False
+            close_old_connections()
@@ -0,0 +1,94 @@
+"""Expressions of PostgreSQL operators used by filters."""
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.contrib.postgres.search import TrigramWordDistance, TrigramWordSimilarity
+from django.db import models
+
+__all__ = [
+    'RowComparison',
+    'TrigramMatch',
+    'TrigramNearestDistance',
+    'TrigramOperator',
+    'TrigramWordDistance',
+    'TrigramWordSimilarity',
+]
+
+
+class TrigramOperator(models.Func):
+    """Operator of the `pg_trgm` extension with an expression on the left and a string on the right.
+
+    Trigram indexes can serve an operator only if the indexed expression is on the left.
+    Operators omitted and passed explicitly produce equal expressions.
+    """
+
+    function = ''
+    operators: Tuple[str, ...] = ()
+
+    def __init__(self, expression: Any, string: str, operator: Optional[str] = None) -> None:
+        operator = operator or self.operators[0]
+        if operator not in self.operators:
+            raise ValueError(f'Invalid trigram operator: `{operator}`')
+        self.operator = operator
+        self._constructor_args = ((expression, string, operator), {})
+        super().__init__(
+            expression,
+            models.Value(string),
+            arg_joiner=f" {operator.replace('%', '%%')} ",
+        )
+
+
+class TrigramMatch(TrigramOperator):
+    """Operator comparing similarity of trigram with a threshold.
+
+    Operators `%` and `%>` are true if similarity or word similarity of an expression
+    and a string is not less than `pg_trgm.similarity_threshold`
+    or `pg_trgm.word_similarity_threshold`, and GIN and GiST trigram indexes can serve them.
+    """
+
+    output_field = models.BooleanField()
+    operators = ('%', '%>')
+
+
+class TrigramNearestDistance(TrigramOperator):
+    """Operator returning distance or word distance of trigram between an expression and a string.
+
+    Operators `<->` and `<->>` in the `ORDER BY` clause with `LIMIT`
+    are served by a GiST trigram index as a nearest neighbor scan.
+    """
+
+    output_field = models.FloatField()
+    operators = ('<->', '<->>')
+
+
+class RowComparison(models.Func):
+    """Comparison of row values, such as `(a, b) > (1, 2)`.
+
+    Rows are compared lexicographically, and a multicolumn B-tree index
+    with the same column order serves the comparison as a range scan.
+    """
+
+    output_field = models.BooleanField()
+    operators = ('<', '>')
+
+    def __init__(self, lhs: Sequence[Any], operator: str, rhs: Sequence[Any]) -> None:
+        if operator not in self.operators:
+            raise ValueError(f'Invalid row comparison operator: `{operator}`')
+        if len(lhs) != len(rhs):
+            raise ValueError('Compared rows must have the same length.')
+        self.operator = operator
+        self.size = len(lhs)
+        rhs = [
+            value if hasattr(value, 'resolve_expression') else models.Value(value) for value in rhs
+        ]
+        super().__init__(*lhs, *rhs)
+
+    def as_sql(self, compiler: Any, connection: Any, **extra_context) -> Tuple[str, List[Any]]:
+        """Return SQL comparing rows."""
+        sqls, params = [], []
+        for expression in self.get_source_expressions():
+            sql, expression_params = compiler.compile(expression)
+            sqls.append(sql)
+            params.extend(expression_params)
+        lhs, rhs = ', '.join(sqls[:self.size]), ', '.join(sqls[self.size:])
+        return f'({lhs}) {self.operator} ({rhs})', params
@@ -0,0 +1,133 @@
+"""Fields of object types and connections returning values computed by filters."""
+
+import asyncio
+import inspect
+from typing import Any, Awaitable, Optional, Union
+
+import graphene
+from django.db import models
+from graphene_django.utils import maybe_queryset
+
+from .conf import settings
+from .counting import LazyCount
+from .filters import SearchRankFilter
+
+
+def is_in_event_loop() -> bool:
+    """Return whether the field is resolved in an event loop, so it must not block."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def get_connection_length(connection: graphene.Connection) -> Union[int, Awaitable[int]]:
+    """Return the length of a connection counting it on first access if it is lazy.
+
+    A lazy length is counted with the async ORM in an event loop, so an awaitable is returned.
+    """
+    length = connection.length
+    if not isinstance(length, LazyCount):
+        return length
+    return length.aget() if is_in_event_loop() else length.get()
+
+
+class SearchRankField(graphene.Field):
+    """Rank of an object in a connection ordered by a search rank.
+
+    The rank is read from the annotation used for ordering, so it is not computed again.
+    The field returns null if the connection is not ordered by a search rank.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        kwargs.setdefault('description', 'Search rank of the object')
+        super().__init__(graphene.Float, resolver=self.resolve_search_rank, **kwargs)
+
+    @staticmethod
+    def resolve_search_rank(root: Any, info: graphene.ResolveInfo) -> Optional[float]:
+        """Return the search rank annotated by the `SearchRankFilter` class."""
+        return getattr(root, SearchRankFilter.rank_attname, None)
+
+
+class TotalCountField(graphene.Field):
+    """Number of objects in a filtered connection.
+
+    The number is counted with the count strategy of the connection field,
+    so it can be an estimate or a capped count.
+    Connections resolved from querysets are counted only if the field is requested.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        kwargs.setdefault('description', 'Number of objects in the connection')
+        super().__init__(graphene.Int, resolver=self.resolve_total_count, **kwargs)
+
+    @staticmethod
+    def resolve_total_count(
+        root: graphene.Connection,
+        info: graphene.ResolveInfo,
+    ) -> Union[int, Awaitable[int]]:
+        """Return the length of the connection."""
+        return get_connection_length(root)
+
+
+class TotalCountLabelField(graphene.Field):
+    """Number of objects in a filtered connection as a label, such as `10000+`.
+
+    Counts greater than `COUNT_CAP` are shown as the cap with a plus sign,
+    which is intended for connection fields with the `capped` count strategy.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        kwargs.setdefault('description', 'Label of the number of objects in the connection')
+        super().__init__(graphene.String, resolver=self.resolve_total_count_label, **kwargs)
+
+    @classmethod
+    def resolve_total_count_label(
+        cls,
+        root: graphene.Connection,
+        info: graphene.ResolveInfo,
+    ) -> Union[str, Awaitable[str]]:
+        """Return the length of the connection as a label."""
+        length = get_connection_length(root)
+        if inspect.isawaitable(length):
+            return cls.async_get_label(length)
+        return cls.get_label(length)
+
+    @classmethod
+    async def async_get_label(cls, length: Awaitable[int]) -> str:
+        """Return an awaited length as a label."""
+        return cls.get_label(await length)
+
+    @staticmethod
+    def get_label(length: int) -> str:
+        """Return a length as a label."""
+        if length > settings.COUNT_CAP:
+            return f'{settings.COUNT_CAP}+'
+        return str(length)
+
+
+class HasResultsField(graphene.Field):
+    """Whether a filtered connection has objects.
+
+    The field is resolved without a query if the page has edges,
+    otherwise the filtered queryset is checked with `EXISTS`,
+    which stops at the first matching row, with the async ORM in an event loop.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        kwargs.setdefault('description', 'Whether the connection has objects')
+        super().__init__(graphene.Boolean, resolver=self.resolve_has_results, **kwargs)
+
+    @staticmethod
+    def resolve_has_results(
+        root: graphene.Connection,
+        info: graphene.ResolveInfo,
+    ) -> Union[bool, Awaitable[bool]]:
+        """Return whether the page has edges or the iterable of the connection has objects."""
+        if root.edges:
+            return True
+        iterable = maybe_queryset(root.iterable)
+        if isinstance(iterable, models.QuerySet):
+            return iterable.aexists() if is_in_event_loop() else iterable.exists()
+        return bool(iterable)
@@ -0,0 +1,118 @@
+"""Form-free validation of filter trees.
+
+Tree-like forms create a Django form for each node of a filter tree.
+The classes of this module clean values with form fields of a form class directly
+and produce nodes that can be used instead of tree-like forms for filtering.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from django.core.exceptions import ValidationError
+from django.forms import Form, MultiWidget
+from django.forms.utils import ErrorDict, ErrorList
+
+
+class FilterTree:
+    """Validated node of a filter tree.
+
+    It provides the part of the tree-like form interface used for filtering.
+    """
+
+    is_bound = True
+
+    def __init__(
+        self,
+        data: Dict[str, Any],
+        cleaned_data: Dict[str, Any],
+        errors: ErrorDict,
+        and_forms: List['FilterTree'],
+        or_forms: List['FilterTree'],
+        not_form: Optional['FilterTree'],
+    ) -> None:
+        self.data = data
+        self.cleaned_data = cleaned_data
+        self.errors = errors
+        self.and_forms = and_forms
+        self.or_forms = or_forms
+        self.not_form = not_form
+
+    def is_valid(self) -> bool:
+        """Return True if the tree has no errors, or False otherwise."""
+        return not self.errors
+
+
+class FilterTreeValidator:
+    """Validator of filter trees that cleans leaf values with form fields in one walk.
+
+    Errors have the same structure as errors of tree-like forms.
+    In the fail-fast mode the validation stops at the first error.
+    """
+
+    tree_keys = ('and', 'or', 'not')
+
+    def __init__(self, form_class: Type[Form], fail_fast: bool = False) -> None:
+        self.fields = form_class.base_fields
+        self.field_positions = {name: i for i, name in enumerate(self.fields)}
+        self.always_cleaned_fields = [
+            name for name, field in self.fields.items()
+            if field.required or field.disabled or isinstance(field.widget, MultiWidget)
+        ]
+        self.fail_fast = fail_fast
+        self.failed = False
+
+    def validate(self, data: Dict[str, Any]) -> FilterTree:
+        """Validate filter tree data."""
+        self.failed = False
+        return self.validate_node(data)
+
+    def validate_node(self, data: Dict[str, Any]) -> FilterTree:
+        """Validate data of a filter tree node and its subtrees."""
+        field_data = {k: v for k, v in data.items() if k not in self.tree_keys}
+        cleaned_data, errors = self.clean_fields(field_data)
+        and_trees = self.validate_nodes(data.get('and', []))
+        or_trees = self.validate_nodes(data.get('or', []))
+        if data.get('not') and not self.failed:
+            not_tree = self.validate_node(data['not'])
+        else:
+            not_tree = None
+        for key, trees in (('and', and_trees), ('or', or_trees)):
+            tree_errors = ErrorDict(
+                (f'{key}_{i}', tree.errors) for i, tree in enumerate(trees) if tree.errors
+            )
+            if len(tree_errors):
+                errors[key] = tree_errors
+        if not_tree and not_tree.errors:
+            errors['not'] = not_tree.errors
+        return FilterTree(field_data, cleaned_data, errors, and_trees, or_trees, not_tree)
+
+    def validate_nodes(self, nodes_data: List[Dict[str, Any]]) -> List[FilterTree]:
+        """Validate data of filter tree nodes until the validation fails in the fail-fast mode."""
+        trees: List[FilterTree] = []
+        for node_data in nodes_data:
+            if self.failed:
+                break
+            trees.append(self.validate_node(node_data))
+        return trees
+
+    def clean_fields(self, field_data: Dict[str, Any]) -> Tuple[Dict[str, Any], ErrorDict]:
+        """Clean values of provided and always cleaned fields in the form fields order."""
+        names = {name for name in field_data if name in self.fields}
+        names.update(self.always_cleaned_fields)
+        cleaned_data: Dict[str, Any] = {}
+        errors = ErrorDict()
+        if self.failed:
+            return cleaned_data, errors
+        for name in sorted(names, key=self.field_positions.__getitem__):
+            field = self.fields[name]
+            if field.disabled:
+                value = field.initial() if callable(field.initial) else field.initial
+            else:
+                value = field.widget.value_from_datadict(field_data, {}, name)
+            try:
+                cleaned_data[name] = field.clean(value)
+            except ValidationError as e:
+                errors[name] = ErrorList(e.error_list)
+                if self.fail_fast:
+                    self.failed = True
+                    break
+        return cleaned_data, errors
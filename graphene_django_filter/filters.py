@@ -1,19 +1,30 @@
 """Additional filters for special lookups."""
 
-from typing import Any, Callable, NamedTuple, Optional, Union
-
-from django.contrib.postgres.search import (
-    SearchQuery,
-    SearchRank,
-    SearchVector,
-    TrigramDistance,
-    TrigramSimilarity,
-)
+from typing import Any, Callable, NamedTuple, Optional, Set, TYPE_CHECKING, Union
+
 from django.db import models
 from django.db.models.constants import LOOKUP_SEP
 from django_filters import Filter
 from django_filters.constants import EMPTY_VALUES
 
+from .conf import settings
+
+if TYPE_CHECKING:
+    from django.contrib.postgres.search import (
+        SearchQuery,
+        SearchRank,
+        SearchVector,
+        TrigramDistance,
+        TrigramSimilarity,
+    )
+
+    from .expressions import (
+        TrigramMatch,
+        TrigramNearestDistance,
+        TrigramWordDistance,
+        TrigramWordSimilarity,
+    )
+
 
 class AnnotatedFilter(Filter):
     """Filter with a QuerySet object annotation."""
@@ -44,12 +55,36 @@ class AnnotatedFilter(Filter):
             exclude=exclude,
             **kwargs
         )
-        self.filter_counter = 0
 
-    @property
-    def annotation_name(self) -> str:
-        """Return the name used for the annotation."""
-        return f'{self.field_name}_{self.postfix}_{self.creation_counter}_{self.filter_counter}'
+    def get_annotation_name(self, qs: models.QuerySet) -> str:
+        """Return the first name of the form `<field_name>_<postfix>_<n>` not used by a QuerySet.
+
+        Names depend only on the QuerySet, so identical requests produce identical SQL.
+        """
+        used_names = self.get_used_names(qs)
+        n = 0
+        while f'{self.field_name}_{self.postfix}_{n}' in used_names:
+            n += 1
+        return f'{self.field_name}_{self.postfix}_{n}'
+
+    @staticmethod
+    def get_used_names(qs: models.QuerySet) -> Set[str]:
+        """Return names of annotations and model fields that an annotation cannot have."""
+        used_names = set(qs.query.annotations)
+        for field in qs.model._meta.get_fields():
+            used_names.add(field.name)
+            used_names.add(getattr(field, 'attname', field.name))
+        return used_names
+
+    def annotate(self, qs: models.QuerySet, **annotations) -> models.QuerySet:
+        """Add annotations used only by predicates.
+
+        If `ALIAS_FILTER_ANNOTATIONS` is enabled, they are added as aliases,
+        so their expressions are written in the `WHERE` clause without being selected.
+        """
+        if settings.ALIAS_FILTER_ANNOTATIONS:
+            return qs.alias(**annotations)
+        return qs.annotate(**annotations)
 
     def filter(self, qs: models.QuerySet, value: Value) -> models.QuerySet:
         """Filter a QuerySet using annotation."""
@@ -57,9 +92,8 @@ class AnnotatedFilter(Filter):
             return qs
         if self.distinct:
             qs = qs.distinct()
-        annotation_name = self.annotation_name
-        self.filter_counter += 1
-        qs = qs.annotate(**{annotation_name: value.annotation_value})
+        annotation_name = self.get_annotation_name(qs)
+        qs = self.annotate(qs, **{annotation_name: value.annotation_value})
         lookup = f'{annotation_name}{LOOKUP_SEP}{self.lookup_expr}'
         return self.get_method(qs)(**{lookup: value.search_value})
 
@@ -68,8 +102,8 @@ class SearchQueryFilter(AnnotatedFilter):
     """Full text search filter using the `SearchVector` and `SearchQuery` object."""
 
     class Value(NamedTuple):
-        annotation_value: SearchVector
-        search_value: SearchQuery
+        annotation_value: Union['SearchVector', models.F]
+        search_value: 'SearchQuery'
 
     postfix = 'search_query'
     available_lookups = ('exact',)
@@ -80,30 +114,99 @@ class SearchQueryFilter(AnnotatedFilter):
 
 
 class SearchRankFilter(AnnotatedFilter):
-    """Full text search filter using the `SearchRank` object."""
+    """Full text search filter using the `SearchRank` object.
+
+    The `order` lookup orders a QuerySet by the rank in descending order instead of filtering it.
+    It goes first, so other lookups of the same search rank refer to its annotation.
+    """
 
     class Value(NamedTuple):
-        annotation_value: SearchRank
-        search_value: float
+        annotation_value: 'SearchRank'
+        search_value: Union[float, bool]
 
     postfix = 'search_rank'
-    available_lookups = ('exact', 'gt', 'gte', 'lt', 'lte')
+    order_lookup = 'order'
+    rank_attname = 'search_rank'
+    available_lookups = (order_lookup, 'exact', 'gt', 'gte', 'lt', 'lte')
 
     def filter(self, qs: models.QuerySet, value: Value) -> models.QuerySet:
         """Filter a QuerySet using the `SearchRank` object."""
+        if self.lookup_expr == self.order_lookup:
+            return self.order(qs, value)
         return super().filter(qs, value)
 
+    def order(self, qs: models.QuerySet, value: Value) -> models.QuerySet:
+        """Order a QuerySet by the rank in descending order.
+
+        The rank is annotated with the `rank_attname` name unless an annotation or a field uses it,
+        so objects of the QuerySet have the value that `SearchRankField` returns.
+        If a query collector reuses an equal annotation, the rank refers to it.
+        The primary key breaks ties, so pages of equally ranked rows are stable.
+        """
+        if value in EMPTY_VALUES or not value.search_value:
+            return qs
+        if self.distinct:
+            qs = qs.distinct()
+        annotation_name = self.rank_attname
+        if annotation_name in self.get_used_names(qs):
+            annotation_name = self.get_annotation_name(qs)
+        qs = qs.annotate(**{annotation_name: value.annotation_value})
+        if annotation_name not in qs.query.annotations:
+            existing_name = qs.annotation_aliases[annotation_name]
+            qs = qs.annotate(**{annotation_name: models.F(existing_name)})
+        return qs.order_by(f'-{annotation_name}', 'pk')
+
 
 class TrigramFilter(AnnotatedFilter):
-    """Full text search filter using similarity or distance of trigram."""
+    """Full text search filter using similarity or distance of trigram.
+
+    If the threshold of the `pg_trgm` operator is set in settings
+    and the lookup implies that similarity is not less than it, the operator is added to the filter,
+    so a trigram index selects rows and the exact similarity is computed only for them.
+    The `nearest` lookup orders a QuerySet by the distance operator instead of filtering it.
+    """
 
     class Value(NamedTuple):
-        annotation_value: Union[TrigramSimilarity, TrigramDistance]
-        search_value: float
+        annotation_value: Union[
+            'TrigramSimilarity',
+            'TrigramDistance',
+            'TrigramWordSimilarity',
+            'TrigramWordDistance',
+            'TrigramNearestDistance',
+        ]
+        search_value: Union[float, bool]
+        match_value: Optional['TrigramMatch'] = None
 
     postfix = 'trigram'
-    available_lookups = ('exact', 'gt', 'gte', 'lt', 'lte')
+    nearest_lookup = 'nearest'
+    available_lookups = ('exact', 'gt', 'gte', 'lt', 'lte', nearest_lookup)
 
     def filter(self, qs: models.QuerySet, value: Value) -> models.QuerySet:
         """Filter a QuerySet using similarity or distance of trigram."""
-        return super().filter(qs, value)
+        if self.lookup_expr == self.nearest_lookup:
+            return self.order(qs, value)
+        if value in EMPTY_VALUES or value.match_value is None:
+            return super().filter(qs, value)
+        if self.distinct:
+            qs = qs.distinct()
+        annotation_name = self.get_annotation_name(qs)
+        match_name = f'{annotation_name}_match'
+        qs = self.annotate(qs, **{
+            annotation_name: value.annotation_value,
+            match_name: value.match_value,
+        })
+        return self.get_method(qs)(**{
+            match_name: True,
+            f'{annotation_name}{LOOKUP_SEP}{self.lookup_expr}': value.search_value,
+        })
+
+    def order(self, qs: models.QuerySet, value: Value) -> models.QuerySet:
+        """Order a QuerySet from the nearest by distance of trigram.
+
+        The primary key breaks ties, so pages of equally distant rows are stable.
+        """
+        if value in EMPTY_VALUES or not value.search_value:
+            return qs
+        if self.distinct:
+            qs = qs.distinct()
+        return qs.order_by(value.annotation_value.asc(), 'pk')
@@ -3,74 +3,177 @@
 Use the `AdvancedFilterSet` class from this module instead of the `FilterSet` from django-filter.
 """
 
+import copy
+import inspect
 import warnings
 from collections import OrderedDict
-from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type, Union, cast
-
-from django.db import connection, models
+from contextlib import suppress
+from functools import cached_property
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
+
+from django.db import connections, models, router
 from django.db.models.constants import LOOKUP_SEP
 from django.forms import Form
 from django.forms.utils import ErrorDict
 from django_filters import Filter
 from django_filters.conf import settings as django_settings
+from django_filters.filters import QuerySetRequestMixin
 from django_filters.filterset import BaseFilterSet, FilterSetMetaclass
-from wrapt import ObjectProxy
 
-from .conf import settings
+from .conf import get_fixed_settings, settings
+from .filter_tree import FilterTree, FilterTreeValidator
+from .query_optimizer import optimize_q
+from .subqueries import has_multivalued_joins, use_exists_subqueries
+
+SearchVectorKey = Tuple[Tuple[str, ...], Optional[str], Optional[str]]
+
 
+def __getattr__(name: str) -> Any:
+    """Import the `QuerySetProxy` class on first access, because it depends on wrapt."""
+    if name == 'QuerySetProxy':
+        from .queryset_proxy import QuerySetProxy
+        return QuerySetProxy
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
-class QuerySetProxy(ObjectProxy):
-    """Proxy for a QuerySet object.
 
-    The Django-filter library works with QuerySet objects,
-    but such objects do not provide the ability to apply the negation operator to the entire object.
-    Therefore, it is convenient to work with the Q object instead of the QuerySet.
-    This class replaces the original QuerySet object,
-    and creates a Q object when calling the `filter` and `exclude` methods.
+class QueryCollector:
+    """Collector of predicates written by filters.
+
+    Filters call the `filter` and `exclude` methods of the collector as if it were a QuerySet,
+    and the collector saves predicates as children of a flat Q object
+    instead of combining them into a deeply nested one.
+    Other QuerySet methods, such as `distinct`, are applied to the QuerySet.
+    Annotations with expressions equal to already added ones are not added again,
+    predicates on them refer to the existing annotations instead.
+    Nested collectors share the annotation names of their parents.
     """
 
-    __slots__ = 'q'
+    __slots__ = ('queryset', 'children', 'annotation_names', 'annotation_aliases')
 
-    def __init__(self, wrapped: models.QuerySet, q: Optional[models.Q] = None) -> None:
-        super().__init__(wrapped)
-        self.q = q or models.Q()
+    def __init__(
+        self,
+        queryset: models.QuerySet,
+        parent: Optional['QueryCollector'] = None,
+    ) -> None:
+        self.queryset = queryset
+        self.children: List[Union[models.Q, Tuple[str, Any]]] = []
+        if parent is None:
+            self.annotation_names: Dict[Any, str] = {}
+            self.annotation_aliases: Dict[str, str] = {}
+        else:
+            self.annotation_names = parent.annotation_names
+            self.annotation_aliases = parent.annotation_aliases
 
     def __getattr__(self, name: str) -> Any:
-        """Return QuerySet attributes for all cases except `filter` and `exclude`."""
-        if name == 'filter':
-            return self.filter_
-        elif name == 'exclude':
-            return self.exclude_
-        attr = super().__getattr__(name)
-        if callable(attr):
+        """Return QuerySet attributes and apply QuerySet methods to the collected QuerySet."""
+        attr = getattr(self.queryset, name)
+        if inspect.ismethod(attr):
             def func(*args, **kwargs) -> Any:
                 result = attr(*args, **kwargs)
                 if isinstance(result, models.QuerySet):
-                    return QuerySetProxy(result, self.q)
+                    self.queryset = result
+                    return self
                 return result
             return func
         return attr
 
     def __iter__(self) -> Iterator[Any]:
         """Return QuerySet and Q objects."""
-        return iter([self.__wrapped__, self.q])
+        return iter([self.queryset, self.q])
 
-    def filter_(self, *args, **kwargs) -> 'QuerySetProxy':
-        """Replace the `filter` method of the QuerySet class."""
-        if len(kwargs) == 0 and len(args) == 1 and isinstance(args[0], models.Q):
-            q = args[0]
+    @property
+    def q(self) -> models.Q:
+        """Return a Q object combining all predicates with the `and` operator."""
+        return models.Q(*self.children)
+
+    def add(self, q: models.Q) -> None:
+        """Add a Q object flattening it if it is a non-negated conjunction."""
+        if not q:
+            return
+        if q.connector == models.Q.AND and not q.negated:
+            self.children.extend(q.children)
         else:
-            q = models.Q(*args, **kwargs)
-        self.q = self.q & q
+            self.children.append(q)
+
+    def annotate(self, *args, **kwargs) -> 'QueryCollector':
+        """Annotate the QuerySet skipping expressions equal to already added ones.
+
+        An expression already added as an alias is selected under the name of the alias.
+        """
+        annotations = self.get_new_annotations(kwargs, select=True)
+        self.queryset = self.queryset.annotate(*args, **annotations)
+        return self
+
+    def alias(self, *args, **kwargs) -> 'QueryCollector':
+        """Add aliases to the QuerySet skipping expressions equal to already added ones."""
+        self.queryset = self.queryset.alias(*args, **self.get_new_annotations(kwargs))
         return self
 
-    def exclude_(self, *args, **kwargs) -> 'QuerySetProxy':
+    def get_new_annotations(self, kwargs: Dict[str, Any], select: bool = False) -> Dict[str, Any]:
+        """Return annotations that are not added yet and remember names of skipped ones."""
+        annotations = {}
+        for name, expression in kwargs.items():
+            try:
+                existing_name = self.annotation_names.get(expression)
+            except TypeError:
+                existing_name = None
+            if existing_name is None:
+                annotations[name] = expression
+                self.annotation_aliases.pop(name, None)
+                with suppress(TypeError):
+                    self.annotation_names[expression] = name
+            else:
+                self.annotation_aliases[name] = existing_name
+                if select and existing_name not in self.queryset.query.annotation_select:
+                    annotations[existing_name] = expression
+        return annotations
+
+    def resolve_aliases(self, kwargs: Dict[str, Any]) -> List[Tuple[str, Any]]:
+        """Return sorted predicates referring to existing annotations instead of skipped ones."""
+        predicates = []
+        for key, value in sorted(kwargs.items()):
+            name, *lookups = key.split(LOOKUP_SEP, 1)
+            if name in self.annotation_aliases:
+                key = LOOKUP_SEP.join([self.annotation_aliases[name], *lookups])
+            predicates.append((key, value))
+        return predicates
+
+    def order_by(self, *field_names) -> 'QueryCollector':
+        """Order the QuerySet referring to existing annotations instead of skipped ones."""
+        ordering = []
+        for field_name in field_names:
+            if isinstance(field_name, str) and field_name.lstrip('-') in self.annotation_aliases:
+                prefix = '-' if field_name.startswith('-') else ''
+                field_name = prefix + self.annotation_aliases[field_name.lstrip('-')]
+            ordering.append(field_name)
+        self.queryset = self.queryset.order_by(*ordering)
+        return self
+
+    def filter(self, *args, **kwargs) -> 'QueryCollector':
+        """Replace the `filter` method of the QuerySet class."""
+        self.children.extend(args)
+        self.children.extend(self.resolve_aliases(kwargs))
+        return self
+
+    def exclude(self, *args, **kwargs) -> 'QueryCollector':
         """Replace the `exclude` method of the QuerySet class."""
         if len(kwargs) == 0 and len(args) == 1 and isinstance(args[0], models.Q):
             q = args[0]
         else:
-            q = models.Q(*args, **kwargs)
-        self.q = self.q & ~q
+            q = models.Q(*args, *self.resolve_aliases(kwargs))
+        self.children.append(~q)
         return self
 
 
@@ -86,6 +189,119 @@ def is_regular_lookup_expr(lookup_expr: str) -> bool:
     ])
 
 
+def get_search_vector_key(
+    fields: Iterable[str],
+    config: Optional[str] = None,
+    weight: Optional[str] = None,
+) -> SearchVectorKey:
+    """Return a key identifying a search vector by its fields, config and weight.
+
+    Fields are ordered, because they are concatenated in the order of the vector.
+    """
+    return tuple(fields), config, weight
+
+
+def is_request_dependent_filter(filter_value: Filter) -> bool:
+    """Determine whether a filter builds its form field using a request."""
+    return isinstance(filter_value, QuerySetRequestMixin) and callable(filter_value.queryset)
+
+
+class FilterSetMetadata:
+    """Data derived from an `AdvancedFilterSet` class and shared by all its instances.
+
+    Each value is computed on first access because graphene-django
+    replaces some of the `base_filters` after the class is created.
+    """
+
+    def __init__(self, filterset_class: Type['AdvancedFilterSet']) -> None:
+        self.filterset_class = filterset_class
+
+    @cached_property
+    def fields(self) -> OrderedDict:
+        """Return the `Meta.fields` argument including only regular lookups."""
+        return self.filterset_class._get_fields(is_regular_lookup_expr)
+
+    @cached_property
+    def full_text_search_fields(self) -> OrderedDict:
+        """Return the `Meta.fields` argument including only full text search lookups."""
+        return self.filterset_class._get_fields(is_full_text_search_lookup_expr)
+
+    @cached_property
+    def search_vectors(self) -> Dict[str, Tuple[Tuple[str, ...], Optional[str], Optional[str]]]:
+        """Return fields, configs and weights of stored search vector columns.
+
+        Each column of the `Meta.search_vectors` argument is declared with its fields
+        or a dictionary with `fields`, `config` and `weight` keys.
+        """
+        search_vectors = getattr(getattr(self.filterset_class, 'Meta', None), 'search_vectors', {})
+        declarations = OrderedDict()
+        for column, declaration in search_vectors.items():
+            if not isinstance(declaration, dict):
+                declaration = {'fields': declaration}
+            declarations[column] = (
+                tuple(declaration['fields']),
+                declaration.get('config'),
+                declaration.get('weight'),
+            )
+        return declarations
+
+    @cached_property
+    def search_vector_columns(self) -> Dict[SearchVectorKey, str]:
+        """Return stored search vector columns by keys of their search vectors."""
+        return {
+            get_search_vector_key(*declaration): column
+            for column, declaration in self.search_vectors.items()
+        }
+
+    @cached_property
+    def form_class(self) -> Optional[Type[Union[Form, 'AdvancedFilterSet.TreeFormMixin']]]:
+        """Return a tree form class or None if form fields depend on a request."""
+        filters = copy.deepcopy(self.filterset_class.base_filters)
+        if any(is_request_dependent_filter(filter_value) for filter_value in filters.values()):
+            return None
+        for filter_value in filters.values():
+            filter_value.model = self.filterset_class._meta.model
+        form_class = type(
+            f'{self.filterset_class.__name__}Form',
+            (self.filterset_class._meta.form,),
+            OrderedDict([(name, filter_value.field) for name, filter_value in filters.items()]),
+        )
+        return self.filterset_class.create_tree_form_class(form_class)
+
+    @cached_property
+    def lookup_filter_names(self) -> Dict[Tuple[str, str], str]:
+        """Return filter names by field names and lookup expressions."""
+        filter_names: Dict[Tuple[str, str], str] = {}
+        for name, filter_value in self.filterset_class.base_filters.items():
+            filter_names.setdefault((filter_value.field_name, filter_value.lookup_expr), name)
+        return filter_names
+
+    @cached_property
+    def data_key_filter_names(self) -> Dict[str, str]:
+        """Return filter names by all data keys referring to them."""
+        filter_names: Dict[str, str] = {}
+        for name, filter_value in self.filterset_class.base_filters.items():
+            data_keys = [name, f'{filter_value.field_name}{LOOKUP_SEP}{filter_value.lookup_expr}']
+            if filter_value.lookup_expr == django_settings.DEFAULT_LOOKUP_EXPR:
+                data_keys.append(filter_value.field_name)
+            for data_key in data_keys:
+                filter_name = self.resolve_filter_name(data_key)
+                if filter_name is not None:
+                    filter_names.setdefault(data_key, filter_name)
+        return filter_names
+
+    def resolve_filter_name(self, data_key: str) -> Optional[str]:
+        """Resolve a filter name using a data key without the precomputed data keys."""
+        if LOOKUP_SEP in data_key:
+            field_name, lookup_expr = data_key.rsplit(LOOKUP_SEP, 1)
+        else:
+            field_name, lookup_expr = data_key, django_settings.DEFAULT_LOOKUP_EXPR
+        key = field_name if lookup_expr == django_settings.DEFAULT_LOOKUP_EXPR else data_key
+        if key in self.filterset_class.base_filters:
+            return key
+        return self.lookup_filter_names.get((field_name, lookup_expr))
+
+
 class AdvancedFilterSet(BaseFilterSet, metaclass=FilterSetMetaclass):
     """Allow you to use advanced filters."""
 
@@ -120,29 +336,63 @@ class AdvancedFilterSet(BaseFilterSet, metaclass=FilterSetMetaclass):
                 self_errors.update({'not': self.not_form.errors})
             return self_errors
 
-    def get_form_class(self) -> Type[Union[Form, TreeFormMixin]]:
-        """Return a django Form class suitable of validating the filterset data.
+    @classmethod
+    def get_metadata(cls) -> FilterSetMetadata:
+        """Return data derived from the class and shared by all its instances."""
+        if '_metadata' not in cls.__dict__:
+            cls._metadata = FilterSetMetadata(cls)
+        return cls._metadata
 
-        The form must be tree-like because the data is tree-like.
-        """
-        form_class = super(AdvancedFilterSet, self).get_form_class()
-        tree_form = cast(
+    @classmethod
+    def invalidate_metadata(cls) -> None:
+        """Drop the derived data so that it is computed again on the next access."""
+        if '_metadata' in cls.__dict__:
+            del cls._metadata
+
+    @classmethod
+    def create_tree_form_class(
+        cls,
+        form_class: Type[Form],
+    ) -> Type[Union[Form, TreeFormMixin]]:
+        """Create a tree-like form class from a regular form class."""
+        return cast(
             Type[Union[Form, AdvancedFilterSet.TreeFormMixin]],
             type(
                 f'{form_class.__name__.replace("Form", "")}TreeForm',
                 (form_class, AdvancedFilterSet.TreeFormMixin),
                 {},
             ),
-
         )
-        return tree_form
+
+    def get_form_class(self) -> Type[Union[Form, TreeFormMixin]]:
+        """Return a django Form class suitable of validating the filterset data.
+
+        The form must be tree-like because the data is tree-like.
+        The class is created once for the filterset class unless form fields
+        depend on a request, override this method if filters are changed per instance.
+        """
+        form_class = self.get_metadata().form_class
+        if form_class is None:
+            form_class = self.create_tree_form_class(
+                super(AdvancedFilterSet, self).get_form_class(),
+            )
+        return form_class
 
     @property
-    def form(self) -> Union[Form, TreeFormMixin]:
-        """Return a django Form suitable of validating the filterset data."""
+    def form(self) -> Union[Form, TreeFormMixin, FilterTree]:
+        """Return a django Form or a validated tree suitable of filtering the filterset data.
+
+        Bound data is validated without creating forms unless a custom form class is used,
+        because it can contain a form-level cleaning.
+        """
         if not hasattr(self, '_form'):
             form_class = self.get_form_class()
-            if self.is_bound:
+            if self.is_bound and self._meta.form is Form:
+                self._form = FilterTreeValidator(
+                    form_class,
+                    settings.FAIL_FAST_VALIDATION,
+                ).validate(self.data)
+            elif self.is_bound:
                 self._form = self.create_form(form_class, self.data)
             else:
                 self._form = form_class(prefix=self.form_prefix)
@@ -161,53 +411,88 @@ class AdvancedFilterSet(BaseFilterSet, metaclass=FilterSetMetaclass):
             not_form=self.create_form(form_class, data['not']) if data.get('not', None) else None,
         )
 
-    def find_filter(self, data_key: str) -> Filter:
+    def find_filter(self, data_key: str) -> Optional[Filter]:
         """Find a filter using a data key.
 
         The data key may differ from a filter name, because
         the data keys may contain DEFAULT_LOOKUP_EXPR and user can create
         a AdvancedFilterSet class without following the naming convention.
         """
-        if LOOKUP_SEP in data_key:
-            field_name, lookup_expr = data_key.rsplit(LOOKUP_SEP, 1)
-        else:
-            field_name, lookup_expr = data_key, django_settings.DEFAULT_LOOKUP_EXPR
-        key = field_name if lookup_expr == django_settings.DEFAULT_LOOKUP_EXPR else data_key
-        if key in self.filters:
-            return self.filters[key]
-        for filter_value in self.filters.values():
-            if filter_value.field_name == field_name and filter_value.lookup_expr == lookup_expr:
-                return filter_value
+        metadata = self.get_metadata()
+        filter_name = metadata.data_key_filter_names.get(data_key)
+        if filter_name is None:
+            filter_name = metadata.resolve_filter_name(data_key)
+        return self.filters.get(filter_name)
 
     def filter_queryset(self, queryset: models.QuerySet) -> models.QuerySet:
         """Filter a queryset with a top level form's `cleaned_data`."""
         qs, q = self.get_queryset_proxy_for_form(queryset, self.form)
-        return qs.filter(q)
+        if settings.OPTIMIZE_FILTERS:
+            q = optimize_q(q, qs.query)
+            if q is None:
+                return qs.none()
+        if not settings.EXISTS_SUBQUERIES:
+            return qs.filter(q)
+        qs = qs.filter(use_exists_subqueries(q, qs.query))
+        if qs.query.distinct and not queryset.query.distinct and \
+                not qs.query.distinct_fields and not has_multivalued_joins(qs.query):
+            qs.query.distinct = False
+        return qs
 
     def get_queryset_proxy_for_form(
         self,
         queryset: models.QuerySet,
-        form: Union[Form, TreeFormMixin],
-    ) -> QuerySetProxy:
-        """Return a `QuerySetProxy` object for a form's `cleaned_data`."""
-        qs = queryset
-        q = models.Q()
+        form: Union[Form, TreeFormMixin, FilterTree],
+        parent: Optional[QueryCollector] = None,
+    ) -> QueryCollector:
+        """Return a `QueryCollector` object for a form's `cleaned_data`.
+
+        Filters with the `method` argument get the `QuerySetProxy` object,
+        because the method may need a real QuerySet.
+        """
+        from .queryset_proxy import QuerySetProxy
+        collector = QueryCollector(queryset, parent)
         for name, value in form.cleaned_data.items():
-            qs, q = self.find_filter(name).filter(QuerySetProxy(qs, q), value)
-        and_q = models.Q()
+            filter_value = self.find_filter(name)
+            if filter_value.method is None:
+                collector = filter_value.filter(collector, value)
+            else:
+                collector.queryset, q = filter_value.filter(
+                    QuerySetProxy(collector.queryset),
+                    value,
+                )
+                collector.add(q)
         for and_form in form.and_forms:
-            qs, new_q = self.get_queryset_proxy_for_form(qs, and_form)
-            and_q = and_q & new_q
-        or_q = models.Q()
+            collector.queryset, q = self.get_queryset_proxy_for_form(
+                collector.queryset,
+                and_form,
+                collector,
+            )
+            collector.add(q)
+        or_children: List[models.Q] = []
         for or_form in form.or_forms:
-            qs, new_q = self.get_queryset_proxy_for_form(qs, or_form)
-            or_q = or_q | new_q
+            collector.queryset, q = self.get_queryset_proxy_for_form(
+                collector.queryset,
+                or_form,
+                collector,
+            )
+            if not q:
+                continue
+            if q.connector == models.Q.OR and not q.negated:
+                or_children.extend(q.children)
+            else:
+                or_children.append(q)
+        if or_children:
+            collector.add(models.Q(*or_children, _connector=models.Q.OR))
         if form.not_form:
-            qs, new_q = self.get_queryset_proxy_for_form(queryset, form.not_form)
-            not_q = ~new_q
-        else:
-            not_q = models.Q()
-        return QuerySetProxy(qs, q & and_q & or_q & not_q)
+            collector.queryset, q = self.get_queryset_proxy_for_form(
+                collector.queryset,
+                form.not_form,
+                collector,
+            )
+            if q:
+                collector.add(~q)
+        return collector
 
     @classmethod
     def get_filters(cls) -> OrderedDict:
@@ -233,10 +518,12 @@ class AdvancedFilterSet(BaseFilterSet, metaclass=FilterSetMetaclass):
         full_text_search_fields = cls.get_full_text_search_fields()
         if not len(full_text_search_fields):
             return new_filters
-        if not settings.IS_POSTGRESQL:
+        using = router.db_for_read(cls._meta.model)
+        fixed_settings = get_fixed_settings(using)
+        if not fixed_settings['IS_POSTGRESQL']:
             warnings.warn(
-                f'Full text search is not available because the {connection.vendor} vendor is '
-                'used instead of the postgresql vendor.',
+                f'Full text search is not available because the {connections[using].vendor} '
+                'vendor is used instead of the postgresql vendor.',
             )
             return new_filters
         from .filters import SearchQueryFilter, SearchRankFilter, TrigramFilter
@@ -245,7 +532,7 @@ class AdvancedFilterSet(BaseFilterSet, metaclass=FilterSetMetaclass):
             *cls.create_special_filters(base_filters, SearchQueryFilter).items(),
             *cls.create_special_filters(base_filters, SearchRankFilter).items(),
         ])
-        if not settings.HAS_TRIGRAM_EXTENSION:
+        if not fixed_settings['HAS_TRIGRAM_EXTENSION']:
             warnings.warn(
                 'Trigram search is not available because the `pg_trgm` extension is not installed.',
             )
@@ -282,12 +569,12 @@ class AdvancedFilterSet(BaseFilterSet, metaclass=FilterSetMetaclass):
     @classmethod
     def get_fields(cls) -> OrderedDict:
         """Resolve the `Meta.fields` argument including only regular lookups."""
-        return cls._get_fields(is_regular_lookup_expr)
+        return cls.get_metadata().fields
 
     @classmethod
     def get_full_text_search_fields(cls) -> OrderedDict:
         """Resolve the `Meta.fields` argument including only full text search lookups."""
-        return cls._get_fields(is_full_text_search_lookup_expr)
+        return cls.get_metadata().full_text_search_fields
 
     @classmethod
     def _get_fields(cls, predicate: Callable[[str], bool]) -> OrderedDict:
@@ -25,4 +25,5 @@ def get_filterset_class(
             **meta
         )
     replace_csv_filters(graphene_filterset_class)
+    graphene_filterset_class.invalidate_metadata()
     return graphene_filterset_class
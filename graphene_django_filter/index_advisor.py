@@ -0,0 +1,411 @@
+"""Index recommendations for filtersets.
+
+The advisor goes through lookups of `AdvancedFilterSet` classes and recommends PostgreSQL indexes
+that can serve them: B-tree indexes for comparisons, pattern B-tree indexes for `startswith`,
+GIN trigram indexes for substring, regular expression and trigram searches,
+GiST trigram indexes for trigram searches ordered from the nearest,
+and GIN indexes over search vectors or stored search vector columns for full text search.
+Lookups that are already served by an index of a model are reported with the name of the index,
+and lookups that no index can serve are reported with a note.
+"""
+
+import json
+from collections import Counter, OrderedDict
+from importlib import import_module
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type
+
+from django.contrib.postgres.indexes import GinIndex, GistIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.backends.utils import names_digest
+from django.db.migrations import AddIndex
+from django.db.migrations.operations.base import Operation
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.functions import Upper
+from django.utils.module_loading import autodiscover_modules
+from django_filters.conf import settings as django_settings
+from graphene.utils.str_converters import to_snake_case
+from graphene_django.filter.filterset import GrapheneFilterSetMixin
+
+from .conf import settings
+from .filters import SearchQueryFilter, SearchRankFilter, TrigramFilter
+from .filterset import AdvancedFilterSet
+
+BTREE_LOOKUPS = ('exact', 'in', 'gt', 'gte', 'lt', 'lte', 'range', 'isnull')
+UPPER_BTREE_LOOKUPS = ('iexact',)
+PATTERN_LOOKUPS = ('startswith',)
+TRIGRAM_LOOKUPS = ('contains', 'endswith', 'regex', 'iregex', TrigramFilter.postfix)
+UPPER_TRIGRAM_LOOKUPS = ('icontains', 'istartswith', 'iendswith')
+NEAREST_LOOKUPS = (f'{TrigramFilter.postfix}{LOOKUP_SEP}{TrigramFilter.nearest_lookup}',)
+SEARCH_LOOKUPS = (SearchQueryFilter.postfix, SearchRankFilter.postfix)
+OPCLASS_FAMILIES = {'gin_trgm_ops': 'trgm', 'gist_trgm_ops': 'trgm'}
+
+
+class IndexShape(NamedTuple):
+    """Index method with columns and their operator classes.
+
+    Columns are field names or expressions.
+    """
+
+    method: str
+    columns: Tuple[Any, ...]
+    opclasses: Tuple[str, ...]
+    name: str
+
+    def serves(self, shape: 'IndexShape') -> bool:
+        """Determine whether the index serves lookups of the single column index shape."""
+        column, opclass = shape.columns[0], shape.opclasses[0]
+        if shape.method == 'btree':
+            return self.method == 'btree' and \
+                self.columns[:1] == (column,) and self.opclasses[:1] == (opclass,)
+        if shape.method == 'gist' and self.method != 'gist':
+            return False
+        family = OPCLASS_FAMILIES.get(opclass, opclass)
+        return self.method in ('gin', 'gist') and any(
+            (own_column, OPCLASS_FAMILIES.get(own_opclass, own_opclass)) == (column, family)
+            for own_column, own_opclass in zip(self.columns, self.opclasses)
+        )
+
+
+class IndexAdvice(NamedTuple):
+    """Index recommendation for filters of filtersets.
+
+    If an index of the model serves the filters, `existing` is its name.
+    If no index can serve the filters, `index` is None and `note` explains why.
+    """
+
+    model: Type[models.Model]
+    index: Optional[models.Index]
+    existing: Optional[str]
+    filters: Tuple[str, ...]
+    usage: int
+    note: str = ''
+
+
+def advise_indexes(
+    filterset_classes: Optional[Iterable[Type[AdvancedFilterSet]]] = None,
+    inputs: Optional[Iterable[Dict[str, Any]]] = None,
+    search_config: Optional[str] = None,
+) -> List[IndexAdvice]:
+    """Return index recommendations for filters of filtersets.
+
+    If captured filter inputs are provided, only used filters are considered.
+    Each input is a dictionary with the `model` label and the `filter` argument value.
+    """
+    if filterset_classes is None:
+        filterset_classes = get_filterset_classes()
+    usage = count_filter_usage(inputs) if inputs is not None else None
+    advices: Dict[Tuple[Any, ...], IndexAdvice] = OrderedDict()
+    for filterset_class in filterset_classes:
+        model = filterset_class._meta.model
+        for filter_key, advice in get_filterset_advices(filterset_class, search_config):
+            filter_usage = usage[(model._meta.label, filter_key)] if usage is not None else 0
+            if usage is not None and not filter_usage:
+                continue
+            advice_key = (advice.model, get_index_key(advice.index), advice.existing, advice.note)
+            filter_name = f'{filterset_class.__name__}.{filter_key}'
+            if advice_key in advices:
+                previous = advices[advice_key]
+                if filter_name not in previous.filters:
+                    advices[advice_key] = previous._replace(
+                        filters=(*previous.filters, filter_name),
+                        usage=previous.usage + filter_usage,
+                    )
+            else:
+                advices[advice_key] = advice._replace(filters=(filter_name,), usage=filter_usage)
+    return sorted(advices.values(), key=lambda a: (a.model._meta.label, -a.usage))
+
+
+def import_filterset_modules(modules: Iterable[str] = ()) -> None:
+    """Import modules that declare filtersets.
+
+    The `filtersets` and `schema` modules of applications are imported with the given modules.
+    """
+    autodiscover_modules('filtersets', 'schema')
+    for module in modules:
+        import_module(module)
+
+
+def get_filterset_classes() -> List[Type[AdvancedFilterSet]]:
+    """Return imported `AdvancedFilterSet` subclasses with a model.
+
+    Subclasses that graphene-django creates to wrap a filterset class are skipped.
+    """
+    filterset_classes = []
+    subclasses = AdvancedFilterSet.__subclasses__()
+    while subclasses:
+        filterset_class = subclasses.pop(0)
+        subclasses.extend(filterset_class.__subclasses__())
+        if filterset_class._meta.model is None or filterset_class in filterset_classes:
+            continue
+        if issubclass(filterset_class, GrapheneFilterSetMixin) and any(
+            issubclass(base, AdvancedFilterSet) and base._meta.model is not None
+            for base in filterset_class.__bases__
+        ):
+            continue
+        filterset_classes.append(filterset_class)
+    return filterset_classes
+
+
+def get_filterset_advices(
+    filterset_class: Type[AdvancedFilterSet],
+    search_config: Optional[str] = None,
+) -> Iterator[Tuple[str, IndexAdvice]]:
+    """Return filter keys of a filterset with index recommendations."""
+    model = filterset_class._meta.model
+    for field_name, lookups in filterset_class.get_fields().items():
+        for lookup in lookups:
+            yield f'{field_name}{LOOKUP_SEP}{lookup}', get_lookup_advice(model, field_name, lookup)
+    full_text_search_fields = tuple(filterset_class.get_full_text_search_fields())
+    if not full_text_search_fields:
+        return
+    search_vector_columns = filterset_class.get_metadata().search_vector_columns
+    search_advices = [
+        get_column_search_advice(model, column) for column in search_vector_columns.values()
+    ]
+    if all(fields != full_text_search_fields for fields, *_ in search_vector_columns):
+        search_advices.append(get_search_advice(model, full_text_search_fields, search_config))
+    for search_advice in search_advices:
+        for postfix in SEARCH_LOOKUPS:
+            yield postfix, search_advice
+    for field_name in full_text_search_fields:
+        yield f'{field_name}{LOOKUP_SEP}{TrigramFilter.postfix}', get_lookup_advice(
+            model, field_name, TrigramFilter.postfix,
+        )
+        for lookup in NEAREST_LOOKUPS:
+            yield f'{field_name}{LOOKUP_SEP}{lookup}', get_lookup_advice(model, field_name, lookup)
+
+
+def get_lookup_advice(model: Type[models.Model], field_name: str, lookup: str) -> IndexAdvice:
+    """Return an index recommendation for a lookup of a field."""
+    field = resolve_field(model, field_name)
+    if field is None:
+        return IndexAdvice(model, None, None, (), 0, f'The `{field_name}` is not a model field.')
+    model = field.model
+    if LOOKUP_SEP in lookup and lookup not in NEAREST_LOOKUPS:
+        transform = lookup.split(LOOKUP_SEP)[0]
+        return IndexAdvice(
+            model, None, None, (), 0,
+            f'The `{transform}` transform cannot use an index of the `{field.name}` column.',
+        )
+    if field.is_relation and not field.concrete or field.many_to_many:
+        return IndexAdvice(model, None, f'{field.name} relation', (), 0)
+    is_text = isinstance(field, (models.CharField, models.TextField))
+    if lookup in BTREE_LOOKUPS:
+        index = models.Index(fields=[field.name], name=get_index_name(model, field.name, 'idx'))
+    elif lookup in UPPER_BTREE_LOOKUPS and is_text:
+        index = models.Index(
+            Upper(models.F(field.name)),
+            name=get_index_name(model, field.name, 'upper'),
+        )
+    elif lookup in PATTERN_LOOKUPS and is_text:
+        index = models.Index(
+            fields=[field.name],
+            opclasses=[get_pattern_opclass(field)],
+            name=get_index_name(model, field.name, 'like'),
+        )
+    elif lookup in TRIGRAM_LOOKUPS and is_text:
+        index = GinIndex(
+            fields=[field.name],
+            opclasses=['gin_trgm_ops'],
+            name=get_index_name(model, field.name, 'trgm'),
+        )
+    elif lookup in NEAREST_LOOKUPS and is_text:
+        index = GistIndex(
+            fields=[field.name],
+            opclasses=['gist_trgm_ops'],
+            name=get_index_name(model, field.name, 'gtrgm'),
+        )
+    elif lookup in UPPER_TRIGRAM_LOOKUPS and is_text:
+        index = GinIndex(
+            OpClass(Upper(models.F(field.name)), name='gin_trgm_ops'),
+            name=get_index_name(model, field.name, 'utrgm'),
+        )
+    else:
+        return IndexAdvice(
+            model, None, None, (), 0,
+            f'The `{lookup}` lookup cannot use an index of the `{field.name}` column.',
+        )
+    return IndexAdvice(model, index, get_serving_index_name(model, index), (), 0)
+
+
+def get_search_advice(
+    model: Type[models.Model],
+    field_names: Tuple[str, ...],
+    search_config: Optional[str] = None,
+) -> IndexAdvice:
+    """Return an index recommendation for full text search over fields."""
+    fields = [resolve_field(model, field_name) for field_name in field_names]
+    if any(field is None or field.model is not model for field in fields):
+        return IndexAdvice(
+            model, None, None, (), 0,
+            'Search vectors over related fields cannot be indexed.',
+        )
+    if search_config is None:
+        return IndexAdvice(
+            model, None, None, (), 0,
+            'Search vectors without a config cannot be indexed.',
+        )
+    index = GinIndex(
+        SearchVector(*(models.F(field.name) for field in fields), config=search_config),
+        name=get_index_name(model, '_'.join(field_names), 'fts'),
+    )
+    return IndexAdvice(model, index, get_serving_index_name(model, index), (), 0)
+
+
+def get_column_search_advice(model: Type[models.Model], column: str) -> IndexAdvice:
+    """Return an index recommendation for full text search over a stored search vector column."""
+    index = GinIndex(fields=[column], name=get_index_name(model, column, 'fts'))
+    return IndexAdvice(model, index, get_serving_index_name(model, index), (), 0)
+
+
+def resolve_field(model: Type[models.Model], field_name: str) -> Optional[models.Field]:
+    """Return a model field following relations of a field name or None if it does not exist."""
+    field = None
+    for name in field_name.split(LOOKUP_SEP):
+        if field is not None:
+            if not field.is_relation:
+                return None
+            model = field.related_model
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+    return field
+
+
+def get_pattern_opclass(field: models.Field) -> str:
+    """Return the pattern operator class for a text field."""
+    return 'text_pattern_ops' if isinstance(field, models.TextField) else 'varchar_pattern_ops'
+
+
+def get_index_name(model: Type[models.Model], column: str, suffix: str) -> str:
+    """Return an index name that fits the 30 characters limit of Django."""
+    digest = names_digest(model._meta.db_table, column, suffix, length=8)
+    return f'{model._meta.model_name[:12]}_{digest}_{suffix}'
+
+
+def get_index_key(index: Optional[models.Index]) -> Optional[Tuple[Any, ...]]:
+    """Return a hashable key of an index that ignores its name."""
+    if index is None:
+        return None
+    shape = get_index_shape(index)
+    return shape.method, shape.columns, shape.opclasses
+
+
+def get_index_shape(index: models.Index) -> Optional[IndexShape]:
+    """Return the shape of an index or None if it is partial."""
+    if index.condition is not None:
+        return None
+    method = 'btree' if index.suffix == 'idx' else index.suffix
+    if index.fields:
+        columns = tuple(field_name.lstrip('-') for field_name in index.fields)
+        opclasses = tuple(index.opclasses) + ('',) * (len(columns) - len(index.opclasses))
+        return IndexShape(method, columns, opclasses, index.name)
+    columns, opclasses = [], []
+    for expression in index.expressions:
+        opclass = ''
+        if isinstance(expression, OpClass):
+            opclass = expression.extra['name']
+            expression = expression.get_source_expressions()[0]
+        columns.append(expression.name if isinstance(expression, models.F) else expression)
+        opclasses.append(opclass)
+    return IndexShape(method, tuple(columns), tuple(opclasses), index.name)
+
+
+def get_index_shapes(model: Type[models.Model]) -> List[IndexShape]:
+    """Return shapes of indexes that Django creates for a model in PostgreSQL."""
+    shapes = []
+    for field in model._meta.local_concrete_fields:
+        if not (field.primary_key or field.unique or field.db_index):
+            continue
+        shapes.append(IndexShape('btree', (field.name,), ('',), f'{field.name} column'))
+        if isinstance(field, (models.CharField, models.TextField)):
+            shapes.append(
+                IndexShape(
+                    'btree', (field.name,), (get_pattern_opclass(field),), f'{field.name} column',
+                ),
+            )
+    field_sets = [
+        *model._meta.unique_together,
+        *getattr(model._meta, 'index_together', ()),
+        *(
+            constraint.fields for constraint in model._meta.constraints
+            if isinstance(constraint, models.UniqueConstraint) and constraint.condition is None
+        ),
+    ]
+    for field_names in filter(None, field_sets):
+        shapes.append(
+            IndexShape(
+                'btree', tuple(field_names), ('',) * len(field_names), ', '.join(field_names),
+            ),
+        )
+    for index in model._meta.indexes:
+        shape = get_index_shape(index)
+        if shape is not None:
+            shapes.append(shape)
+    return shapes
+
+
+def get_serving_index_name(model: Type[models.Model], index: models.Index) -> Optional[str]:
+    """Return the name of an existing index that serves lookups of the single column index."""
+    shape = get_index_shape(index)
+    for existing_shape in get_index_shapes(model):
+        if existing_shape.serves(shape):
+            return existing_shape.name
+    return None
+
+
+def count_filter_usage(inputs: Iterable[Dict[str, Any]]) -> Counter:
+    """Count usage of filter keys of models in captured filter inputs."""
+    usage = Counter()
+    for filter_input in inputs:
+        for filter_key in get_filter_keys(filter_input['filter']):
+            usage[(filter_input['model'], filter_key)] += 1
+    return usage
+
+
+def get_filter_keys(filter_input: Dict[str, Any], prefix: str = '') -> Iterator[str]:
+    """Return filter keys of a `filter` argument value in the GraphQL or Python case."""
+    postfixes = (*SEARCH_LOOKUPS, TrigramFilter.postfix)
+    for key, value in filter_input.items():
+        key = to_snake_case(key)
+        if key in (settings.AND_KEY, settings.OR_KEY):
+            for subtree in value:
+                yield from get_filter_keys(subtree, prefix)
+            continue
+        if key == settings.NOT_KEY:
+            yield from get_filter_keys(value, prefix)
+            continue
+        filter_key = f'{prefix}{LOOKUP_SEP}{key}' if prefix else key
+        if isinstance(value, dict) and key not in postfixes:
+            yield from get_filter_keys(value, filter_key)
+        elif prefix or key in postfixes:
+            yield filter_key
+            if key == TrigramFilter.postfix and value.get(TrigramFilter.nearest_lookup):
+                yield f'{filter_key}{LOOKUP_SEP}{TrigramFilter.nearest_lookup}'
+        else:
+            yield f'{filter_key}{LOOKUP_SEP}{django_settings.DEFAULT_LOOKUP_EXPR}'
+
+
+def read_filter_inputs(path: str) -> List[Dict[str, Any]]:
+    """Read captured filter inputs from a file with a JSON object on each line."""
+    with open(path) as inputs_file:
+        return [json.loads(line) for line in inputs_file if line.strip()]
+
+
+def get_migration_operations(advices: Iterable[IndexAdvice]) -> Dict[str, List[Operation]]:
+    """Return migration operations adding recommended indexes grouped by application labels."""
+    operations: Dict[str, List[Operation]] = OrderedDict()
+    for advice in advices:
+        if advice.index is None or advice.existing is not None:
+            continue
+        app_operations = operations.setdefault(advice.model._meta.app_label, [])
+        shape = get_index_shape(advice.index)
+        if 'trgm' in map(OPCLASS_FAMILIES.get, shape.opclasses) and \
+                not any(isinstance(operation, TrigramExtension) for operation in app_operations):
+            app_operations.insert(0, TrigramExtension())
+        app_operations.append(AddIndex(advice.model._meta.model_name, advice.index))
+    return operations
@@ -1,6 +1,6 @@
 """Functions for converting tree data into data suitable for the FilterSet."""
 
-from typing import Any, Dict, List, Type, Union
+from typing import Any, Dict, List, Optional, Type, Union
 
 from django.contrib.postgres.search import (
     SearchQuery,
@@ -27,7 +27,13 @@ from graphene_django_filter.input_types import (
 )
 
 from .conf import settings
-from .filterset import AdvancedFilterSet
+from .expressions import (
+    TrigramMatch,
+    TrigramNearestDistance,
+    TrigramWordDistance,
+    TrigramWordSimilarity,
+)
+from .filterset import AdvancedFilterSet, get_search_vector_key
 
 
 def tree_input_type_to_data(
@@ -86,25 +92,28 @@ def create_search_rank_data(
     filterset_class: Type[AdvancedFilterSet],
 ) -> Dict[str, SearchRankFilter.Value]:
     """Create a data for the `SearchRankFilter` class."""
+    search_rank_data = {
+        'vector': create_search_vector(input_type.vector, filterset_class),
+        'query': create_search_query(input_type.query),
+        'cover_density': input_type.cover_density,
+    }
+    weights = input_type.get('weights', None)
+    if weights:
+        search_rank_data['weights'] = create_search_rank_weights(weights)
+    normalization = input_type.get('normalization', None)
+    if normalization:
+        search_rank_data['normalization'] = normalization
+    search_rank = SearchRank(**search_rank_data)
     rank_data = {}
-    for lookup, value in input_type.lookups.items():
-        search_rank_data = {
-            'vector': create_search_vector(input_type.vector, filterset_class),
-            'query': create_search_query(input_type.query),
-            'cover_density': input_type.cover_density,
-        }
-        weights = input_type.get('weights', None)
-        if weights:
-            search_rank_data['weights'] = create_search_rank_weights(weights)
-        normalization = input_type.get('normalization', None)
-        if normalization:
-            search_rank_data['normalization'] = normalization
+    for lookup, value in (input_type.lookups or {}).items():
         k = (key + LOOKUP_SEP + lookup).replace(
             LOOKUP_SEP + django_settings.DEFAULT_LOOKUP_EXPR, '',
         )
-        rank_data[k] = SearchRankFilter.Value(
-            annotation_value=SearchRank(**search_rank_data),
-            search_value=value,
+        rank_data[k] = SearchRankFilter.Value(annotation_value=search_rank, search_value=value)
+    if input_type.get('order', False):
+        rank_data[key + LOOKUP_SEP + SearchRankFilter.order_lookup] = SearchRankFilter.Value(
+            annotation_value=search_rank,
+            search_value=True,
         )
     return rank_data
 
@@ -116,29 +125,70 @@ def create_trigram_data(
 ) -> Dict[str, TrigramFilter.Value]:
     """Create a data for the `TrigramFilter` class."""
     trigram_data = {}
+    field_name = LOOKUP_SEP.join(key.split(LOOKUP_SEP)[:-1])
     if input_type.kind == TrigramSearchKind.SIMILARITY:
-        trigram_class = TrigramSimilarity
+        trigram = TrigramSimilarity(field_name, input_type.value)
+    elif input_type.kind == TrigramSearchKind.DISTANCE:
+        trigram = TrigramDistance(field_name, input_type.value)
+    elif input_type.kind == TrigramSearchKind.WORD_SIMILARITY:
+        trigram = TrigramWordSimilarity(input_type.value, field_name)
     else:
-        trigram_class = TrigramDistance
-    for lookup, value in input_type.lookups.items():
+        trigram = TrigramWordDistance(input_type.value, field_name)
+    for lookup, value in (input_type.lookups or {}).items():
         k = (key + LOOKUP_SEP + lookup).replace(
             LOOKUP_SEP + django_settings.DEFAULT_LOOKUP_EXPR, '',
         )
         trigram_data[k] = TrigramFilter.Value(
-            annotation_value=trigram_class(
-                LOOKUP_SEP.join(key.split(LOOKUP_SEP)[:-1]),
-                input_type.value,
-            ),
+            annotation_value=trigram,
             search_value=value,
+            match_value=create_trigram_match(input_type, field_name, lookup, value),
+        )
+    if input_type.get('nearest', False):
+        if input_type.kind in (TrigramSearchKind.SIMILARITY, TrigramSearchKind.DISTANCE):
+            operator = '<->'
+        else:
+            operator = '<->>'
+        trigram_data[key + LOOKUP_SEP + TrigramFilter.nearest_lookup] = TrigramFilter.Value(
+            annotation_value=TrigramNearestDistance(field_name, input_type.value, operator),
+            search_value=True,
         )
     return trigram_data
 
 
+def create_trigram_match(
+    input_type: TrigramFilterInputType,
+    field_name: str,
+    lookup: str,
+    value: float,
+) -> Optional[TrigramMatch]:
+    """Create an indexable `pg_trgm` operator implied by the trigram lookup.
+
+    The operator is created only if the threshold of the operator is set in settings
+    and the lookup implies that similarity is not less than it,
+    otherwise it would exclude matching rows.
+    """
+    if input_type.kind in (TrigramSearchKind.SIMILARITY, TrigramSearchKind.DISTANCE):
+        operator, threshold = '%', settings.TRIGRAM_SIMILARITY_THRESHOLD
+    else:
+        operator, threshold = '%>', settings.TRIGRAM_WORD_SIMILARITY_THRESHOLD
+    if threshold is None:
+        return None
+    if input_type.kind in (TrigramSearchKind.SIMILARITY, TrigramSearchKind.WORD_SIMILARITY):
+        is_implied = lookup in ('exact', 'gt', 'gte') and value >= threshold
+    else:
+        is_implied = lookup in ('exact', 'lt', 'lte') and 1 - value >= threshold
+    return TrigramMatch(field_name, input_type.value, operator) if is_implied else None
+
+
 def create_search_vector(
     input_type: Union[SearchVectorInputType, InputObjectTypeContainer],
     filterset_class: Type[AdvancedFilterSet],
-) -> SearchVector:
-    """Create an object of the `SearchVector` class."""
+) -> Union[SearchVector, models.F]:
+    """Create an object of the `SearchVector` class.
+
+    If the filterset declares a stored search vector column with the same fields,
+    config and weight, a reference to the column is returned instead.
+    """
     validate_search_vector_fields(filterset_class, input_type.fields)
     search_vector_data = {}
     config = input_type.get('config', None)
@@ -147,6 +197,16 @@ def create_search_vector(
     weight = input_type.get('weight', None)
     if weight:
         search_vector_data['weight'] = weight.value
+    if not (config and config.is_field):
+        column = filterset_class.get_metadata().search_vector_columns.get(
+            get_search_vector_key(
+                input_type.fields,
+                search_vector_data.get('config'),
+                search_vector_data.get('weight'),
+            ),
+        )
+        if column is not None:
+            return models.F(column)
     return SearchVector(*input_type.fields, **search_vector_data)
 
 
@@ -117,10 +117,10 @@ class SearchRankFilterInputType(graphene.InputObjectType):
 
     vector = graphene.InputField(SearchVectorInputType, required=True, description='Search vector')
     query = graphene.InputField(SearchQueryInputType, required=True, description='Search query')
-    lookups = graphene.InputField(
-        FloatLookupsInputType,
-        required=True,
-        description='Available lookups',
+    lookups = graphene.InputField(FloatLookupsInputType, description='Available lookups')
+    order = graphene.Boolean(
+        default_value=False,
+        description='Whether to order results by the rank in descending order',
     )
     weights = graphene.InputField(SearchRankWeightsInputType, description='Search rank weights')
     cover_density = graphene.Boolean(
@@ -135,6 +135,8 @@ class TrigramSearchKind(graphene.Enum):
 
     SIMILARITY = 'similarity'
     DISTANCE = 'distance'
+    WORD_SIMILARITY = 'word_similarity'
+    WORD_DISTANCE = 'word_distance'
 
 
 class TrigramFilterInputType(graphene.InputObjectType):
@@ -145,9 +147,9 @@ class TrigramFilterInputType(graphene.InputObjectType):
         default_value=TrigramSearchKind.SIMILARITY,
         description='Type of the search using trigrams',
     )
-    lookups = graphene.InputField(
-        FloatLookupsInputType,
-        required=True,
-        description='Available lookups',
+    lookups = graphene.InputField(FloatLookupsInputType, description='Available lookups')
+    nearest = graphene.Boolean(
+        default_value=False,
+        description='Whether to order results from the nearest by distance of trigram',
     )
     value = graphene.String(required=True, description='Search value')
@@ -0,0 +1,311 @@
+"""Keyset pagination of filtered connections.
+
+Relay cursors of graphene-django are offsets, so a deep page is fetched with a large `OFFSET`
+and the database reads and discards all preceding rows.
+Keyset cursors encode values of the ordering of the last row instead,
+and the next page is fetched with a comparison of rows that an index serves as a range scan,
+so the cost of a page does not depend on its depth.
+"""
+
+import base64
+import binascii
+import datetime
+import json
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Type
+
+import graphene
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldError, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import Col
+from django.db.models.sql import Query
+from django.db.models.sql.constants import LOUTER
+from graphene.relay.connection import connection_adapter, page_info_adapter
+from graphene_django.utils import maybe_queryset
+from graphql import GraphQLError
+
+from .conf import settings
+from .connection_field import AdvancedDjangoFilterConnectionField
+from .counting import LazyCount, get_count_queryset
+from .expressions import RowComparison
+
+CURSOR_PREFIX = 'keyset:'
+KEY_NAME_PREFIX = 'keyset_value_'
+
+
+class KeysetKey(NamedTuple):
+    """Ordering key of a QuerySet annotated with the name to read its values from rows.
+
+    Null values are ordered before other values if `nulls_first` is set,
+    as PostgreSQL orders them by default for descending keys.
+    """
+
+    name: str
+    expression: Any
+    descending: bool
+    nulls_first: bool
+    nullable: bool = True
+
+    def get_ordering(self, reverse: bool = False) -> models.OrderBy:
+        """Return the ordering by the annotated key."""
+        descending = self.descending != reverse
+        ordering = models.F(self.name).desc if descending else models.F(self.name).asc
+        if not self.nullable:
+            return ordering()
+        if self.nulls_first != reverse:
+            return ordering(nulls_first=True)
+        return ordering(nulls_last=True)
+
+
+def get_keyset_keys(queryset: models.QuerySet) -> List[KeysetKey]:
+    """Return ordering keys of a QuerySet ending with the primary key as a tie-breaker."""
+    query = queryset.query
+    if query.order_by:
+        ordering = query.order_by
+    elif query.default_ordering:
+        ordering = query.get_meta().ordering
+    else:
+        ordering = ()
+    pk_names = {'pk', query.get_meta().pk.name, query.get_meta().pk.attname}
+    keys = []
+    for order in ordering:
+        if isinstance(order, str):
+            if order == '?':
+                raise GraphQLError('Keyset pagination cannot be used with random ordering.')
+            descending = order.startswith('-')
+            name = order.lstrip('-')
+            expression = models.F(name)
+            nulls_first = descending
+        elif isinstance(order, models.OrderBy):
+            descending = order.descending
+            expression = order.expression
+            name = getattr(expression, 'name', None)
+            nulls_first = bool(order.nulls_first) or descending and not order.nulls_last
+        else:
+            descending = False
+            expression = order
+            name = getattr(expression, 'name', None)
+            nulls_first = False
+        keys.append(KeysetKey(f'{KEY_NAME_PREFIX}{len(keys)}', expression, descending, nulls_first))
+        if name in pk_names:
+            return keys
+    keys.append(KeysetKey(f'{KEY_NAME_PREFIX}{len(keys)}', models.F('pk'), False, False))
+    return keys
+
+
+def is_nullable(expression: Any, query: Query) -> bool:
+    """Return whether values of a resolved expression can be null.
+
+    Only columns of fields that are not nullable and are not read through outer joins
+    are known to have values, other expressions are considered nullable.
+    """
+    if not isinstance(expression, Col):
+        return True
+    return expression.target.null or query.alias_map[expression.alias].join_type == LOUTER
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """JSON encoder of cursor values that keeps microseconds of times.
+
+    `DjangoJSONEncoder` truncates times to milliseconds, so rows that differ
+    only in microseconds would compare equal to the cursor and be skipped or repeated.
+    """
+
+    def default(self, o: Any) -> Any:
+        """Encode datetimes and times in the full ISO format."""
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Return an opaque cursor encoding ordering values of a row."""
+    data = CURSOR_PREFIX + json.dumps(values, cls=CursorJSONEncoder, separators=(',', ':'))
+    return base64.b64encode(data.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str, keys: List[KeysetKey], queryset: models.QuerySet) -> List[Any]:
+    """Return ordering values of a cursor converted to Python types of the keys.
+
+    The QuerySet must be annotated with the keys.
+    """
+    try:
+        data = base64.b64decode(cursor.encode('ascii'), validate=True).decode('utf-8')
+        if not data.startswith(CURSOR_PREFIX):
+            raise ValueError(data)
+        values = json.loads(data[len(CURSOR_PREFIX):])
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError(data)
+        return [
+            to_python(queryset.query.annotations[key.name], value)
+            for key, value in zip(keys, values)
+        ]
+    except (binascii.Error, UnicodeError, ValueError, ValidationError):
+        raise GraphQLError(f'Invalid keyset cursor: `{cursor}`.')
+
+
+def to_python(expression: Any, value: Any) -> Any:
+    """Convert a JSON value to the Python type of an expression."""
+    if value is None:
+        return None
+    try:
+        output_field = expression.output_field
+    except FieldError:
+        return value
+    return output_field.to_python(value)
+
+
+def get_keyset_condition(keys: List[KeysetKey], values: List[Any], after: bool) -> Any:
+    """Return a condition selecting rows after or before the row with the ordering values.
+
+    If all keys have the same direction and cannot be null, rows are compared as row values,
+    otherwise the comparison is expanded into a disjunction
+    in which null values are placed according to the ordering of their keys.
+    """
+    if any(value is None and not key.nullable for key, value in zip(keys, values)):
+        raise GraphQLError('Keyset pagination requires ordering values that are not null.')
+    directions = {key.descending for key in keys}
+    if len(directions) == 1 and not any(key.nullable for key in keys):
+        operator = '<' if directions.pop() == after else '>'
+        return RowComparison([models.F(key.name) for key in keys], operator, values)
+    condition = models.Q()
+    for i, (key, value) in enumerate(zip(keys, values)):
+        lookup = 'lt' if key.descending == after else 'gt'
+        nulls_ahead = key.nullable and key.nulls_first != after
+        if value is None:
+            if nulls_ahead:
+                continue
+            ahead = models.Q((f'{key.name}{LOOKUP_SEP}isnull', False))
+        else:
+            ahead = models.Q((f'{key.name}{LOOKUP_SEP}{lookup}', value))
+            if nulls_ahead:
+                ahead |= models.Q((f'{key.name}{LOOKUP_SEP}isnull', True))
+        condition |= models.Q(*(
+            (f'{keys[j].name}{LOOKUP_SEP}isnull', True) if values[j] is None
+            else (keys[j].name, values[j])
+            for j in range(i)
+        )) & ahead
+    return condition
+
+
+def resolve_keyset_connection(
+    connection: Type[graphene.Connection],
+    args: Dict[str, Any],
+    queryset: models.QuerySet,
+    max_limit: Optional[int] = None,
+    count_strategy: Optional[str] = None,
+) -> graphene.Connection:
+    """Resolve a connection fetching a page after or before keyset cursors.
+
+    The page is fetched with one more row to determine whether the next page exists.
+    A page requested with `first` and `after` has a previous page,
+    and a page requested with `last` and `before` has a next page.
+    """
+    from .execution import fetch_page_with_count, is_in_transaction
+    if args.get('offset') is not None:
+        raise GraphQLError('The `offset` argument cannot be used with keyset pagination.')
+    first, last = args.get('first'), args.get('last')
+    if max_limit is not None and first is None and last is None:
+        first = max_limit
+    keys = get_keyset_keys(queryset)
+    page = queryset.annotate(**{key.name: key.expression for key in keys})
+    keys = [
+        key._replace(nullable=is_nullable(page.query.annotations[key.name], page.query))
+        for key in keys
+    ]
+    after, before = args.get('after'), args.get('before')
+    for cursor, is_after in ((after, True), (before, False)):
+        if cursor:
+            values = decode_cursor(cursor, keys, page)
+            page = page.filter(get_keyset_condition(keys, values, is_after))
+    backward = first is None and last is not None
+    limit = last if backward else first
+    page = page.order_by(*(key.get_ordering(backward) for key in keys))
+    if limit is not None:
+        page = page[:limit + 1]
+    exact = (count_strategy or settings.COUNT_STRATEGY) == 'exact'
+    if exact and settings.PARALLEL_COUNT and not is_in_transaction():
+        length, items = fetch_page_with_count(
+            get_count_queryset(queryset),
+            page,
+            settings.PARALLEL_COUNT_SNAPSHOT,
+        )
+    else:
+        length = LazyCount(queryset, count_strategy)
+        if not settings.LAZY_COUNT:
+            length = length.get()
+        items = list(page)
+    has_more = limit is not None and len(items) > limit
+    items = items[:limit]
+    if backward:
+        items.reverse()
+        has_previous_page, has_next_page = has_more, bool(before)
+    else:
+        has_previous_page, has_next_page = bool(after), has_more
+        if last is not None and len(items) > last:
+            items = items[len(items) - last:]
+            has_previous_page = True
+    edges = [
+        connection.Edge(
+            node=item,
+            cursor=encode_cursor([getattr(item, key.name) for key in keys]),
+        )
+        for item in items
+    ]
+    resolved_connection = connection_adapter(
+        connection,
+        edges,
+        page_info_adapter(
+            startCursor=edges[0].cursor if edges else None,
+            endCursor=edges[-1].cursor if edges else None,
+            hasPreviousPage=has_previous_page,
+            hasNextPage=has_next_page,
+        ),
+    )
+    resolved_connection.iterable = queryset
+    resolved_connection.length = length
+    return resolved_connection
+
+
+class KeysetConnectionField(AdvancedDjangoFilterConnectionField):
+    """Filter connection field paginated with keyset cursors.
+
+    `AdvancedDjangoFilterConnectionField` with the `keyset_pagination` argument
+    resolves connections with the methods of this class.
+    Iterables that are not QuerySets are paginated with offset cursors.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        kwargs.setdefault('keyset_pagination', True)
+        super().__init__(*args, **kwargs)
+
+    @classmethod
+    def resolve_connection(
+        cls,
+        connection: Type[graphene.Connection],
+        args: Dict[str, Any],
+        iterable: Iterable,
+        max_limit: Optional[int] = None,
+        count_strategy: Optional[str] = None,
+    ) -> graphene.Connection:
+        """Resolve a connection with keyset cursors."""
+        iterable = maybe_queryset(iterable)
+        if not isinstance(iterable, models.QuerySet):
+            return super().resolve_connection(connection, args, iterable, max_limit)
+        return resolve_keyset_connection(connection, args, iterable, max_limit, count_strategy)
+
+    @classmethod
+    async def async_resolve_connection(
+        cls,
+        connection: Type[graphene.Connection],
+        args: Dict[str, Any],
+        iterable: Iterable,
+        max_limit: Optional[int] = None,
+        count_strategy: Optional[str] = None,
+    ) -> graphene.Connection:
+        """Resolve a connection with keyset cursors in a thread."""
+        return await sync_to_async(cls.resolve_connection)(
+            connection, args, iterable, max_limit, count_strategy,
+        )
@@ -0,0 +1,84 @@
+"""Complexity limits of filter trees.
+
+Limits are checked on the raw filter argument before forms and Q objects are built,
+so a crafted argument cannot make the server do expensive work.
+Each limit is set with Django settings and is disabled if its value is None.
+"""
+
+from typing import Any, Dict, Optional
+
+from django.core.exceptions import ValidationError
+from django.db.models.constants import LOOKUP_SEP
+
+from .conf import settings
+from .filters import SearchQueryFilter, SearchRankFilter, TrigramFilter
+
+SEARCH_QUERY_KEYS = (SearchQueryFilter.postfix, SearchRankFilter.postfix)
+
+
+def check_filter_limits(filter_arg: Dict[str, Any]) -> None:
+    """Raise a ValidationError if a filter argument exceeds complexity limits."""
+    FilterLimitsChecker().check_node(filter_arg, 1)
+
+
+class FilterLimitsChecker:
+    """Checker of complexity limits of a filter tree."""
+
+    def __init__(self) -> None:
+        self.node_count = 0
+        self.search_clause_count = 0
+
+    @staticmethod
+    def check_limit(name: str, value: int, description: str) -> None:
+        """Raise a ValidationError if a value exceeds the limit with the setting name."""
+        limit: Optional[int] = getattr(settings, name)
+        if limit is not None and value > limit:
+            raise ValidationError(
+                f'The {description} exceeds the limit of {limit}.',
+                code='limit',
+            )
+
+    def check_node(self, node: Dict[str, Any], depth: int) -> None:
+        """Check a filter tree node and its subtrees."""
+        self.node_count += 1
+        self.check_limit('MAX_FILTER_DEPTH', depth, 'filter depth')
+        self.check_limit('MAX_FILTER_NODES', self.node_count, 'number of filter nodes')
+        for key, value in node.items():
+            if key in (settings.AND_KEY, settings.OR_KEY):
+                self.check_limit('MAX_FILTER_FAN_OUT', len(value), f'number of `{key}` branches')
+                for subtree in value:
+                    self.check_node(subtree, depth + 1)
+            elif key == settings.NOT_KEY:
+                self.check_node(value, depth + 1)
+            else:
+                self.check_value(key, value)
+
+    def check_value(self, key: str, value: Any) -> None:
+        """Check a value of a field or a lookup.
+
+        Full text search filters are at the top level of a node,
+        and trigram filters are lookups of fields.
+        """
+        segments = key.split(LOOKUP_SEP)
+        is_search_query = key in SEARCH_QUERY_KEYS
+        if is_search_query or (len(segments) > 1 and segments[-1] == TrigramFilter.postfix):
+            self.search_clause_count += 1
+            self.check_limit(
+                'MAX_SEARCH_CLAUSES',
+                self.search_clause_count,
+                'number of full text and trigram search clauses',
+            )
+            if is_search_query:
+                self.check_search_query(value.get('query') or {}, 1)
+        elif isinstance(value, dict):
+            for subkey, subvalue in value.items():
+                self.check_value(f'{key}{LOOKUP_SEP}{subkey}', subvalue)
+        elif isinstance(value, (list, tuple)):
+            self.check_limit('MAX_FILTER_LIST_LENGTH', len(value), f'length of the `{key}` list')
+
+    def check_search_query(self, search_query: Dict[str, Any], depth: int) -> None:
+        """Check a search query and its subqueries."""
+        self.check_limit('MAX_SEARCH_QUERY_DEPTH', depth, 'search query depth')
+        for key in (settings.AND_KEY, settings.OR_KEY, settings.NOT_KEY):
+            for subquery in search_query.get(key) or []:
+                self.check_search_query(subquery, depth + 1)
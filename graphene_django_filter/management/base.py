@@ -0,0 +1,35 @@
+"""Base classes of management commands."""
+
+from argparse import ArgumentParser
+
+from django.core.management.base import BaseCommand
+
+from ..index_advisor import import_filterset_modules
+
+
+class FilterSetCommand(BaseCommand):
+    """Command that works with `AdvancedFilterSet` classes declared in imported modules.
+
+    Modules are imported before `handle_filtersets` is called.
+    """
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Add the `--module` argument."""
+        parser.add_argument(
+            '--module',
+            action='append',
+            default=[],
+            help='Module that declares filtersets. '
+                 'The `filtersets` and `schema` modules of applications are imported by default.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Import modules that declare filtersets and handle the command."""
+        import_filterset_modules(options['module'])
+        self.handle_filtersets(*args, **options)
+
+    def handle_filtersets(self, *args, **options) -> None:
+        """Handle the command after filtersets are imported."""
+        raise NotImplementedError(
+            'Subclasses of FilterSetCommand must provide a handle_filtersets() method.',
+        )
@@ -0,0 +1,72 @@
+"""`advise_filterset_indexes` management command."""
+
+from argparse import ArgumentParser
+from typing import List
+
+from django.db.migrations.operations.base import Operation
+from django.db.migrations.writer import OperationWriter
+
+from ..base import FilterSetCommand
+from ...index_advisor import (
+    advise_indexes,
+    get_migration_operations,
+    read_filter_inputs,
+)
+
+
+class Command(FilterSetCommand):
+    """Recommend indexes for lookups of `AdvancedFilterSet` classes."""
+
+    help = 'Recommend indexes for lookups of AdvancedFilterSet classes.'
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Add command arguments."""
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--inputs',
+            help='File with captured filter inputs, a JSON object with `model` '
+                 'and `filter` keys on each line. Only used filters are considered.',
+        )
+        parser.add_argument(
+            '--search-config',
+            help='Text search config of search vector indexes.',
+        )
+
+    def handle_filtersets(self, *args, **options) -> None:
+        """Print index recommendations and migration operations."""
+        advices = advise_indexes(
+            inputs=read_filter_inputs(options['inputs']) if options['inputs'] else None,
+            search_config=options['search_config'],
+        )
+        for advice in advices:
+            if advice.existing is not None:
+                status = f'served by {advice.existing}'
+            elif advice.index is not None:
+                status = f'missing {advice.index.name}'
+            else:
+                status = f'not indexable: {advice.note}'
+            usage = f' ({advice.usage} uses)' if advice.usage else ''
+            self.stdout.write(f'{advice.model._meta.label}: {status}{usage}')
+            for filter_name in advice.filters:
+                self.stdout.write(f'    {filter_name}')
+        for app_label, operations in get_migration_operations(advices).items():
+            self.write_operations(app_label, operations)
+
+    def write_operations(self, app_label: str, operations: List[Operation]) -> None:
+        """Write migration operations of an application."""
+        imports = {'from django.db import migrations'}
+        operation_strings = []
+        for operation in operations:
+            writer = OperationWriter(operation, indentation=2)
+            operation_string, operation_imports = writer.serialize()
+            imports.update(operation_imports)
+            operation_strings.append(operation_string)
+        self.stdout.write('')
+        self.stdout.write(f'# Migration operations of the `{app_label}` application')
+        for import_line in sorted(imports):
+            self.stdout.write(import_line)
+        self.stdout.write('')
+        self.stdout.write('    operations = [')
+        for operation_string in operation_strings:
+            self.stdout.write(operation_string)
+        self.stdout.write('    ]')
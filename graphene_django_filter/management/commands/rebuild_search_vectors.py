@@ -0,0 +1,76 @@
+"""`rebuild_search_vectors` management command."""
+
+from argparse import ArgumentParser
+
+from django.apps import apps
+from django.core.management.base import CommandError
+
+from ..base import FilterSetCommand
+from ...search_vectors import get_search_vector_columns, rebuild_search_vectors
+
+
+class Command(FilterSetCommand):
+    """Rebuild stored search vector columns declared in `AdvancedFilterSet` classes."""
+
+    help = 'Rebuild stored search vector columns declared in AdvancedFilterSet classes.'
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Add command arguments."""
+        super().add_arguments(parser)
+        parser.add_argument(
+            'models',
+            nargs='*',
+            help='Labels of models to rebuild, all models with search vectors by default.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows updated in one transaction.',
+        )
+        parser.add_argument(
+            '--throttle',
+            type=float,
+            default=0,
+            help='Seconds to sleep between batches.',
+        )
+        parser.add_argument(
+            '--start-after',
+            help='Primary key after which the rebuild starts, to resume an interrupted rebuild '
+                 'of a single model.',
+        )
+        parser.add_argument(
+            '--missing',
+            action='store_true',
+            help='Rebuild only rows without a search vector.',
+        )
+
+    def handle_filtersets(self, *args, **options) -> None:
+        """Rebuild search vectors printing the progress after each batch."""
+        columns = get_search_vector_columns()
+        models = list(dict.fromkeys(column.model for column in columns))
+        if options['models']:
+            models = [apps.get_model(label) for label in options['models']]
+        if options['start_after'] is not None and len(models) != 1:
+            raise CommandError('The `--start-after` option requires a single model.')
+        for model in models:
+            model_columns = [column for column in columns if column.model is model]
+            if not model_columns:
+                raise CommandError(f'The `{model._meta.label}` model has no search vectors.')
+            start_after = options['start_after']
+            if start_after is not None:
+                start_after = model._meta.pk.to_python(start_after)
+            progress = None
+            for progress in rebuild_search_vectors(
+                model,
+                model_columns,
+                batch_size=options['batch_size'],
+                throttle=options['throttle'],
+                start_after=start_after,
+                missing_only=options['missing'],
+            ):
+                self.stdout.write(
+                    f'{model._meta.label}: {progress.rows} rows, last pk {progress.last_pk}',
+                )
+            rows = progress.rows if progress else 0
+            self.stdout.write(f'{model._meta.label}: rebuilt {rows} rows')
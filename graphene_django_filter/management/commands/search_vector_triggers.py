@@ -0,0 +1,30 @@
+"""`search_vector_triggers` management command."""
+
+from django.db import migrations
+from django.db.migrations.writer import OperationWriter
+
+from ..base import FilterSetCommand
+from ...search_vectors import get_search_vector_columns, get_search_vector_trigger_sql
+
+
+class Command(FilterSetCommand):
+    """Print migration operations creating triggers that maintain stored search vectors."""
+
+    help = 'Print migration operations creating triggers that maintain stored search vectors.'
+
+    def handle_filtersets(self, *args, **options) -> None:
+        """Print `RunSQL` operations grouped by application labels."""
+        operations = {}
+        for column in get_search_vector_columns():
+            create_sql, drop_sql = get_search_vector_trigger_sql(column)
+            operations.setdefault(column.model._meta.app_label, []).append(
+                migrations.RunSQL(create_sql, drop_sql),
+            )
+        for app_label, app_operations in operations.items():
+            self.stdout.write(f'# Migration operations of the `{app_label}` application')
+            self.stdout.write('from django.db import migrations')
+            self.stdout.write('')
+            self.stdout.write('    operations = [')
+            for operation in app_operations:
+                self.stdout.write(OperationWriter(operation, indentation=2).serialize()[0])
+            self.stdout.write('    ]')
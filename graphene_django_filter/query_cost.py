@@ -0,0 +1,54 @@
+"""Planner-based cost guard for filtered querysets.
+
+The guard asks the database planner to estimate a filtered queryset with `EXPLAIN`
+and rejects it if the estimated cost or number of rows exceeds thresholds.
+Only PostgreSQL provides cost estimates, querysets of other databases are not checked.
+"""
+
+import json
+from typing import NamedTuple, Optional
+
+from django.db import connections, models
+from graphql import GraphQLError
+
+
+class QueryCost(NamedTuple):
+    """Planner estimate of a query."""
+
+    cost: float
+    rows: float
+
+
+def estimate_query_cost(queryset: models.QuerySet) -> Optional[QueryCost]:
+    """Return the planner estimate of a queryset or None if the database does not provide it."""
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    explanation = queryset.explain(format='json')
+    plans = json.loads(explanation) if isinstance(explanation, str) else explanation
+    plan = plans[0]['Plan']
+    return QueryCost(cost=plan['Total Cost'], rows=plan['Plan Rows'])
+
+
+def check_query_cost(
+    queryset: models.QuerySet,
+    max_cost: Optional[float] = None,
+    max_rows: Optional[float] = None,
+) -> None:
+    """Raise a GraphQLError if the planner estimate of a queryset exceeds thresholds."""
+    if max_cost is None and max_rows is None:
+        return
+    query_cost = estimate_query_cost(queryset)
+    if query_cost is None:
+        return
+    if (max_cost is not None and query_cost.cost > max_cost) or \
+            (max_rows is not None and query_cost.rows > max_rows):
+        raise GraphQLError(
+            'The filter is too expensive to execute.',
+            extensions={
+                'code': 'QUERY_COST_EXCEEDED',
+                'cost': query_cost.cost,
+                'rows': query_cost.rows,
+                'maxCost': max_cost,
+                'maxRows': max_rows,
+            },
+        )
@@ -0,0 +1,459 @@
+"""Boolean optimization of Q objects built from filter trees.
+
+Filters created by user interfaces are often redundant.
+The `optimize_q` function rewrites a Q object before it reaches the ORM:
+it flattens nested groups, removes duplicate predicates, folds equalities into `in` lookups,
+merges bounds into ranges, pushes negations down to the leaves,
+factors common conjuncts out of disjunctions and detects contradictions.
+All rewrites are valid for rows of one filter call,
+negations are pushed only through predicates on single-valued paths.
+"""
+
+from datetime import date, datetime, time
+from decimal import Decimal
+from numbers import Number
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Set, Tuple, Union
+from uuid import UUID
+
+from django.core.exceptions import FieldError
+from django.db import models
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.sql import Query
+
+EQUALITY_LOOKUPS = ('exact', 'in')
+BOUND_LOOKUPS = ('gt', 'gte', 'lt', 'lte')
+# Values of these types are compared by databases in the same way as in Python.
+# Strings are excluded because the comparison depends on a collation.
+ORDERED_TYPES = (int, float, Decimal, date, datetime, time, UUID)
+
+
+class LookupInfo(NamedTuple):
+    """Result of the analysis of a lookup key."""
+
+    field_path: Optional[str]
+    lookup: Optional[str]
+    is_multivalued: bool
+
+
+def analyse_lookup(query: Query, key: str) -> LookupInfo:
+    """Split a lookup key into a field path and a lookup and check if the path is multivalued.
+
+    The field path and the lookup are None if the key contains transforms or cannot be resolved.
+    """
+    parts = key.split(LOOKUP_SEP)
+    for i in range(len(parts), 0, -1):
+        if LOOKUP_SEP.join(parts[:i]) in query.annotations:
+            return make_lookup_info(parts, parts[i:], False)
+    try:
+        path, _, _, lookup_parts = query.names_to_path(parts, query.get_meta())
+    except FieldError:
+        return LookupInfo(None, None, True)
+    return make_lookup_info(parts, lookup_parts, any(path_info.m2m for path_info in path))
+
+
+def make_lookup_info(parts: List[str], lookup_parts: List[str], is_multivalued: bool) -> LookupInfo:
+    """Create a lookup info from lookup key parts and its trailing non-field parts."""
+    if len(lookup_parts) > 1:
+        return LookupInfo(None, None, is_multivalued)
+    field_path = LOOKUP_SEP.join(parts[:len(parts) - len(lookup_parts)])
+    return LookupInfo(field_path, lookup_parts[0] if lookup_parts else 'exact', is_multivalued)
+
+
+class Leaf:
+    """Predicate of a filter tree."""
+
+    __slots__ = ('child', 'negated', 'info')
+
+    def __init__(self, child: Any, negated: bool, info: LookupInfo) -> None:
+        self.child = child
+        self.negated = negated
+        self.info = info
+
+    @property
+    def key(self) -> Optional[str]:
+        """Return a lookup key if the predicate is a lookup."""
+        return self.child[0] if isinstance(self.child, tuple) else None
+
+    @property
+    def value(self) -> Any:
+        """Return a lookup value if the predicate is a lookup."""
+        return self.child[1] if isinstance(self.child, tuple) else None
+
+    def negate(self) -> 'Leaf':
+        """Return the negated predicate."""
+        return Leaf(self.child, not self.negated, self.info)
+
+    def with_lookup(self, lookup: str, value: Any) -> 'Leaf':
+        """Return the predicate on the same field path with another lookup."""
+        info = self.info._replace(lookup=lookup)
+        return Leaf((f'{info.field_path}{LOOKUP_SEP}{lookup}', value), self.negated, info)
+
+
+class Group:
+    """Conjunction or disjunction of filter tree nodes."""
+
+    __slots__ = ('connector', 'children')
+
+    def __init__(self, connector: str, children: List['Node']) -> None:
+        self.connector = connector
+        self.children = children
+
+    def negate(self) -> 'Group':
+        """Return the negated group applying De Morgan's laws."""
+        connector = models.Q.OR if self.connector == models.Q.AND else models.Q.AND
+        return Group(connector, [child.negate() for child in self.children])
+
+
+class Not:
+    """Negation that cannot be pushed down to the leaves."""
+
+    __slots__ = ('child',)
+
+    def __init__(self, child: 'Node') -> None:
+        self.child = child
+
+    def negate(self) -> 'Node':
+        """Return the node without the negation."""
+        return self.child
+
+
+class Constant:
+    """Always true or always false node."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: bool) -> None:
+        self.value = value
+
+    def negate(self) -> 'Constant':
+        """Return the opposite constant."""
+        return TRUE if not self.value else FALSE
+
+
+Node = Union[Leaf, Group, Not, Constant]
+TRUE = Constant(True)
+FALSE = Constant(False)
+
+
+def optimize_q(q: models.Q, query: Query) -> Optional[models.Q]:
+    """Return an optimized Q object or None if the Q object never matches."""
+    optimizer = QOptimizer(query)
+    node = optimizer.simplify(optimizer.to_node(q))
+    if node is FALSE:
+        return None
+    if node is TRUE:
+        return models.Q()
+    return optimizer.to_q(node)
+
+
+class QOptimizer:
+    """Rewriter of Q objects for a query."""
+
+    def __init__(self, query: Query) -> None:
+        self.query = query
+        self.lookup_infos: Dict[str, LookupInfo] = {}
+
+    def get_lookup_info(self, key: str) -> LookupInfo:
+        """Return a cached lookup info."""
+        if key not in self.lookup_infos:
+            self.lookup_infos[key] = analyse_lookup(self.query, key)
+        return self.lookup_infos[key]
+
+    def to_node(self, q: Union[models.Q, Any]) -> Node:
+        """Convert a Q object or its child to a node."""
+        if isinstance(q, models.Q):
+            node = Group(q.connector, [self.to_node(child) for child in q.children])
+            return Not(node) if q.negated else node
+        if isinstance(q, tuple):
+            return Leaf(q, False, self.get_lookup_info(q[0]))
+        return Leaf(q, False, LookupInfo(None, None, True))
+
+    def to_q(self, node: Node) -> models.Q:
+        """Convert a node to a Q object."""
+        if isinstance(node, Leaf):
+            q = models.Q(node.child)
+            return ~q if node.negated else q
+        if isinstance(node, Not):
+            return ~self.to_q(node.child)
+        children = []
+        for child in node.children:
+            if isinstance(child, Leaf) and not child.negated:
+                children.append(child.child)
+            else:
+                children.append(self.to_q(child))
+        return models.Q(*children, _connector=node.connector)
+
+    def simplify(self, node: Node) -> Node:
+        """Return a simplified node."""
+        if isinstance(node, Leaf):
+            if node.info.lookup == 'in' and not node.negated and is_empty(node.value):
+                return FALSE
+            if node.info.lookup == 'in' and node.negated and is_empty(node.value):
+                return TRUE
+            return node
+        if isinstance(node, Not):
+            if is_negatable(node.child):
+                return self.simplify(node.child.negate())
+            child = self.simplify(node.child)
+            if isinstance(child, Constant):
+                return child.negate()
+            return Not(child)
+        if isinstance(node, Constant):
+            return node
+        return self.simplify_group(node)
+
+    def simplify_group(self, group: Group) -> Node:
+        """Return a simplified conjunction or disjunction."""
+        is_and = group.connector == models.Q.AND
+        children: List[Node] = []
+        signatures = set()
+        for child in map(self.simplify, group.children):
+            if isinstance(child, Constant):
+                if child.value != is_and:
+                    return child
+                continue
+            nested = child.children if isinstance(child, Group) and \
+                child.connector == group.connector else (child,)
+            for nested_child in nested:
+                signature = get_signature(nested_child)
+                if signature not in signatures:
+                    signatures.add(signature)
+                    children.append(nested_child)
+        if is_and:
+            result = merge_conjunction(children)
+        else:
+            result = factor_disjunction(fold_disjunction(children))
+        if isinstance(result, list):
+            if len(result) == 0:
+                return TRUE if is_and else FALSE
+            if len(result) == 1:
+                return result[0]
+            return Group(group.connector, result)
+        return result if isinstance(result, Constant) else self.simplify(result)
+
+
+def is_negatable(node: Node) -> bool:
+    """Determine whether a negation can be pushed down to leaves of a node.
+
+    Negated predicates on multivalued paths are compiled into subqueries,
+    therefore the negation is not pushed through them.
+    """
+    if isinstance(node, Leaf):
+        return node.info.field_path is not None and not node.info.is_multivalued
+    if isinstance(node, Group):
+        return all(is_negatable(child) for child in node.children)
+    return isinstance(node, (Not, Constant))
+
+
+def is_empty(value: Any) -> bool:
+    """Determine whether a lookup value is an empty collection."""
+    return isinstance(value, (list, tuple, set, frozenset)) and len(value) == 0
+
+
+def freeze(value: Any) -> Hashable:
+    """Return a hashable representation of a lookup value."""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(v) for v in value)
+    hash(value)
+    return value
+
+
+def get_signature(node: Node) -> Hashable:
+    """Return a hashable signature of a node used to find duplicates."""
+    try:
+        if isinstance(node, Leaf):
+            return 'leaf', node.negated, freeze(node.child)
+        if isinstance(node, Not):
+            return 'not', get_signature(node.child)
+        if isinstance(node, Group):
+            return node.connector, frozenset(get_signature(child) for child in node.children)
+    except TypeError:
+        pass
+    return 'node', id(node)
+
+
+def is_comparable_leaf(node: Node, lookups: Tuple[str, ...]) -> bool:
+    """Determine whether a node is a non-negated predicate with one of lookups."""
+    return isinstance(node, Leaf) and not node.negated and node.info.lookup in lookups
+
+
+def get_equality_values(leaf: Leaf) -> Optional[List[Any]]:
+    """Return values matched by an equality predicate or None if they are unknown."""
+    if leaf.info.lookup == 'in':
+        if not isinstance(leaf.value, (list, tuple, set, frozenset)):
+            return None
+        values = list(leaf.value)
+    else:
+        values = [leaf.value]
+    if any(value is None or hasattr(value, 'resolve_expression') for value in values):
+        return None
+    try:
+        for value in values:
+            hash(value)
+    except TypeError:
+        return None
+    return values
+
+
+def fold_disjunction(children: List[Node]) -> List[Node]:
+    """Fold equality predicates on the same field path into the `in` lookup."""
+    groups: Dict[str, List[int]] = {}
+    for i, child in enumerate(children):
+        if is_comparable_leaf(child, EQUALITY_LOOKUPS) and get_equality_values(child) is not None:
+            groups.setdefault(child.info.field_path, []).append(i)
+    replacements: Dict[int, Optional[Node]] = {}
+    for indexes in groups.values():
+        if len(indexes) < 2:
+            continue
+        values: Dict[Any, None] = {}
+        for i in indexes:
+            values.update(dict.fromkeys(get_equality_values(children[i])))
+            replacements[i] = None
+        replacements[indexes[0]] = children[indexes[0]].with_lookup('in', list(values))
+    return [
+        replacements.get(i, child) for i, child in enumerate(children)
+        if replacements.get(i, child) is not None
+    ]
+
+
+def factor_disjunction(children: List[Node]) -> Union[List[Node], Node]:
+    """Factor conjuncts common to all branches out of a disjunction."""
+    if len(children) < 2:
+        return children
+    branches = [
+        child.children if isinstance(child, Group) else [child] for child in children
+    ]
+    branch_signatures = [[get_signature(node) for node in branch] for branch in branches]
+    common = set(branch_signatures[0]).intersection(*branch_signatures[1:])
+    if not common:
+        return children
+    common_nodes = [
+        node for node, signature in zip(branches[0], branch_signatures[0]) if signature in common
+    ]
+    rest = [
+        [node for node, signature in zip(branch, signatures) if signature not in common]
+        for branch, signatures in zip(branches, branch_signatures)
+    ]
+    if any(len(branch) == 0 for branch in rest):
+        return Group(models.Q.AND, common_nodes)
+    return Group(models.Q.AND, [
+        *common_nodes,
+        Group(
+            models.Q.OR,
+            [branch[0] if len(branch) == 1 else Group(models.Q.AND, branch) for branch in rest],
+        ),
+    ])
+
+
+def merge_conjunction(children: List[Node]) -> Union[List[Node], Constant]:
+    """Intersect equalities, merge bounds into ranges and detect contradictions."""
+    groups: Dict[str, List[int]] = {}
+    for i, child in enumerate(children):
+        if is_comparable_leaf(child, (*EQUALITY_LOOKUPS, *BOUND_LOOKUPS)):
+            groups.setdefault(child.info.field_path, []).append(i)
+    replacements: Dict[int, List[Node]] = {}
+    for indexes in groups.values():
+        if len(indexes) < 2:
+            continue
+        try:
+            merged = merge_field_predicates([children[i] for i in indexes])
+        except TypeError:
+            continue
+        if merged is FALSE:
+            return FALSE
+        if merged is None:
+            continue
+        for i in indexes:
+            replacements[i] = []
+        replacements[indexes[0]] = merged
+    result: List[Node] = []
+    for i, child in enumerate(children):
+        result.extend(replacements.get(i, [child]))
+    return result
+
+
+def is_ordered_value(value: Any) -> bool:
+    """Determine whether a value is compared by databases in the same way as in Python."""
+    return isinstance(value, ORDERED_TYPES) and not isinstance(value, bool)
+
+
+def get_equatable_value(value: Any) -> Any:
+    """Return a value compared by databases, the primary key of a model instance."""
+    return value.pk if isinstance(value, models.Model) else value
+
+
+def get_value_kind(value: Any) -> Any:
+    """Return a kind of values that Python compares in the same way as databases."""
+    return Number if isinstance(value, Number) else type(value)
+
+
+def merge_field_predicates(leaves: List[Leaf]) -> Union[List[Node], Constant, None]:
+    """Merge conjunct predicates on the same field path.
+
+    Model instances are compared by their primary keys.
+    Return None if the predicates cannot be merged,
+    for example if values of different kinds, such as dates and strings, are compared.
+    """
+    allowed: Optional[Dict[Any, None]] = None
+    lower: Optional[Tuple[Any, bool]] = None
+    upper: Optional[Tuple[Any, bool]] = None
+    kinds: Set[Any] = set()
+    for leaf in leaves:
+        if leaf.info.lookup in EQUALITY_LOOKUPS:
+            values = get_equality_values(leaf)
+            if values is None:
+                return None
+            values = [get_equatable_value(value) for value in values]
+            if not all(map(is_ordered_value, values)):
+                return None
+            kinds.update(map(get_value_kind, values))
+            if len(kinds) > 1:
+                return None
+            allowed = dict.fromkeys(
+                values if allowed is None else (value for value in values if value in allowed),
+            )
+            continue
+        if not is_ordered_value(leaf.value):
+            return None
+        kinds.add(get_value_kind(leaf.value))
+        if len(kinds) > 1:
+            return None
+        strict = leaf.info.lookup in ('gt', 'lt')
+        if leaf.info.lookup in ('gt', 'gte'):
+            if lower is None or leaf.value > lower[0] or (leaf.value == lower[0] and strict):
+                lower = (leaf.value, strict)
+        elif upper is None or leaf.value < upper[0] or (leaf.value == upper[0] and strict):
+            upper = (leaf.value, strict)
+    if allowed is not None:
+        values = [value for value in allowed if is_within_bounds(value, lower, upper)]
+        if len(values) == 0:
+            return FALSE
+        if len(values) == 1:
+            return [leaves[0].with_lookup('exact', values[0])]
+        return [leaves[0].with_lookup('in', values)]
+    if lower and upper:
+        if lower[0] > upper[0] or (lower[0] == upper[0] and (lower[1] or upper[1])):
+            return FALSE
+        if not lower[1] and not upper[1]:
+            return [leaves[0].with_lookup('range', (lower[0], upper[0]))]
+    return [
+        leaves[0].with_lookup(lookup, bound[0])
+        for lookup, bound in (
+            ('gt' if lower and lower[1] else 'gte', lower),
+            ('lt' if upper and upper[1] else 'lte', upper),
+        )
+        if bound is not None
+    ]
+
+
+def is_within_bounds(
+    value: Any,
+    lower: Optional[Tuple[Any, bool]],
+    upper: Optional[Tuple[Any, bool]],
+) -> bool:
+    """Determine whether a value satisfies lower and upper bounds."""
+    if lower and (value < lower[0] or (value == lower[0] and lower[1])):
+        return False
+    return not (upper and (value > upper[0] or (value == upper[0] and upper[1])))
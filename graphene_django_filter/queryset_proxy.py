@@ -0,0 +1,64 @@
+"""`QuerySetProxy` class module.
+
+The class is imported only by filters with the `method` argument, because it depends on wrapt.
+"""
+
+from typing import Any, Iterator, Optional
+
+from django.db import models
+from wrapt import ObjectProxy
+
+
+class QuerySetProxy(ObjectProxy):
+    """Proxy for a QuerySet object.
+
+    The Django-filter library works with QuerySet objects,
+    but such objects do not provide the ability to apply the negation operator to the entire object.
+    Therefore, it is convenient to work with the Q object instead of the QuerySet.
+    This class replaces the original QuerySet object,
+    and creates a Q object when calling the `filter` and `exclude` methods.
+    """
+
+    __slots__ = 'q'
+
+    def __init__(self, wrapped: models.QuerySet, q: Optional[models.Q] = None) -> None:
+        super().__init__(wrapped)
+        self.q = q or models.Q()
+
+    def __getattr__(self, name: str) -> Any:
+        """Return QuerySet attributes for all cases except `filter` and `exclude`."""
+        if name == 'filter':
+            return self.filter_
+        elif name == 'exclude':
+            return self.exclude_
+        attr = super().__getattr__(name)
+        if callable(attr):
+            def func(*args, **kwargs) -> Any:
+                result = attr(*args, **kwargs)
+                if isinstance(result, models.QuerySet):
+                    return QuerySetProxy(result, self.q)
+                return result
+            return func
+        return attr
+
+    def __iter__(self) -> Iterator[Any]:
+        """Return QuerySet and Q objects."""
+        return iter([self.__wrapped__, self.q])
+
+    def filter_(self, *args, **kwargs) -> 'QuerySetProxy':
+        """Replace the `filter` method of the QuerySet class."""
+        if len(kwargs) == 0 and len(args) == 1 and isinstance(args[0], models.Q):
+            q = args[0]
+        else:
+            q = models.Q(*args, **kwargs)
+        self.q = self.q & q
+        return self
+
+    def exclude_(self, *args, **kwargs) -> 'QuerySetProxy':
+        """Replace the `exclude` method of the QuerySet class."""
+        if len(kwargs) == 0 and len(args) == 1 and isinstance(args[0], models.Q):
+            q = args[0]
+        else:
+            q = models.Q(*args, **kwargs)
+        self.q = self.q & ~q
+        return self
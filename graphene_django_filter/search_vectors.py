@@ -0,0 +1,200 @@
+"""Maintenance of stored search vector columns.
+
+Columns declared in the `search_vectors` argument of the FilterSet Meta class are kept up to date
+by a `post_save` signal handler or by a database trigger, and they are rebuilt
+in keyset-ordered batches, so a backfill of a large table does not lock it with a single UPDATE.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type
+
+from django.contrib.postgres.search import SearchVector
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, models, router, transaction
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.signals import post_save
+
+from .filterset import AdvancedFilterSet
+
+SIGNAL_COLUMNS: Dict[Type[models.Model], List['SearchVectorColumn']] = {}
+
+
+class SearchVectorColumn(NamedTuple):
+    """Stored search vector column with fields, config and weight of its vector."""
+
+    model: Type[models.Model]
+    column: str
+    fields: Tuple[str, ...]
+    config: Optional[str] = None
+    weight: Optional[str] = None
+
+    @property
+    def expression(self) -> SearchVector:
+        """Return the search vector expression computing the column value."""
+        return SearchVector(*self.fields, config=self.config, weight=self.weight)
+
+
+class RebuildProgress(NamedTuple):
+    """Progress of a search vector rebuild after a batch."""
+
+    model: Type[models.Model]
+    rows: int
+    last_pk: object
+
+
+def get_search_vector_columns(
+    filterset_classes: Optional[Iterable[Type[AdvancedFilterSet]]] = None,
+) -> List[SearchVectorColumn]:
+    """Return stored search vector columns declared in filtersets.
+
+    Columns can only be computed from fields of their own model.
+    """
+    if filterset_classes is None:
+        from .index_advisor import get_filterset_classes
+        filterset_classes = get_filterset_classes()
+    columns: Dict[Tuple[Type[models.Model], str], SearchVectorColumn] = OrderedDict()
+    for filterset_class in filterset_classes:
+        model = filterset_class._meta.model
+        metadata = filterset_class.get_metadata()
+        for column, (fields, config, weight) in metadata.search_vectors.items():
+            if any(LOOKUP_SEP in field for field in fields):
+                raise ImproperlyConfigured(
+                    f'The `{column}` search vector of `{filterset_class.__name__}` '
+                    'cannot be computed from fields of related models.',
+                )
+            columns.setdefault(
+                (model, column),
+                SearchVectorColumn(model, column, fields, config, weight),
+            )
+    return list(columns.values())
+
+
+def connect_search_vector_signals(
+    filterset_classes: Optional[Iterable[Type[AdvancedFilterSet]]] = None,
+) -> None:
+    """Update stored search vectors of saved instances.
+
+    Call it in the `ready` method of an application config.
+    Without filterset classes, the `filtersets` and `schema` modules of applications
+    are imported first, because they are not imported yet when applications are ready.
+    """
+    if filterset_classes is None:
+        from .index_advisor import import_filterset_modules
+        import_filterset_modules()
+    for column in get_search_vector_columns(filterset_classes):
+        model_columns = SIGNAL_COLUMNS.setdefault(column.model, [])
+        if column not in model_columns:
+            model_columns.append(column)
+        post_save.connect(
+            update_search_vectors,
+            sender=column.model,
+            dispatch_uid=f'graphene_django_filter_search_vectors_{column.model._meta.label}',
+        )
+
+
+def disconnect_search_vector_signals() -> None:
+    """Stop updating stored search vectors of saved instances."""
+    for model in SIGNAL_COLUMNS:
+        post_save.disconnect(
+            sender=model,
+            dispatch_uid=f'graphene_django_filter_search_vectors_{model._meta.label}',
+        )
+    SIGNAL_COLUMNS.clear()
+
+
+def update_search_vectors(
+    sender: Type[models.Model],
+    instance: models.Model,
+    update_fields: Optional[Iterable[str]] = None,
+    using: Optional[str] = None,
+    **kwargs
+) -> None:
+    """Update stored search vectors of a saved instance if their fields could change."""
+    columns = [
+        column for column in SIGNAL_COLUMNS.get(sender, [])
+        if update_fields is None or set(column.fields) & set(update_fields)
+    ]
+    if columns:
+        sender._base_manager.using(using).filter(pk=instance.pk).update(
+            **{column.column: column.expression for column in columns},
+        )
+
+
+def rebuild_search_vectors(
+    model: Type[models.Model],
+    columns: Iterable[SearchVectorColumn],
+    batch_size: int = 1000,
+    throttle: float = 0,
+    start_after: Optional[object] = None,
+    missing_only: bool = False,
+) -> Iterator[RebuildProgress]:
+    """Rebuild stored search vectors of a model in batches ordered by the primary key.
+
+    Each batch is updated in its own transaction, and progress is yielded after it,
+    so a rebuild can be resumed from the last primary key.
+    """
+    columns = [column for column in columns if column.model is model]
+    using = router.db_for_write(model)
+    queryset = model._base_manager.using(using).order_by('pk')
+    if missing_only:
+        missing = models.Q()
+        for column in columns:
+            missing |= models.Q(**{f'{column.column}__isnull': True})
+        queryset = queryset.filter(missing)
+    rows, last_pk = 0, start_after
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        pks = list(batch.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return
+        with transaction.atomic(using=using):
+            model._base_manager.using(using).filter(pk__in=pks).update(
+                **{column.column: column.expression for column in columns},
+            )
+        rows, last_pk = rows + len(pks), pks[-1]
+        yield RebuildProgress(model, rows, last_pk)
+        if throttle:
+            time.sleep(throttle)
+
+
+def get_search_vector_trigger_sql(column: SearchVectorColumn) -> Tuple[str, str]:
+    """Return SQL creating and dropping a PostgreSQL trigger that computes a search vector.
+
+    The trigger computes the same value as the `SearchVector` expression of the column.
+    """
+    quote_name = connections[router.db_for_write(column.model)].ops.quote_name
+    table = column.model._meta.db_table
+    function_name = quote_name(f'{table}_{column.column}_update')
+    trigger_name = quote_name(f'{table}_{column.column}_trigger')
+    field_columns = [column.model._meta.get_field(field).column for field in column.fields]
+    document = " || ' ' || ".join(
+        f"COALESCE((NEW.{quote_name(field_column)})::text, '')" for field_column in field_columns
+    )
+    vector = f'to_tsvector({document})'
+    if column.config:
+        vector = f'to_tsvector({quote_literal(column.config)}::regconfig, {document})'
+    if column.weight:
+        vector = f'setweight({vector}, {quote_literal(column.weight)})'
+    create_sql = (
+        f'CREATE OR REPLACE FUNCTION {function_name}() RETURNS trigger AS $$\n'
+        'BEGIN\n'
+        f'    NEW.{quote_name(column.model._meta.get_field(column.column).column)} := {vector};\n'
+        '    RETURN NEW;\n'
+        'END\n'
+        '$$ LANGUAGE plpgsql;\n'
+        f'CREATE TRIGGER {trigger_name} BEFORE INSERT OR UPDATE OF '
+        f'{", ".join(map(quote_name, field_columns))} ON {quote_name(table)} '
+        f'FOR EACH ROW EXECUTE FUNCTION {function_name}();'
+    )
+    drop_sql = (
+        f'DROP TRIGGER IF EXISTS {trigger_name} ON {quote_name(table)};\n'
+        f'DROP FUNCTION IF EXISTS {function_name}();'
+    )
+    return create_sql, drop_sql
+
+
+def quote_literal(value: str) -> str:
+    """Quote a string literal for SQL."""
+    escaped_value = value.replace("'", "''")
+    return f"'{escaped_value}'"
@@ -0,0 +1,205 @@
+"""Compilation of predicates on multivalued relations into EXISTS subqueries.
+
+Joins of to-many relations multiply rows, so filtered querysets need `distinct`.
+The `use_exists_subqueries` function replaces such predicates with correlated `EXISTS` subqueries,
+which keep rows of the filtered queryset unique.
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Type, Union
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.fields.reverse_related import ForeignObjectRel
+from django.db.models.sql import Query
+from django.db.models.sql.datastructures import Join
+
+
+class MultivaluedPath(NamedTuple):
+    """First to-many relation hop of a lookup key."""
+
+    prefix: str
+    model: Type[models.Model]
+    back_lookup: str
+    outer_ref: str
+    rest_index: int
+
+
+def get_multivalued_path(model: Type[models.Model], key: str) -> Optional[MultivaluedPath]:
+    """Return the first to-many relation hop of a lookup key or None if there is no such hop.
+
+    Relations without a reverse query name, such as hidden or generic ones, are not supported.
+    """
+    parts = key.split(LOOKUP_SEP)
+    opts = model._meta
+    for i, part in enumerate(parts):
+        try:
+            field = opts.pk if part == 'pk' else opts.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if not field.is_relation:
+            return None
+        if isinstance(field, models.ManyToManyField):
+            if field.remote_field.is_hidden():
+                return None
+            back_lookup = field.related_query_name()
+        elif isinstance(field, ForeignObjectRel) and (field.one_to_many or field.many_to_many):
+            back_lookup = field.field.name
+        elif field.one_to_many or field.many_to_many:
+            return None
+        else:
+            opts = field.related_model._meta
+            continue
+        return MultivaluedPath(
+            prefix=LOOKUP_SEP.join(parts[:i + 1]),
+            model=field.related_model,
+            back_lookup=f'{back_lookup}{LOOKUP_SEP}pk',
+            outer_ref=LOOKUP_SEP.join([*parts[:i], 'pk']),
+            rest_index=i + 1,
+        )
+    return None
+
+
+def use_exists_subqueries(q: models.Q, query: Query) -> models.Q:
+    """Replace predicates on to-many relations with EXISTS subqueries.
+
+    Predicates on the same relation path referring to the same related row are combined
+    into one subquery, therefore a path is replaced only if all its predicates
+    are children of one group and are not negated. Other paths are left to the ORM.
+    The `isnull` lookup of a path itself is replaced with a subquery without predicates,
+    negated if rows without related rows are selected.
+    Paths with `isnull=True` lookups of related fields are left to the ORM,
+    which selects rows without related rows for them through an outer join.
+    """
+    rewriter = ExistsRewriter(query)
+    rewriter.collect(q, False)
+    if not rewriter.replaceable_prefixes:
+        return q
+    return rewriter.rewrite(q)
+
+
+class ExistsRewriter:
+    """Rewriter of predicates on to-many relations of a query."""
+
+    def __init__(self, query: Query) -> None:
+        self.query = query
+        self.paths: Dict[str, Optional[MultivaluedPath]] = {}
+        self.prefix_groups: Dict[str, Set[int]] = {}
+        self.negated_prefixes: Set[str] = set()
+        self.null_prefixes: Set[str] = set()
+
+    @property
+    def replaceable_prefixes(self) -> Set[str]:
+        """Return prefixes of paths whose predicates can be replaced."""
+        return {
+            prefix for prefix, groups in self.prefix_groups.items()
+            if len(groups) == 1 and prefix not in self.negated_prefixes | self.null_prefixes
+        }
+
+    def get_path(self, key: str) -> Optional[MultivaluedPath]:
+        """Return a cached multivalued path of a lookup key."""
+        if key not in self.paths:
+            if key.split(LOOKUP_SEP, 1)[0] in self.query.annotations:
+                self.paths[key] = None
+            else:
+                self.paths[key] = get_multivalued_path(self.query.model, key)
+        return self.paths[key]
+
+    def collect(self, q: models.Q, negated: bool) -> None:
+        """Collect groups containing predicates on multivalued paths."""
+        negated = negated or q.negated
+        for child in q.children:
+            if isinstance(child, models.Q):
+                self.collect(child, negated)
+            elif isinstance(child, tuple) and (path := self.get_path(child[0])) is not None:
+                self.prefix_groups.setdefault(path.prefix, set()).add(id(q))
+                if negated:
+                    self.negated_prefixes.add(path.prefix)
+                rest = self.get_rest_child(path, child)
+                if rest[0].endswith(f'{LOOKUP_SEP}isnull') and rest[1] and not is_path_isnull(rest):
+                    self.null_prefixes.add(path.prefix)
+
+    def rewrite(self, q: models.Q) -> models.Q:
+        """Return a Q object with replaced predicates."""
+        if q.negated:
+            return q
+        replaceable_prefixes = self.replaceable_prefixes
+        children: List[Any] = []
+        subquery_children: Dict[str, List[Union[models.Q, tuple]]] = {}
+        for child in q.children:
+            if isinstance(child, models.Q):
+                children.append(self.rewrite(child))
+                continue
+            path = self.get_path(child[0]) if isinstance(child, tuple) else None
+            if path is None or path.prefix not in replaceable_prefixes:
+                children.append(child)
+                continue
+            rest = self.get_rest_child(path, child)
+            if is_path_isnull(rest):
+                exists = self.create_exists(path, [], q.connector)
+                children.append(~exists if rest[1] else exists)
+                continue
+            if path.prefix not in subquery_children:
+                subquery_children[path.prefix] = []
+                children.append(path)
+            subquery_children[path.prefix].append(rest)
+        return models.Q(*(
+            self.create_exists(child, subquery_children[child.prefix], q.connector)
+            if isinstance(child, MultivaluedPath) else child
+            for child in children
+        ), _connector=q.connector)
+
+    @staticmethod
+    def get_rest_child(path: MultivaluedPath, child: tuple) -> tuple:
+        """Return a predicate relative to the related model of a path."""
+        rest = child[0].split(LOOKUP_SEP)[path.rest_index:]
+        value = child[1]
+        if len(rest) == 0 or rest[0] != 'pk' and not is_model_field(path.model, rest[0]):
+            rest = ['pk', *rest]
+            value = get_pk_value(value)
+        return LOOKUP_SEP.join(rest), value
+
+    @staticmethod
+    def create_exists(
+        path: MultivaluedPath,
+        children: List[Union[models.Q, tuple]],
+        connector: str,
+    ) -> models.Exists:
+        """Create a correlated EXISTS subquery for predicates of a path."""
+        return models.Exists(
+            path.model._base_manager.filter(
+                models.Q(*children, _connector=connector),
+                **{path.back_lookup: models.OuterRef(path.outer_ref)},
+            ),
+        )
+
+
+def get_pk_value(value: Any) -> Any:
+    """Replace model instances in a lookup value with their primary keys."""
+    if isinstance(value, models.Model):
+        return value.pk
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return type(value)(get_pk_value(v) for v in value)
+    return value
+
+
+def is_path_isnull(rest_child: tuple) -> bool:
+    """Determine whether a predicate relative to a related model checks a relation for null."""
+    return rest_child[0] == f'pk{LOOKUP_SEP}isnull'
+
+
+def is_model_field(model: Type[models.Model], name: str) -> bool:
+    """Determine whether a model has a field with the name."""
+    try:
+        model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def has_multivalued_joins(query: Query) -> bool:
+    """Determine whether a query joins to-many relations."""
+    return any(
+        isinstance(join, Join) and (join.join_field.one_to_many or join.join_field.many_to_many)
+        for join in query.alias_map.values()
+    )
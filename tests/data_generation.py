@@ -3,6 +3,7 @@
 from datetime import datetime
 from itertools import count
 
+from django.contrib.postgres.search import SearchVector
 from django.db import connection
 from django.utils.timezone import make_aware
 from django_seed import Seed
@@ -20,6 +21,7 @@ def generate_data() -> None:
     generate_task_groups(seeder)
     seeder.execute()
     set_task_groups_tasks()
+    Task.objects.update(search_vector=SearchVector('name'))
 
 
 def reset_sequences() -> None:
@@ -81,6 +83,7 @@ def generate_tasks(seeder: Seeder) -> None:
     seeder.add_entity(
         Task, 15, {
             'user_id': 1,
+            'search_vector': None,
             'created_at': make_aware(datetime.strptime('01/01/2019', '%m/%d/%Y')),
             'completed_at': make_aware(datetime.strptime('02/01/2019', '%m/%d/%Y')),
         },
@@ -88,6 +91,7 @@ def generate_tasks(seeder: Seeder) -> None:
     seeder.add_entity(
         Task, 15, {
             'user_id': 2,
+            'search_vector': None,
             'description': 'This task is very important',
             'created_at': make_aware(datetime.strptime('01/01/2020', '%m/%d/%Y')),
             'completed_at': make_aware(datetime.strptime('02/01/2020', '%m/%d/%Y')),
@@ -97,6 +101,7 @@ def generate_tasks(seeder: Seeder) -> None:
     seeder.add_entity(
         Task, 45, {
             'user_id': 3,
+            'search_vector': None,
             'name': lambda ie: f'Important task №{next(number_generator)}',
             'created_at': make_aware(datetime.strptime('01/01/2021', '%m/%d/%Y')),
             'completed_at': make_aware(datetime.strptime('02/01/2021', '%m/%d/%Y')),
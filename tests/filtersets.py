@@ -33,6 +33,7 @@ class TaskFilter(AdvancedFilterSet):
             'user__email': ('exact', 'iexact', 'contains', 'icontains'),
             'user__last_name': ('exact', 'contains'),
         }
+        search_vectors = {'search_vector': ('name',)}
 
 
 class TaskGroupFilter(AdvancedFilterSet):
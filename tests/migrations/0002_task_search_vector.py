@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-18 12:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector'],
+                name='task_search_vector_gin',
+            ),
+        ),
+    ]
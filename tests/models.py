@@ -1,5 +1,7 @@
 """Django models for testing."""
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 
@@ -20,9 +22,13 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True)
     description = models.TextField()
+    search_vector = SearchVectorField(null=True)
 
     user = models.ForeignKey(User, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = (GinIndex(fields=['search_vector'], name='task_search_vector_gin'),)
+
 
 class TaskGroup(models.Model):
     """Task group model."""
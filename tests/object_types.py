@@ -2,6 +2,7 @@
 
 import graphene
 from graphene_django import DjangoObjectType
+from graphene_django_filter import SearchRankField
 
 from .filtersets import TaskFilter, TaskGroupFilter, UserFilter
 from .models import Task, TaskGroup, User
@@ -41,7 +42,7 @@ class TaskFilterFieldsType(DjangoObjectType):
     class Meta:
         model = Task
         interfaces = (graphene.relay.Node,)
-        fields = '__all__'
+        exclude = ('search_vector',)
         filter_fields = {
             'name': ('exact', 'contains', 'full_text_search'),
             'created_at': ('gt',),
@@ -57,6 +58,7 @@ class TaskFilterSetClassType(DjangoObjectType):
     """TaskType with the `filterset_class` field in the Meta class."""
 
     user = graphene.Field(UserFilterSetClassType, description='User field')
+    search_rank = SearchRankField()
 
     class Meta:
         model = Task
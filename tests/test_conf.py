@@ -1,5 +1,7 @@
 """Library settings tests."""
 
+from unittest.mock import MagicMock, call, patch
+
 from django.test import TestCase, override_settings
 from graphene_django_filter import conf
 
@@ -22,3 +24,30 @@ class SettingsTests(TestCase):
         with override_settings(GRAPHENE_DJANGO_FILTER={'FILTER_KEY': 'where'}):
             self.assertEqual('where', conf.settings.FILTER_KEY)
         self.assertEqual('filter', conf.settings.FILTER_KEY)
+
+    @patch('graphene_django_filter.conf.FIXED_SETTINGS', new={})
+    def test_fixed_settings_detection(self) -> None:
+        """Test that fixed settings are detected lazily and cached for each database alias."""
+        fixed_settings = {'IS_POSTGRESQL': True, 'HAS_TRIGRAM_EXTENSION': False}
+        detect_fixed_settings = MagicMock(return_value=fixed_settings)
+        with patch('graphene_django_filter.conf.detect_fixed_settings', new=detect_fixed_settings):
+            detect_fixed_settings.assert_not_called()
+            self.assertFalse(conf.settings.HAS_TRIGRAM_EXTENSION)
+            self.assertEqual(fixed_settings, conf.get_fixed_settings('replica'))
+            self.assertEqual(fixed_settings, conf.get_fixed_settings('replica'))
+            self.assertEqual(
+                [call('default'), call('replica')],
+                detect_fixed_settings.call_args_list,
+            )
+            conf.refresh_fixed_settings('replica')
+            self.assertEqual(['default'], list(conf.FIXED_SETTINGS))
+            conf.refresh_fixed_settings()
+            self.assertEqual({}, conf.FIXED_SETTINGS)
+
+    @patch('graphene_django_filter.conf.FIXED_SETTINGS', new={})
+    def test_fixed_settings_refresh_on_databases_change(self) -> None:
+        """Test that fixed settings are refreshed when the `DATABASES` setting is changed."""
+        conf.get_fixed_settings()
+        self.assertIn('default', conf.FIXED_SETTINGS)
+        conf.reload_settings('DATABASES', {})
+        self.assertNotIn('default', conf.FIXED_SETTINGS)
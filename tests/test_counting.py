@@ -0,0 +1,334 @@
+"""`counting` module tests."""
+
+from typing import Any, Dict
+
+import graphene
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, F, Value
+from django.test import TestCase, override_settings
+from graphene_django import DjangoObjectType
+from graphene_django_filter import (
+    AdvancedDjangoFilterConnectionField,
+    HasResultsField,
+    TotalCountField,
+    TotalCountLabelField,
+)
+from graphene_django_filter.counting import (
+    count_queryset,
+    estimate_count,
+    get_count_fingerprint,
+    get_count_queryset,
+)
+
+from .data_generation import generate_data
+from .models import Task, User
+
+
+class UserCountConnection(graphene.relay.Connection):
+    """User connection with count fields."""
+
+    total_count = TotalCountField()
+    total_count_label = TotalCountLabelField()
+    has_results = HasResultsField()
+
+    class Meta:
+        abstract = True
+
+
+class UserLengthConnection(graphene.relay.Connection):
+    """User connection resolving the count from the connection length."""
+
+    total_count = graphene.Int()
+
+    class Meta:
+        abstract = True
+
+    @staticmethod
+    def resolve_total_count(root: graphene.relay.Connection, info: graphene.ResolveInfo) -> int:
+        """Return the length of the connection."""
+        return root.length
+
+
+class UserLengthType(DjangoObjectType):
+    """UserType with a connection resolving the count from the connection length."""
+
+    class Meta:
+        model = User
+        interfaces = (graphene.relay.Node,)
+        fields = '__all__'
+        filter_fields = {'last_name': ('exact',)}
+        connection_class = UserLengthConnection
+        skip_registry = True
+
+
+class UserCountType(DjangoObjectType):
+    """UserType with count fields in its connection."""
+
+    class Meta:
+        model = User
+        interfaces = (graphene.relay.Node,)
+        fields = '__all__'
+        filter_fields = {'last_name': ('exact',)}
+        connection_class = UserCountConnection
+        skip_registry = True
+
+
+class Query(graphene.ObjectType):
+    """Schema queries with count strategies."""
+
+    users = AdvancedDjangoFilterConnectionField(
+        UserCountType,
+        filter_input_type_prefix='UserCount',
+    )
+    capped_users = AdvancedDjangoFilterConnectionField(
+        UserCountType,
+        filter_input_type_prefix='UserCount',
+        count_strategy='capped',
+    )
+    window_users = AdvancedDjangoFilterConnectionField(
+        UserCountType,
+        filter_input_type_prefix='UserCount',
+        count_strategy='window',
+    )
+    length_users = AdvancedDjangoFilterConnectionField(
+        UserLengthType,
+        filter_input_type_prefix='UserLength',
+    )
+
+
+schema = graphene.Schema(query=Query)
+
+
+class CountingTests(TestCase):
+    """The `counting` module tests."""
+
+    query = """
+        query Users($first: Int, $after: String, $lastName: String) {
+            %s(first: $first, after: $after, filter: {lastName: {exact: $lastName}}) {
+                totalCount
+                totalCountLabel
+                hasResults
+                pageInfo {
+                    hasPreviousPage
+                    hasNextPage
+                    endCursor
+                }
+                edges {
+                    node {
+                        id
+                    }
+                }
+            }
+        }
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up `CountingTests` class."""
+        super().setUpClass()
+        generate_data()
+
+    def setUp(self) -> None:
+        """Set up `CountingTests` tests."""
+        cache.clear()
+
+    def execute(self, field_name: str, **variables) -> Dict[str, Any]:
+        """Execute the query with a connection field and return the connection data."""
+        execution_result = schema.execute(self.query % field_name, variable_values=variables)
+        self.assertIsNone(execution_result.errors)
+        return execution_result.data[field_name]
+
+    def test_get_count_queryset(self) -> None:
+        """Test the `get_count_queryset` function."""
+        queryset = get_count_queryset(
+            Task.objects.select_related('user').annotate(
+                user_name=F('user__first_name'),
+            ).filter(user_name='Jane').order_by('-user_name'),
+        )
+        self.assertEqual({}, queryset.query.annotations)
+        self.assertFalse(queryset.query.order_by)
+        self.assertFalse(queryset.query.select_related)
+        self.assertEqual(
+            Task.objects.filter(user__first_name='Jane').count(),
+            queryset.count(),
+        )
+        queryset = get_count_queryset(User.objects.annotate(task_count=Count('task')))
+        self.assertIn('task_count', queryset.query.annotations)
+        queryset = get_count_queryset(User.objects.annotate(one=Value(1)).distinct())
+        self.assertIn('one', queryset.query.annotations)
+
+    def test_count_queryset(self) -> None:
+        """Test the `count_queryset` function."""
+        queryset = User.objects.filter(last_name='Dou')
+        self.assertEqual(45, count_queryset(queryset))
+        self.assertEqual(45, count_queryset(queryset, 'exact'))
+        self.assertEqual(0, count_queryset(User.objects.none(), 'estimate'))
+        self.assertGreater(count_queryset(queryset, 'estimate'), 0)
+        self.assertEqual(45, count_queryset(queryset, 'cached'))
+        with self.assertNumQueries(0):
+            self.assertEqual(45, count_queryset(queryset.order_by('-id'), 'cached'))
+        self.assertEqual(45, count_queryset(queryset, 'capped'))
+        with override_settings(GRAPHENE_DJANGO_FILTER={'COUNT_CAP': 10}):
+            self.assertEqual(11, count_queryset(queryset, 'capped'))
+            self.assertEqual(45, count_queryset(queryset))
+        with override_settings(GRAPHENE_DJANGO_FILTER={
+            'COUNT_STRATEGY': 'capped',
+            'COUNT_CAP': 10,
+        }):
+            self.assertEqual(11, count_queryset(queryset))
+        with self.assertRaisesMessage(AssertionError, 'Invalid count strategy: `unknown`'):
+            count_queryset(queryset, 'unknown')
+
+    def test_estimate_count(self) -> None:
+        """Test the `estimate_count` function."""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE tests_user')
+        with self.assertNumQueries(1) as context:
+            self.assertEqual(75, estimate_count(User.objects.all()))
+        self.assertIn('reltuples', context.captured_queries[0]['sql'])
+        with self.assertNumQueries(1) as context:
+            estimate = estimate_count(User.objects.filter(last_name='Dou'))
+        self.assertIn('EXPLAIN', context.captured_queries[0]['sql'])
+        self.assertGreater(estimate, 0)
+
+    def test_get_count_fingerprint(self) -> None:
+        """Test the `get_count_fingerprint` function."""
+        queryset = User.objects.filter(last_name='Dou')
+        self.assertEqual(
+            get_count_fingerprint(queryset),
+            get_count_fingerprint(queryset.annotate(one=Value(1)).order_by('-id')),
+        )
+        self.assertNotEqual(
+            get_count_fingerprint(queryset),
+            get_count_fingerprint(User.objects.filter(last_name='Smith')),
+        )
+
+    def test_connection_count_strategy(self) -> None:
+        """Test connection fields with count strategies."""
+        with self.assertRaisesMessage(AssertionError, 'Invalid count strategy: `unknown`'):
+            AdvancedDjangoFilterConnectionField(
+                UserCountType,
+                filter_input_type_prefix='UserCount',
+                count_strategy='unknown',
+            )
+        users = self.execute('users', first=20, lastName='Dou')
+        self.assertEqual(45, users['totalCount'])
+        self.assertEqual('45', users['totalCountLabel'])
+        self.assertTrue(users['hasResults'])
+        with override_settings(GRAPHENE_DJANGO_FILTER={'COUNT_CAP': 10}):
+            capped_users = self.execute('cappedUsers', first=20, lastName='Dou')
+            self.assertEqual(11, capped_users['totalCount'])
+            self.assertEqual('10+', capped_users['totalCountLabel'])
+            self.assertEqual(users['edges'], capped_users['edges'])
+            self.assertEqual(users['pageInfo'], capped_users['pageInfo'])
+            for after in (users['pageInfo']['endCursor'], 'YXJyYXljb25uZWN0aW9uOjM5'):
+                expected = self.execute('users', first=20, after=after, lastName='Dou')
+                capped_users = self.execute('cappedUsers', first=20, after=after, lastName='Dou')
+                self.assertEqual(expected['edges'], capped_users['edges'])
+                self.assertEqual(expected['pageInfo'], capped_users['pageInfo'])
+        users = self.execute('cappedUsers', first=20, lastName='Unknown')
+        self.assertEqual(0, users['totalCount'])
+        self.assertFalse(users['hasResults'])
+        self.assertEqual([], users['edges'])
+
+    def test_window_count_strategy(self) -> None:
+        """Test that the page and the count are fetched in one query with the `window` strategy."""
+        users = self.execute('users', first=20, lastName='Dou')
+        with self.assertNumQueries(1) as context:
+            window_users = self.execute('windowUsers', first=20, lastName='Dou')
+        self.assertIn('COUNT(*) OVER ()', context.captured_queries[0]['sql'])
+        self.assertEqual(users, window_users)
+        for after in (users['pageInfo']['endCursor'], 'YXJyYXljb25uZWN0aW9uOjM5'):
+            with self.assertNumQueries(1):
+                window_users = self.execute('windowUsers', first=20, after=after, lastName='Dou')
+            self.assertEqual(
+                self.execute('users', first=20, after=after, lastName='Dou'),
+                window_users,
+            )
+        with self.assertNumQueries(3):
+            window_users = self.execute('windowUsers', first=20, lastName='Unknown')
+        self.assertEqual(0, window_users['totalCount'])
+        self.assertEqual([], window_users['edges'])
+        with self.assertNumQueries(3):
+            window_users = self.execute(
+                'windowUsers',
+                first=20,
+                after='YXJyYXljb25uZWN0aW9uOjQ5',
+                lastName='Dou',
+            )
+        self.assertEqual(45, window_users['totalCount'])
+        self.assertEqual([], window_users['edges'])
+
+    def test_lazy_count(self) -> None:
+        """Test that connections are counted only if a count field is requested."""
+        query = """
+            {
+                %s(first: 20, filter: {lastName: {exact: "Dou"}}) {
+                    edges {
+                        node {
+                            id
+                        }
+                    }
+                }
+            }
+        """
+        with self.assertNumQueries(2):
+            execution_result = schema.execute(query % 'users')
+        self.assertIsNone(execution_result.errors)
+        with override_settings(GRAPHENE_DJANGO_FILTER={'LAZY_COUNT': True}):
+            for field_name in ('users', 'cappedUsers'):
+                with self.assertNumQueries(1) as context:
+                    execution_result = schema.execute(query % field_name)
+                self.assertIsNone(execution_result.errors)
+                self.assertEqual(20, len(execution_result.data[field_name]['edges']))
+                self.assertNotIn('COUNT', context.captured_queries[0]['sql'])
+            with self.assertNumQueries(2):
+                users = self.execute('users', first=20, lastName='Dou')
+            self.assertEqual(45, users['totalCount'])
+            self.assertEqual('45', users['totalCountLabel'])
+
+    def test_length_resolver(self) -> None:
+        """Test that a connection count resolved from `root.length` is an integer."""
+        query = """
+            {
+                lengthUsers(first: 2, filter: {lastName: {exact: "Dou"}}) {
+                    totalCount
+                }
+            }
+        """
+        for lazy_count in (False, True):
+            with override_settings(GRAPHENE_DJANGO_FILTER={'LAZY_COUNT': lazy_count}):
+                execution_result = schema.execute(query)
+            self.assertIsNone(execution_result.errors)
+            self.assertEqual(45, execution_result.data['lengthUsers']['totalCount'])
+
+    async def test_async_lazy_count(self) -> None:
+        """Test that connections are counted with the async ORM in an event loop."""
+        for lazy_count in (False, True):
+            for field_name in ('users', 'cappedUsers'):
+                with override_settings(GRAPHENE_DJANGO_FILTER={'LAZY_COUNT': lazy_count}):
+                    execution_result = await schema.execute_async(
+                        self.query % field_name,
+                        variable_values={'first': 20, 'lastName': 'Dou'},
+                    )
+                self.assertIsNone(execution_result.errors)
+                data = execution_result.data[field_name]
+                self.assertEqual(45, data['totalCount'])
+                self.assertEqual('45', data['totalCountLabel'])
+                self.assertEqual(20, len(data['edges']))
+
+    async def test_async_has_results(self) -> None:
+        """Test that `hasResults` of an empty page is checked with the async ORM."""
+        for last_name, has_results in (('Dou', True), ('Unknown', False)):
+            execution_result = await schema.execute_async(
+                self.query % 'users',
+                variable_values={
+                    'first': 20,
+                    'after': 'YXJyYXljb25uZWN0aW9uOjQ5',
+                    'lastName': last_name,
+                },
+            )
+            self.assertIsNone(execution_result.errors)
+            self.assertEqual([], execution_result.data['users']['edges'])
+            self.assertEqual(has_results, execution_result.data['users']['hasResults'])
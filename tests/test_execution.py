@@ -0,0 +1,220 @@
+"""`execution` module tests."""
+
+from threading import Thread
+from typing import Any
+from unittest.mock import patch
+
+import graphene
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+from graphene_django import DjangoObjectType
+from graphene_django_filter import AdvancedDjangoFilterConnectionField, ConcurrentExecutionContext
+from graphene_django_filter.execution import fetch_page_with_count
+
+from .data_generation import generate_data
+from .models import User
+from .object_types import TaskFilterFieldsType
+from .schema import schema
+
+
+class UserWithTasksType(DjangoObjectType):
+    """UserType with nested filtered connections of tasks."""
+
+    tasks = AdvancedDjangoFilterConnectionField(TaskFilterFieldsType)
+    other_tasks = AdvancedDjangoFilterConnectionField(TaskFilterFieldsType)
+
+    class Meta:
+        model = User
+        interfaces = (graphene.relay.Node,)
+        fields = ('id', 'first_name')
+        filter_fields = {'first_name': ('exact',)}
+        skip_registry = True
+
+    @staticmethod
+    def resolve_tasks(root: User, info: graphene.ResolveInfo, **kwargs) -> Any:
+        """Return tasks of the user."""
+        return root.task_set.all()
+
+    @staticmethod
+    def resolve_other_tasks(root: User, info: graphene.ResolveInfo, **kwargs) -> Any:
+        """Return tasks of the user."""
+        return root.task_set.all()
+
+
+class NestedQuery(graphene.ObjectType):
+    """Schema queries with nested filtered connections."""
+
+    users = AdvancedDjangoFilterConnectionField(
+        UserWithTasksType,
+        filter_input_type_prefix='UserWithTasks',
+    )
+    other_users = AdvancedDjangoFilterConnectionField(
+        UserWithTasksType,
+        filter_input_type_prefix='UserWithTasks',
+    )
+
+
+nested_schema = graphene.Schema(query=NestedQuery)
+
+
+class ConcurrentExecutionContextTests(TransactionTestCase):
+    """The `ConcurrentExecutionContext` class tests."""
+
+    reset_sequences = True
+    query = """
+        {
+            usersFields(filter: {firstName: {exact: "Jane"}}) {
+                edges {
+                    node {
+                        id
+                    }
+                }
+            }
+            tasksFields(filter: {user: {in: ["2", "3"]}}) {
+                edges {
+                    node {
+                        id
+                    }
+                }
+            }
+            taskGroupsFields(filter: {priority: {gte: 10}}) {
+                edges {
+                    node {
+                        id
+                    }
+                }
+            }
+        }
+    """
+
+    def setUp(self) -> None:
+        """Set up `ConcurrentExecutionContextTests` tests."""
+        generate_data()
+
+    def test_execute_fields(self) -> None:
+        """Test that sibling filtered connections are resolved in worker threads."""
+        expected = schema.execute(self.query)
+        self.assertIsNone(expected.errors)
+        with patch.object(
+            ConcurrentExecutionContext,
+            'execute_field_in_worker',
+            autospec=True,
+            side_effect=ConcurrentExecutionContext.execute_field_in_worker,
+        ) as execute_field_in_worker_mock:
+            execution_result = schema.execute(
+                self.query,
+                execution_context_class=ConcurrentExecutionContext,
+            )
+            self.assertEqual(3, execute_field_in_worker_mock.call_count)
+        self.assertIsNone(execution_result.errors)
+        self.assertEqual(expected.data, execution_result.data)
+        self.assertEqual(
+            ['usersFields', 'tasksFields', 'taskGroupsFields'],
+            list(execution_result.data),
+        )
+
+    def test_execute_fields_in_transaction(self) -> None:
+        """Test that sibling filtered connections are resolved serially in a transaction."""
+        with patch.object(
+            ConcurrentExecutionContext,
+            'execute_field_in_worker',
+        ) as execute_field_in_worker_mock, transaction.atomic():
+            execution_result = schema.execute(
+                self.query,
+                execution_context_class=ConcurrentExecutionContext,
+            )
+            execute_field_in_worker_mock.assert_not_called()
+        self.assertIsNone(execution_result.errors)
+        self.assertEqual(6, len(execution_result.data['taskGroupsFields']['edges']))
+
+    def test_execute_nested_fields(self) -> None:
+        """Test that nested filtered connections are resolved serially in worker threads."""
+        query = """
+            {
+                users(first: 3) {
+                    edges {
+                        node {
+                            tasks { edges { node { id } } }
+                            otherTasks { edges { node { id } } }
+                        }
+                    }
+                }
+                otherUsers(first: 3) {
+                    edges {
+                        node {
+                            tasks { edges { node { id } } }
+                            otherTasks { edges { node { id } } }
+                        }
+                    }
+                }
+            }
+        """
+        expected = nested_schema.execute(query)
+        self.assertIsNone(expected.errors)
+        results = []
+        with override_settings(GRAPHENE_DJANGO_FILTER={'MAX_CONCURRENT_CONNECTIONS': 2}):
+            thread = Thread(target=lambda: results.append(nested_schema.execute(
+                query,
+                execution_context_class=ConcurrentExecutionContext,
+            )))
+            thread.start()
+            thread.join(timeout=30)
+        self.assertFalse(thread.is_alive(), 'Nested connections are deadlocked.')
+        self.assertIsNone(results[0].errors)
+        self.assertEqual(expected.data, results[0].data)
+
+
+class FetchPageWithCountTests(TransactionTestCase):
+    """The `fetch_page_with_count` function tests."""
+
+    reset_sequences = True
+    query = """
+        {
+            usersFields(
+                filter: {email: {contains: "alice"}}
+                first: 5
+                after: "YXJyYXljb25uZWN0aW9uOjk="
+            ) {
+                edges {
+                    cursor
+                    node {
+                        id
+                    }
+                }
+                pageInfo {
+                    hasNextPage
+                    hasPreviousPage
+                }
+            }
+        }
+    """
+
+    def setUp(self) -> None:
+        """Set up `FetchPageWithCountTests` tests."""
+        generate_data()
+
+    def test_fetch_page_with_count(self) -> None:
+        """Test the `fetch_page_with_count` function."""
+        queryset = User.objects.filter(email__contains='alice').order_by('pk')
+        for snapshot in (False, True):
+            count, items = fetch_page_with_count(queryset, queryset[10:15], snapshot)
+            self.assertEqual(queryset.count(), count)
+            self.assertEqual(list(queryset[10:15]), items)
+
+    def test_execution(self) -> None:
+        """Test that the count and the page are fetched in parallel if it is enabled."""
+        expected = schema.execute(self.query)
+        self.assertIsNone(expected.errors)
+        self.assertEqual(5, len(expected.data['usersFields']['edges']))
+        for snapshot in (False, True):
+            with override_settings(GRAPHENE_DJANGO_FILTER={
+                'PARALLEL_COUNT': True,
+                'PARALLEL_COUNT_SNAPSHOT': snapshot,
+            }), patch(
+                'graphene_django_filter.execution.fetch_page_with_count',
+                wraps=fetch_page_with_count,
+            ) as fetch_page_with_count_mock:
+                execution_result = schema.execute(self.query)
+                fetch_page_with_count_mock.assert_called_once()
+            self.assertIsNone(execution_result.errors)
+            self.assertEqual(expected.data, execution_result.data)
@@ -0,0 +1,70 @@
+"""Expressions tests."""
+
+from django.test import TestCase
+from graphene_django_filter.expressions import (
+    RowComparison,
+    TrigramMatch,
+    TrigramNearestDistance,
+    TrigramWordSimilarity,
+)
+
+from .data_generation import generate_data
+from .models import User
+
+
+class ExpressionsTests(TestCase):
+    """Expressions tests."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up `ExpressionsTests` class."""
+        super().setUpClass()
+        generate_data()
+
+    def test_trigram_match(self) -> None:
+        """Test the `TrigramMatch` class."""
+        users = User.objects.filter(TrigramMatch('first_name', 'Jane'))
+        self.assertIn('("tests_user"."first_name" % Jane)', str(users.query))
+        self.assertTrue(users.exists())
+        self.assertTrue(all(user.first_name == 'Jane' for user in users))
+        users = User.objects.annotate(
+            word_similarity=TrigramWordSimilarity('Jane', 'first_name'),
+        ).filter(TrigramMatch('first_name', 'Jane', '%>'))
+        self.assertIn('("tests_user"."first_name" %> Jane)', str(users.query))
+        self.assertTrue(users.exists())
+        self.assertTrue(all(user.word_similarity >= 0.6 for user in users))
+        self.assertNotEqual(
+            TrigramMatch('first_name', 'Jane'),
+            TrigramMatch('first_name', 'Jane', '%>'),
+        )
+        with self.assertRaisesMessage(ValueError, 'Invalid trigram operator: `<->`'):
+            TrigramMatch('first_name', 'Jan', '<->')
+
+    def test_trigram_nearest_distance(self) -> None:
+        """Test the `TrigramNearestDistance` class."""
+        users = User.objects.order_by(TrigramNearestDistance('first_name', 'Jane'), 'pk')
+        self.assertIn('ORDER BY ("tests_user"."first_name" <-> Jane) ASC', str(users.query))
+        self.assertEqual(list(range(31, 51)), [user.id for user in users[:20]])
+        users = User.objects.annotate(
+            distance=TrigramNearestDistance('first_name', 'Jane', '<->>'),
+        ).order_by('distance', 'pk')
+        self.assertIn('("tests_user"."first_name" <->> Jane)', str(users.query))
+        self.assertEqual(list(range(31, 51)), [user.id for user in users[:20]])
+        self.assertEqual(0, users[0].distance)
+
+    def test_row_comparison(self) -> None:
+        """Test the `RowComparison` class."""
+        users = User.objects.filter(
+            RowComparison(['last_name', 'id'], '>', ['Dou', 50]),
+        ).order_by('last_name', 'id')
+        self.assertIn(
+            '("tests_user"."last_name", "tests_user"."id") > (Dou, 50)',
+            str(users.query),
+        )
+        self.assertEqual(51, users[0].id)
+        users = User.objects.filter(RowComparison(['id'], '<', [3]))
+        self.assertEqual([1, 2], sorted(user.id for user in users))
+        with self.assertRaisesMessage(ValueError, 'Invalid row comparison operator: `=`'):
+            RowComparison(['id'], '=', [3])
+        with self.assertRaisesMessage(ValueError, 'Compared rows must have the same length.'):
+            RowComparison(['last_name', 'id'], '>', [3])
@@ -0,0 +1,66 @@
+"""`fields` module tests."""
+
+from types import SimpleNamespace
+
+import graphene
+from django.test import TestCase, override_settings
+from graphene_django_filter import (
+    HasResultsField,
+    SearchRankField,
+    TotalCountField,
+    TotalCountLabelField,
+)
+from graphene_django_filter.counting import LazyCount
+
+from .data_generation import generate_data
+from .models import User
+
+
+class FieldsTests(TestCase):
+    """The `fields` module tests."""
+
+    def test_search_rank_field(self) -> None:
+        """Test the `SearchRankField` class."""
+        field = SearchRankField()
+        self.assertEqual(graphene.Float, field.type)
+        self.assertEqual('Search rank of the object', field.description)
+        self.assertEqual(0.5, field.resolver(SimpleNamespace(search_rank=0.5), None))
+        self.assertIsNone(field.resolver(SimpleNamespace(), None))
+        self.assertEqual('Rank', SearchRankField(description='Rank').description)
+
+    def test_total_count_field(self) -> None:
+        """Test the `TotalCountField` class."""
+        field = TotalCountField()
+        self.assertEqual(graphene.Int, field.type)
+        self.assertEqual(10, field.resolver(SimpleNamespace(length=10), None))
+        generate_data()
+        connection = SimpleNamespace(length=LazyCount(User.objects.filter(last_name='Dou')))
+        with self.assertNumQueries(1):
+            self.assertEqual(45, field.resolver(connection, None))
+            self.assertEqual('45', TotalCountLabelField().resolver(connection, None))
+
+    def test_total_count_label_field(self) -> None:
+        """Test the `TotalCountLabelField` class."""
+        field = TotalCountLabelField()
+        self.assertEqual(graphene.String, field.type)
+        self.assertEqual('10', field.resolver(SimpleNamespace(length=10), None))
+        with override_settings(GRAPHENE_DJANGO_FILTER={'COUNT_CAP': 10}):
+            self.assertEqual('10', field.resolver(SimpleNamespace(length=10), None))
+            self.assertEqual('10+', field.resolver(SimpleNamespace(length=11), None))
+
+    def test_has_results_field(self) -> None:
+        """Test the `HasResultsField` class."""
+        generate_data()
+        field = HasResultsField()
+        self.assertEqual(graphene.Boolean, field.type)
+        with self.assertNumQueries(0):
+            self.assertTrue(field.resolver(SimpleNamespace(edges=[1], iterable=None), None))
+            self.assertFalse(field.resolver(SimpleNamespace(edges=[], iterable=[]), None))
+        with self.assertNumQueries(1) as context:
+            self.assertTrue(
+                field.resolver(SimpleNamespace(edges=[], iterable=User.objects.all()), None),
+            )
+        self.assertIn('LIMIT 1', context.captured_queries[0]['sql'])
+        self.assertFalse(
+            field.resolver(SimpleNamespace(edges=[], iterable=User.objects.none()), None),
+        )
@@ -45,6 +45,7 @@ class FilterArgumentsFactoryTests(TestCase):
                         Node(name='gte'),
                         Node(name='lt'),
                         Node(name='lte'),
+                        Node(name='nearest'),
                     ],
                 ),
             ],
@@ -75,6 +76,7 @@ class FilterArgumentsFactoryTests(TestCase):
         Node(name='search_query', children=[Node(name='exact')]),
         Node(
             name='search_rank', children=[
+                Node(name='order'),
                 Node(name='exact'),
                 Node(name='gt'),
                 Node(name='gte'),
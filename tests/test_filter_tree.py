@@ -0,0 +1,100 @@
+"""`filter_tree` module tests."""
+
+from datetime import datetime
+
+from django.test import TestCase
+from django.utils.timezone import make_aware
+from django_filters import CharFilter
+from graphene_django_filter import AdvancedFilterSet
+from graphene_django_filter.filter_tree import FilterTree, FilterTreeValidator
+
+from .data_generation import generate_data
+from .filtersets import TaskFilter
+from .models import Task
+
+
+class FilterTreeValidatorTests(TestCase):
+    """The `FilterTreeValidator` class tests."""
+
+    class RequiredFilterSet(AdvancedFilterSet):
+        name = CharFilter(field_name='name', lookup_expr='exact', required=True)
+
+        class Meta:
+            model = Task
+            fields = ('description',)
+
+    valid_data = {
+        'user__in': [2, 3],
+        'and': [
+            {'created_at__gt': make_aware(datetime.strptime('12/31/2019', '%m/%d/%Y'))},
+        ],
+        'or': [
+            {'name__contains': 'Important'},
+            {'description__contains': 'important'},
+        ],
+        'not': {
+            'user': 2,
+        },
+    }
+    invalid_data = {
+        'user': 'user',
+        'or': [
+            {'name__contains': 'Important'},
+            {'created_at__gt': 'date', 'completed_at__lt': 'date'},
+        ],
+        'not': {
+            'user__in': ['user'],
+        },
+    }
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up `FilterTreeValidatorTests` class."""
+        super().setUpClass()
+        generate_data()
+
+    def assert_same_as_forms(self, filterset_class: type, data: dict) -> FilterTree:
+        """Fail if the validation result differs from the result of tree-like forms."""
+        filterset = filterset_class(data=data)
+        form_class = filterset.get_form_class()
+        form = filterset.create_form(form_class, data)
+        tree = FilterTreeValidator(form_class).validate(data)
+        self.assertEqual(form.is_valid(), tree.is_valid())
+        self.assertEqual(form.errors.get_json_data(), tree.errors.get_json_data())
+        return tree
+
+    def test_validate_valid_data(self) -> None:
+        """Test validating valid data."""
+        tree = self.assert_same_as_forms(TaskFilter, self.valid_data)
+        self.assertEqual(['user__in'], list(tree.cleaned_data))
+        self.assertEqual([2, 3], [user.id for user in tree.cleaned_data['user__in']])
+        self.assertEqual(1, len(tree.and_forms))
+        self.assertEqual(2, len(tree.or_forms))
+        self.assertEqual('Important', tree.or_forms[0].cleaned_data['name__contains'])
+        self.assertEqual(2, tree.not_form.cleaned_data['user'].id)
+
+    def test_validate_invalid_data(self) -> None:
+        """Test validating invalid data."""
+        tree = self.assert_same_as_forms(TaskFilter, self.invalid_data)
+        self.assertEqual(['user', 'or', 'not'], list(tree.errors))
+        self.assertEqual(['or_1'], list(tree.errors['or']))
+        self.assertEqual(['created_at__gt', 'completed_at__lt'], list(tree.errors['or']['or_1']))
+
+    def test_validate_required_fields(self) -> None:
+        """Test validating data without required fields."""
+        self.assert_same_as_forms(self.RequiredFilterSet, {'and': [{'name': 'name'}]})
+
+    def test_validate_fail_fast(self) -> None:
+        """Test validating data in the fail-fast mode."""
+        form_class = TaskFilter().get_form_class()
+        tree = FilterTreeValidator(form_class, fail_fast=True).validate(self.invalid_data)
+        self.assertFalse(tree.is_valid())
+        self.assertEqual({'user'}, set(tree.errors))
+        self.assertEqual([], tree.or_forms)
+        self.assertIsNone(tree.not_form)
+        tree = FilterTreeValidator(form_class, fail_fast=True).validate(
+            {k: v for k, v in self.invalid_data.items() if k != 'user'},
+        )
+        self.assertEqual({'or'}, set(tree.errors))
+        self.assertEqual({'created_at__gt'}, set(tree.errors['or']['or_1']))
+        self.assertIsNone(tree.not_form)
@@ -1,12 +1,10 @@
 """Tests for additional filters for special lookups."""
 
-from unittest.mock import patch
-
 from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
 from django.db import models
 from django.db.models import functions
-from django.test import TestCase
-from django_filters import Filter
+from django.test import TestCase, override_settings
+from graphene_django_filter.expressions import TrigramMatch, TrigramNearestDistance
 from graphene_django_filter.filters import (
     AnnotatedFilter,
     SearchQueryFilter,
@@ -28,16 +26,21 @@ class FiltersTests(TestCase):
         super().setUpClass()
         generate_data()
 
-    @patch.object(Filter, 'creation_counter', new=0)
-    def test_annotate_name(self) -> None:
-        """Test the `annotation_name` property of the `AnnotatedFilter` class."""
+    def test_get_annotation_name(self) -> None:
+        """Test the `get_annotation_name` method of the `AnnotatedFilter` class."""
         annotated_filter = AnnotatedFilter(field_name='id', lookup_expr='exact')
-        self.assertEqual('id_annotated_0_0', annotated_filter.annotation_name)
+        self.assertEqual('id_annotated_0', annotated_filter.get_annotation_name(User.objects.all()))
+        self.assertEqual(
+            'id_annotated_2',
+            annotated_filter.get_annotation_name(User.objects.annotate(
+                id_annotated_0=models.Value(0),
+                id_annotated_1=models.Value(1),
+            )),
+        )
 
     def test_annotated_filter(self) -> None:
         """Test the `filter` method of the `AnnotatedFilter` class."""
         annotated_filter = AnnotatedFilter(field_name='id', lookup_expr='exact')
-        self.assertEqual(0, annotated_filter.filter_counter)
         users = annotated_filter.filter(
             User.objects.all(),
             AnnotatedFilter.Value(
@@ -48,7 +51,25 @@ class FiltersTests(TestCase):
                 search_value='#5',
             ),
         ).all()
-        self.assertEqual(1, annotated_filter.filter_counter)
+        self.assertEqual(['id_annotated_0'], list(users.query.annotations))
+        self.assertEqual([5], [user.id for user in users])
+
+    @override_settings(GRAPHENE_DJANGO_FILTER={'ALIAS_FILTER_ANNOTATIONS': True})
+    def test_annotated_filter_with_aliases(self) -> None:
+        """Test the `filter` method of the `AnnotatedFilter` class adding aliases."""
+        annotated_filter = AnnotatedFilter(field_name='id', lookup_expr='exact')
+        users = annotated_filter.filter(
+            User.objects.all(),
+            AnnotatedFilter.Value(
+                annotation_value=functions.Concat(
+                    models.Value('#'),
+                    functions.Cast(models.F('id'), output_field=models.CharField()),
+                ),
+                search_value='#5',
+            ),
+        ).all()
+        self.assertEqual(['id_annotated_0'], list(users.query.annotations))
+        self.assertEqual([], list(users.query.annotation_select))
         self.assertEqual([5], [user.id for user in users])
 
     def test_search_query_filter(self) -> None:
@@ -63,7 +84,6 @@ class FiltersTests(TestCase):
         ).all()
         self.assertTrue(all('Jane' in user.first_name for user in users))
 
-    @patch.object(Filter, 'creation_counter', new=0)
     def test_search_rank_filter(self) -> None:
         """Test the `SearchQueryFilter` class."""
         search_rank_filter = SearchRankFilter(field_name='first_name', lookup_expr='lte')
@@ -77,7 +97,36 @@ class FiltersTests(TestCase):
                 search_value=1,
             ),
         ).all()
-        self.assertTrue(all(hasattr(user, 'first_name_search_rank_0_0') for user in users))
+        self.assertTrue(all(hasattr(user, 'first_name_search_rank_0') for user in users))
+
+    def test_search_rank_filter_order(self) -> None:
+        """Test the `SearchRankFilter` class with the `order` lookup."""
+        search_rank_filter = SearchRankFilter(field_name='search_rank', lookup_expr='order')
+        rank = SearchRank(vector=SearchVector('first_name'), query=SearchQuery('Jane'))
+        users = search_rank_filter.filter(
+            User.objects.all(),
+            SearchRankFilter.Value(annotation_value=rank, search_value=True),
+        )
+        self.assertEqual(['search_rank'], list(users.query.annotations))
+        self.assertEqual(('-search_rank', 'pk'), users.query.order_by)
+        self.assertEqual(list(range(31, 51)), [user.id for user in users[:20]])
+        self.assertGreater(users[0].search_rank, 0)
+        users = search_rank_filter.filter(
+            users,
+            SearchRankFilter.Value(annotation_value=rank, search_value=True),
+        )
+        self.assertEqual(
+            ['search_rank', 'search_rank_search_rank_0'],
+            list(users.query.annotations),
+        )
+        self.assertEqual(('-search_rank_search_rank_0', 'pk'), users.query.order_by)
+        search_rank_filter.rank_attname = 'first_name'
+        users = search_rank_filter.filter(
+            User.objects.all(),
+            SearchRankFilter.Value(annotation_value=rank, search_value=True),
+        )
+        self.assertEqual(['search_rank_search_rank_0'], list(users.query.annotations))
+        self.assertEqual('Jane', users[0].first_name)
 
     def test_trigram_filter(self) -> None:
         """Test the `TrigramFilter` class."""
@@ -90,3 +139,46 @@ class FiltersTests(TestCase):
             ),
         ).all()
         self.assertTrue(all('Jane' in user.first_name for user in users))
+
+    def test_trigram_filter_with_match(self) -> None:
+        """Test the `TrigramFilter` class with an indexable operator."""
+        trigram_filter = TrigramFilter(field_name='first_name', lookup_expr='gte')
+        users = trigram_filter.filter(
+            User.objects.all(),
+            TrigramFilter.Value(
+                annotation_value=TrigramSimilarity('first_name', 'Jane'),
+                search_value=0.85,
+                match_value=TrigramMatch('first_name', 'Jane'),
+            ),
+        ).all()
+        self.assertEqual(
+            ['first_name_trigram_0', 'first_name_trigram_0_match'],
+            list(users.query.annotations),
+        )
+        self.assertIn('"tests_user"."first_name" % Jane', str(users.query).split('WHERE')[1])
+        self.assertTrue(users.exists())
+        self.assertTrue(all(user.first_name == 'Jane' for user in users))
+
+    def test_trigram_filter_nearest(self) -> None:
+        """Test the `TrigramFilter` class with the `nearest` lookup."""
+        trigram_filter = TrigramFilter(field_name='first_name', lookup_expr='nearest')
+        users = trigram_filter.filter(
+            User.objects.all(),
+            TrigramFilter.Value(
+                annotation_value=TrigramNearestDistance('first_name', 'Jane'),
+                search_value=True,
+            ),
+        )
+        self.assertEqual(list(range(31, 51)), [user.id for user in users[:20]])
+        self.assertEqual(
+            [TrigramNearestDistance('first_name', 'Jane').asc(), 'pk'],
+            list(users.query.order_by),
+        )
+        users = trigram_filter.filter(
+            User.objects.order_by('-id'),
+            TrigramFilter.Value(
+                annotation_value=TrigramNearestDistance('first_name', 'Jane'),
+                search_value=False,
+            ),
+        )
+        self.assertEqual(('-id',), users.query.order_by)
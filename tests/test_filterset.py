@@ -6,20 +6,23 @@ from datetime import datetime
 from typing import List
 from unittest.mock import MagicMock, patch
 
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
 from django.db import models
 from django.test import TestCase
 from django.utils.timezone import make_aware
-from django_filters import CharFilter
+from django_filters import CharFilter, ModelChoiceFilter
 from graphene_django_filter.filters import SearchQueryFilter, SearchRankFilter, TrigramFilter
 from graphene_django_filter.filterset import (
     AdvancedFilterSet,
+    QueryCollector,
     QuerySetProxy,
+    get_search_vector_key,
     is_full_text_search_lookup_expr,
     is_regular_lookup_expr,
 )
 
 from .data_generation import generate_data
-from .filtersets import TaskFilter
+from .filtersets import TaskFilter, UserFilter
 from .models import Task, User
 
 
@@ -47,6 +50,66 @@ class UtilsTests(TestCase):
         )
         self.assertEqual([queryset_proxy.__wrapped__, queryset_proxy.q], list(queryset_proxy))
 
+    def test_query_collector(self) -> None:
+        """Test the `QueryCollector` class."""
+        queryset = User.objects.all()
+        collector = QueryCollector(queryset)
+        self.assertIs(collector, collector.annotate(number=models.F('id') + models.Value('#')))
+        self.assertIn('number', collector.queryset.query.annotations)
+        self.assertEqual(User, collector.model)
+        collector.filter(email__contains='kate', first_name='Kate').exclude(
+            models.Q(first_name='John') & models.Q(last_name='Dou'),
+        )
+        collector.add(models.Q(is_active=True) & models.Q(birthday=None))
+        collector.add(models.Q(is_active=True) | models.Q(birthday=None))
+        collector.add(models.Q())
+        self.assertEqual(
+            [
+                ('email__contains', 'kate'),
+                ('first_name', 'Kate'),
+                ~(models.Q(first_name='John') & models.Q(last_name='Dou')),
+                ('is_active', True),
+                ('birthday', None),
+                models.Q(is_active=True) | models.Q(birthday=None),
+            ],
+            collector.children,
+        )
+        self.assertEqual([collector.queryset, collector.q], list(collector))
+
+    def test_query_collector_annotations(self) -> None:
+        """Test that the `QueryCollector` class shares equal annotations."""
+        collector = QueryCollector(User.objects.all())
+        collector.annotate(first=models.F('id') + 1).filter(first__gt=1)
+        nested_collector = QueryCollector(collector.queryset, collector)
+        nested_collector.annotate(second=models.F('id') + 1, third=models.F('id') + 2)
+        nested_collector.filter(second__lt=5, third=3).exclude(second=4)
+        self.assertEqual(['first', 'third'], list(nested_collector.queryset.query.annotations))
+        self.assertEqual(
+            [('first__lt', 5), ('third', 3), ~models.Q(first=4)],
+            nested_collector.children,
+        )
+        nested_collector.order_by('-second', 'third', models.F('id').asc())
+        self.assertEqual(
+            ('-first', 'third', models.F('id').asc()),
+            nested_collector.queryset.query.order_by,
+        )
+
+    def test_query_collector_aliases(self) -> None:
+        """Test that the `QueryCollector` class shares equal aliases and annotations."""
+        collector = QueryCollector(User.objects.all())
+        collector.alias(first=models.F('id') + 1).filter(first__gt=1)
+        collector.alias(second=models.F('id') + 1).filter(second__lt=5)
+        self.assertEqual(['first'], list(collector.queryset.query.annotations))
+        self.assertEqual([], list(collector.queryset.query.annotation_select))
+        collector.annotate(third=models.F('id') + 1)
+        self.assertEqual(['first'], list(collector.queryset.query.annotation_select))
+        collector.annotate(fourth=models.F('id') + 2).alias(fifth=models.F('id') + 2)
+        self.assertEqual(
+            ['first', 'fourth'],
+            list(collector.queryset.query.annotation_select),
+        )
+        self.assertEqual([('first__gt', 1), ('first__lt', 5)], collector.children)
+
     def test_is_full_text_search_lookup(self) -> None:
         """Test the `is_full_text_search_lookup` function."""
         self.assertFalse(is_full_text_search_lookup_expr('name__exact'))
@@ -110,6 +173,7 @@ class AdvancedFilterSetTests(TestCase):
         ('search_query', SearchQueryFilter(field_name='search_query', lookup_expr='exact')),
     ]
     expected_search_rank_filters = [
+        ('search_rank__order', SearchRankFilter(field_name='search_rank', lookup_expr='order')),
         ('search_rank', SearchRankFilter(field_name='search_rank', lookup_expr='exact')),
         ('search_rank__gt', SearchRankFilter(field_name='search_rank', lookup_expr='gt')),
         ('search_rank__gte', SearchRankFilter(field_name='search_rank', lookup_expr='gte')),
@@ -137,6 +201,10 @@ class AdvancedFilterSetTests(TestCase):
             'user__first_name__trigram__lte',
             TrigramFilter(field_name='user__first_name__trigram', lookup_expr='lte'),
         ),
+        (
+            'user__first_name__trigram__nearest',
+            TrigramFilter(field_name='user__first_name__trigram', lookup_expr='nearest'),
+        ),
         (
             'user__last_name__trigram',
             TrigramFilter(field_name='user__last_name__trigram', lookup_expr='exact'),
@@ -157,6 +225,10 @@ class AdvancedFilterSetTests(TestCase):
             'user__last_name__trigram__lte',
             TrigramFilter(field_name='user__last_name__trigram', lookup_expr='lte'),
         ),
+        (
+            'user__last_name__trigram__nearest',
+            TrigramFilter(field_name='user__last_name__trigram', lookup_expr='nearest'),
+        ),
     ]
 
     @classmethod
@@ -184,6 +256,68 @@ class AdvancedFilterSetTests(TestCase):
         self.assertIsInstance(form.or_forms[0], form_class)
         self.assertIsInstance(form.not_form, form_class)
 
+    def test_get_metadata(self) -> None:
+        """Test that the derived data is computed once for each class."""
+        class MetadataFilterSet(TaskFilter):
+            pass
+
+        metadata = MetadataFilterSet.get_metadata()
+        self.assertIs(metadata, MetadataFilterSet.get_metadata())
+        self.assertIsNot(metadata, TaskFilter.get_metadata())
+        self.assertIs(MetadataFilterSet().get_form_class(), MetadataFilterSet().get_form_class())
+        self.assertEqual('MetadataFilterSetTreeForm', metadata.form_class.__name__)
+        with patch.object(
+            AdvancedFilterSet,
+            '_get_fields',
+            new=MagicMock(return_value=OrderedDict()),
+        ) as get_fields_mock:
+            MetadataFilterSet.get_fields()
+            MetadataFilterSet.get_full_text_search_fields()
+            get_fields_mock.assert_not_called()
+        MetadataFilterSet.invalidate_metadata()
+        self.assertIsNot(metadata, MetadataFilterSet.get_metadata())
+        self.assertIsNot(metadata.form_class, MetadataFilterSet().get_form_class())
+
+    def test_get_metadata_with_request_dependent_filter(self) -> None:
+        """Test that form fields depending on a request are created for each instance."""
+        class RequestFilterSet(AdvancedFilterSet):
+            user = ModelChoiceFilter(queryset=lambda request: User.objects.all())
+
+            class Meta:
+                model = Task
+                fields = ('name',)
+
+        self.assertIsNone(RequestFilterSet.get_metadata().form_class)
+        self.assertIsNot(RequestFilterSet().get_form_class(), RequestFilterSet().get_form_class())
+
+    def test_search_vector_columns(self) -> None:
+        """Test stored search vector columns of the metadata."""
+        class SearchVectorFilterSet(AdvancedFilterSet):
+            class Meta:
+                model = Task
+                fields = {'name': ('full_text_search',), 'description': ('full_text_search',)}
+                search_vectors = {
+                    'search_vector': ('name',),
+                    'weighted_vector': {
+                        'fields': ('description', 'name'),
+                        'config': 'english',
+                        'weight': 'A',
+                    },
+                }
+
+        self.assertEqual(
+            {
+                get_search_vector_key(['name']): 'search_vector',
+                get_search_vector_key(['description', 'name'], 'english', 'A'): 'weighted_vector',
+            },
+            SearchVectorFilterSet.get_metadata().search_vector_columns,
+        )
+        self.assertNotIn(
+            get_search_vector_key(['name', 'description'], 'english', 'A'),
+            SearchVectorFilterSet.get_metadata().search_vector_columns,
+        )
+        self.assertEqual({}, UserFilter.get_metadata().search_vector_columns)
+
     def test_tree_form_errors(self) -> None:
         """Test getting a tree form class errors."""
         form_class = TaskFilter().get_form_class()
@@ -254,12 +388,41 @@ class AdvancedFilterSetTests(TestCase):
         last_name_filter = filterset.find_filter('last_name__contains')
         self.assertEqual(last_name_filter.field_name, 'last_name')
         self.assertEqual(last_name_filter.lookup_expr, 'contains')
+        self.assertIsNone(filterset.find_filter('last_name__icontains'))
+
+    def test_filter_names_index(self) -> None:
+        """Test indexes used by the `find_filter` method."""
+        metadata = AdvancedFilterSetTests.FindFilterFilterSet.get_metadata()
+        self.assertEqual(
+            {
+                ('last_name', 'contains'): 'in_last_name',
+                ('email', 'exact'): 'email',
+                ('first_name', 'iexact'): 'first_name__iexact',
+            },
+            metadata.lookup_filter_names,
+        )
+        self.assertEqual(
+            {
+                'in_last_name': 'in_last_name',
+                'last_name__contains': 'in_last_name',
+                'email': 'email',
+                'email__exact': 'email',
+                'first_name__iexact': 'first_name__iexact',
+            },
+            metadata.data_key_filter_names,
+        )
+        self.assertEqual('email', metadata.resolve_filter_name('email__exact'))
+        self.assertIsNone(metadata.resolve_filter_name('email__contains'))
 
     def test_filter_queryset(self) -> None:
         """Test the `filter_queryset` method."""
         task_filter = TaskFilter(data=self.task_filter_data)
         getattr(task_filter.form, 'errors')  # Ensure form validation before filtering
         tasks = task_filter.filter_queryset(task_filter.queryset.all())
+        self.assertEqual(
+            5,
+            len(task_filter.get_queryset_proxy_for_form(Task.objects.all(), task_filter.form).q),
+        )
         expected_tasks = Task.objects.filter(
             models.Q(user__in=(2, 3)) & models.Q(created_at__gt=self.gt_datetime) & models.Q(
                 completed_at__lt=self.lt_datetime,
@@ -269,6 +432,64 @@ class AdvancedFilterSetTests(TestCase):
         ).all()
         self.assertEqual(list(expected_tasks), list(tasks))
 
+    def test_filter_queryset_with_method(self) -> None:
+        """Test the `filter_queryset` method with a filter using the `method` argument."""
+        class MethodFilterSet(AdvancedFilterSet):
+            email_domain = CharFilter(method='filter_email_domain')
+
+            class Meta:
+                model = User
+                fields = ('first_name',)
+
+            def filter_email_domain(
+                self,
+                queryset: models.QuerySet,
+                name: str,
+                value: str,
+            ) -> models.QuerySet:
+                assert isinstance(queryset, QuerySetProxy)
+                return queryset.filter(email__endswith=f'@{value}')
+
+        filterset = MethodFilterSet(data={
+            'first_name': 'Alice',
+            'or': [{'email_domain': 'domain.com'}, {'email_domain': 'example.com'}],
+        })
+        self.assertTrue(filterset.is_valid())
+        self.assertEqual(
+            list(User.objects.filter(
+                models.Q(first_name='Alice'),
+                models.Q(email__endswith='@domain.com') | models.Q(email__endswith='@example.com'),
+            )),
+            list(filterset.qs),
+        )
+
+    def test_filter_queryset_with_equal_annotations(self) -> None:
+        """Test that equal annotations are added to a queryset once."""
+        search_rank = SearchRank(SearchVector('name'), SearchQuery('Important'))
+        data = {
+            'search_rank__gte': SearchRankFilter.Value(search_rank, 0.01),
+            'or': [
+                {'search_rank__lte': SearchRankFilter.Value(search_rank, 1)},
+                {'name__contains': 'Important', 'search_rank__lt': SearchRankFilter.Value(
+                    SearchRank(SearchVector('name'), SearchQuery('Important')), 1,
+                )},
+                {'search_rank__lt': SearchRankFilter.Value(
+                    SearchRank(SearchVector('description'), SearchQuery('Important')), 1,
+                )},
+            ],
+        }
+        filterset = TaskFilter(data=data)
+        self.assertTrue(filterset.is_valid())
+        self.assertEqual(
+            ['search_rank_search_rank_0', 'search_rank_search_rank_1'],
+            list(filterset.qs.query.annotations),
+        )
+        self.assertEqual(str(filterset.qs.query), str(TaskFilter(data=data).qs.query))
+        self.assertEqual(
+            list(Task.objects.annotate(rank=search_rank).filter(rank__gte=0.01, rank__lte=1)),
+            list(filterset.qs),
+        )
+
     def test_get_fields(self) -> None:
         """Test `get_fields` and `get_full_text_search_fields` methods."""
         self.assertEqual(
@@ -291,6 +512,10 @@ class AdvancedFilterSetTests(TestCase):
         base_filters = OrderedDict([('search_rank__gt', MagicMock())])
         filters = AdvancedFilterSet.create_special_filters(base_filters, SearchRankFilter)
         expected_filters = [
+            (
+                'search_rank__order',
+                SearchRankFilter(field_name='search_rank', lookup_expr='order'),
+            ),
             ('search_rank', SearchRankFilter(field_name='search_rank', lookup_expr='exact')),
             ('search_rank__gte', SearchRankFilter(field_name='search_rank', lookup_expr='gte')),
             ('search_rank__lt', SearchRankFilter(field_name='search_rank', lookup_expr='lt')),
@@ -307,6 +532,10 @@ class AdvancedFilterSetTests(TestCase):
             ('name__trigram__gte', TrigramFilter(field_name='name__trigram', lookup_expr='gte')),
             ('name__trigram__lt', TrigramFilter(field_name='name__trigram', lookup_expr='lt')),
             ('name__trigram__lte', TrigramFilter(field_name='name__trigram', lookup_expr='lte')),
+            (
+                'name__trigram__nearest',
+                TrigramFilter(field_name='name__trigram', lookup_expr='nearest'),
+            ),
         ]
         self.assertFiltersEqual(expected_filters, filters.items())
 
@@ -324,8 +553,10 @@ class AdvancedFilterSetTests(TestCase):
 
     @patch(
         'graphene_django_filter.conf.FIXED_SETTINGS', new={
-            'IS_POSTGRESQL': False,
-            'HAS_TRIGRAM_EXTENSION': False,
+            'default': {
+                'IS_POSTGRESQL': False,
+                'HAS_TRIGRAM_EXTENSION': False,
+            },
         },
     )
     def test_create_full_text_search_filters_without_postgresql(self) -> None:
@@ -338,8 +569,10 @@ class AdvancedFilterSetTests(TestCase):
 
     @patch(
         'graphene_django_filter.conf.FIXED_SETTINGS', new={
-            'IS_POSTGRESQL': True,
-            'HAS_TRIGRAM_EXTENSION': False,
+            'default': {
+                'IS_POSTGRESQL': True,
+                'HAS_TRIGRAM_EXTENSION': False,
+            },
         },
     )
     def test_create_full_text_search_filters_without_trigrams(self) -> None:
@@ -0,0 +1,199 @@
+"""`index_advisor` module tests."""
+
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.postgres.indexes import GinIndex, GistIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.core.management import call_command
+from django.db import models
+from django.db.models.functions import Upper
+from django.test import TestCase
+from graphene_django_filter.index_advisor import (
+    IndexShape,
+    advise_indexes,
+    get_filter_keys,
+    get_filterset_classes,
+    get_index_key,
+    get_migration_operations,
+)
+
+from .filtersets import TaskFilter, TaskGroupFilter, UserFilter
+from .models import Task, TaskGroup, User
+
+
+class IndexAdvisorTests(TestCase):
+    """The `index_advisor` module tests."""
+
+    def get_advices(self, **kwargs) -> dict:
+        """Return index recommendations for test filtersets by filter names."""
+        advices = advise_indexes([UserFilter, TaskFilter, TaskGroupFilter], **kwargs)
+        return {
+            filter_name: advice for advice in advices for filter_name in advice.filters
+        }
+
+    def test_get_filterset_classes(self) -> None:
+        """Test the `get_filterset_classes` function."""
+        filterset_classes = get_filterset_classes()
+        for filterset_class in (UserFilter, TaskFilter, TaskGroupFilter):
+            self.assertIn(filterset_class, filterset_classes)
+        self.assertFalse(
+            any(
+                filterset_class.__name__.startswith('Graphene')
+                for filterset_class in filterset_classes
+            ),
+        )
+
+    def test_existing_indexes(self) -> None:
+        """Test that lookups served by existing indexes are recognized."""
+        advices = self.get_advices()
+        self.assertEqual('email column', advices['UserFilter.email__exact'].existing)
+        self.assertEqual('email column', advices['UserFilter.email__startswith'].existing)
+        self.assertEqual('email column', advices['TaskFilter.user__email__exact'].existing)
+        self.assertEqual(User, advices['TaskFilter.user__email__exact'].model)
+        self.assertEqual('user column', advices['TaskFilter.user__in'].existing)
+        self.assertEqual('tasks relation', advices['TaskGroupFilter.tasks__exact'].existing)
+
+    def test_index_shape_serves(self) -> None:
+        """Test the `serves` method of the `IndexShape` class."""
+        gin = IndexShape('gin', ('name',), ('gin_trgm_ops',), 'gin')
+        gist = IndexShape('gist', ('name',), ('gist_trgm_ops',), 'gist')
+        self.assertTrue(gin.serves(gin))
+        self.assertTrue(gist.serves(gin))
+        self.assertTrue(gist.serves(gist))
+        self.assertFalse(gin.serves(gist))
+
+    def test_missing_indexes(self) -> None:
+        """Test recommendations of missing indexes."""
+        advices = self.get_advices()
+        expected = {
+            'UserFilter.is_active__exact': (User, models.Index(fields=['is_active'], name='i')),
+            'TaskGroupFilter.priority__gte': (
+                TaskGroup,
+                models.Index(fields=['priority'], name='i'),
+            ),
+            'TaskFilter.name__contains': (
+                Task,
+                GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='i'),
+            ),
+            'TaskFilter.name__trigram': (
+                Task,
+                GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='i'),
+            ),
+            'TaskFilter.name__trigram__nearest': (
+                Task,
+                GistIndex(fields=['name'], opclasses=['gist_trgm_ops'], name='i'),
+            ),
+            'TaskFilter.user__email__iexact': (
+                User,
+                models.Index(Upper(models.F('email')), name='i'),
+            ),
+            'TaskFilter.user__email__icontains': (
+                User,
+                GinIndex(OpClass(Upper(models.F('email')), name='gin_trgm_ops'), name='i'),
+            ),
+        }
+        for filter_name, (model, index) in expected.items():
+            advice = advices[filter_name]
+            self.assertEqual(model, advice.model)
+            self.assertIsNone(advice.existing)
+            self.assertEqual(get_index_key(index), get_index_key(advice.index))
+            self.assertLessEqual(len(advice.index.name), 30)
+
+    def test_search_indexes(self) -> None:
+        """Test recommendations of full text search indexes."""
+        advice = self.get_advices()['UserFilter.search_query']
+        self.assertIsNone(advice.index)
+        self.assertEqual('Search vectors without a config cannot be indexed.', advice.note)
+        advice = self.get_advices(search_config='english')['UserFilter.search_rank']
+        self.assertEqual(
+            get_index_key(
+                GinIndex(
+                    SearchVector(models.F('first_name'), models.F('last_name'), config='english'),
+                    name='i',
+                ),
+            ),
+            get_index_key(advice.index),
+        )
+
+    def test_search_vector_column_indexes(self) -> None:
+        """Test recommendations of stored search vector column indexes."""
+        advices = self.get_advices()
+        self.assertEqual('task_search_vector_gin', advices['TaskFilter.search_query'].existing)
+        self.assertEqual('task_search_vector_gin', advices['TaskFilter.search_rank'].existing)
+
+    def test_inputs(self) -> None:
+        """Test recommendations based on captured filter inputs."""
+        inputs = [
+            {'model': 'tests.User', 'filter': {'isActive': {'exact': True}}},
+            {
+                'model': 'tests.User',
+                'filter': {
+                    'or': [{'isActive': {'exact': False}}, {'firstName': {'contains': 'a'}}],
+                },
+            },
+        ]
+        advices = self.get_advices(inputs=inputs)
+        self.assertEqual(
+            ['UserFilter.is_active__exact', 'UserFilter.first_name__contains'],
+            list(advices),
+        )
+        self.assertEqual(2, advices['UserFilter.is_active__exact'].usage)
+        self.assertEqual(1, advices['UserFilter.first_name__contains'].usage)
+
+    def test_get_filter_keys(self) -> None:
+        """Test the `get_filter_keys` function."""
+        filter_input = {
+            'firstName': {'exact': 'John'},
+            'user': {'email': {'iexact': 'john@domain.com'}},
+            'and': [{'lastName': {'trigram': {'value': 'Dou', 'nearest': True}}}],
+            'not': {'searchQuery': {'vector': {'fields': ['name']}, 'query': {'value': 'a'}}},
+        }
+        self.assertEqual(
+            [
+                'first_name__exact',
+                'user__email__iexact',
+                'last_name__trigram',
+                'last_name__trigram__nearest',
+                'search_query',
+            ],
+            list(get_filter_keys(filter_input)),
+        )
+
+    def test_get_migration_operations(self) -> None:
+        """Test the `get_migration_operations` function."""
+        operations = get_migration_operations(advise_indexes([TaskFilter]))
+        self.assertEqual(['tests'], list(operations))
+        self.assertIsInstance(operations['tests'][0], TrigramExtension)
+        self.assertEqual(
+            1,
+            sum(isinstance(operation, TrigramExtension) for operation in operations['tests']),
+        )
+        self.assertIn(
+            ('task', 'created_at'),
+            [
+                (operation.model_name, operation.index.fields[0])
+                for operation in operations['tests'][1:] if operation.index.fields
+            ],
+        )
+
+    def test_command(self) -> None:
+        """Test the `advise_filterset_indexes` management command."""
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as inputs_file:
+            inputs_file.write(
+                json.dumps({'model': 'tests.Task', 'filter': {'createdAt': {'gt': '2022'}}}),
+            )
+        try:
+            stdout = StringIO()
+            call_command('advise_filterset_indexes', inputs=inputs_file.name, stdout=stdout)
+        finally:
+            os.remove(inputs_file.name)
+        output = stdout.getvalue()
+        self.assertIn('tests.Task: missing', output)
+        self.assertIn('TaskFilter.created_at__gt', output)
+        self.assertNotIn('tests.User', output)
+        self.assertIn("migrations.AddIndex(\n            model_name='task',", output)
+        self.assertIn("models.Index(fields=['created_at']", output)
@@ -0,0 +1,69 @@
+"""Package import tests."""
+
+import json
+import subprocess
+import sys
+from typing import List
+
+from django.test import SimpleTestCase
+
+HEAVY_MODULES = (
+    'anytree',
+    'django.contrib.postgres.search',
+    'django.test',
+    'graphene',
+    'graphene_django',
+    'stringcase',
+    'wrapt',
+)
+
+
+class ImportTests(SimpleTestCase):
+    """Tests that the package imports only the code paths in use."""
+
+    @staticmethod
+    def get_imported_heavy_modules(code: str) -> List[str]:
+        """Return heavy modules imported by the code in a fresh interpreter."""
+        script = '\n'.join((
+            'import json, sys',
+            'import django',
+            'django.setup()',
+            'modules = set(sys.modules)',
+            code,
+            f'print(json.dumps([m for m in {HEAVY_MODULES!r} if m in set(sys.modules) - modules]))',
+        ))
+        process = subprocess.run(
+            [sys.executable, '-c', script],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        return json.loads(process.stdout)
+
+    def test_package_import(self) -> None:
+        """Test that importing the package does not import dependencies."""
+        self.assertEqual(
+            [],
+            self.get_imported_heavy_modules(
+                'import graphene_django_filter\nimport graphene_django_filter.conf',
+            ),
+        )
+
+    def test_filterset_import(self) -> None:
+        """Test that importing the `AdvancedFilterSet` class does not import GraphQL modules."""
+        self.assertEqual(
+            [],
+            self.get_imported_heavy_modules(
+                'from graphene_django_filter import AdvancedFilterSet\n'
+                'import graphene_django_filter.filters',
+            ),
+        )
+
+    def test_connection_field_import(self) -> None:
+        """Test that importing the connection field does not import schema building modules."""
+        imported_modules = self.get_imported_heavy_modules(
+            'from graphene_django_filter import AdvancedDjangoFilterConnectionField',
+        )
+        self.assertIn('graphene_django', imported_modules)
+        self.assertNotIn('anytree', imported_modules)
+        self.assertNotIn('stringcase', imported_modules)
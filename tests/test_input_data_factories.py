@@ -16,14 +16,20 @@ from django.contrib.postgres.search import (
 )
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from graphene.types.inputobjecttype import InputObjectTypeContainer
+from graphene_django_filter.expressions import (
+    TrigramMatch,
+    TrigramNearestDistance,
+    TrigramWordDistance,
+    TrigramWordSimilarity,
+)
 from graphene_django_filter.filters import (
     SearchQueryFilter,
     SearchRankFilter,
     TrigramFilter,
 )
-from graphene_django_filter.filterset import AdvancedFilterSet
+from graphene_django_filter.filterset import AdvancedFilterSet, get_search_vector_key
 from graphene_django_filter.input_data_factories import (
     create_data,
     create_search_config,
@@ -63,6 +69,13 @@ class InputDataFactoriesTests(TestCase):
                     ('field2', MagicMock()),
                 ]),
             ),
+            get_metadata=MagicMock(
+                return_value=MagicMock(
+                    search_vector_columns={
+                        get_search_vector_key(['field1', 'field2'], 'russian'): 'vector',
+                    },
+                ),
+            ),
         ),
     )
 
@@ -200,6 +213,7 @@ class InputDataFactoriesTests(TestCase):
                     ('name', MagicMock()),
                 ]),
             ),
+            get_metadata=MagicMock(return_value=MagicMock(search_vector_columns={})),
         ),
     )
     gt_datetime = datetime.today() - timedelta(days=1)
@@ -321,7 +335,46 @@ class InputDataFactoriesTests(TestCase):
             }),
         })
         config_search_vector = create_search_vector(config_input_type, self.filterset_class_mock)
-        self.assertEqual(SearchVector('field1', 'field2', config='russian'), config_search_vector)
+        self.assertEqual(models.F('vector'), config_search_vector)
+        reversed_config_input_type = SearchVectorInputType._meta.container({
+            'fields': ['field2', 'field1'],
+            'config': SearchConfigInputType._meta.container({
+                'value': 'russian',
+            }),
+        })
+        self.assertEqual(
+            SearchVector('field2', 'field1', config='russian'),
+            create_search_vector(reversed_config_input_type, self.filterset_class_mock),
+        )
+        field_config_input_type = SearchVectorInputType._meta.container({
+            'fields': ['field1', 'field2'],
+            'config': SearchConfigInputType._meta.container({
+                'value': 'russian',
+                'is_field': True,
+            }),
+        })
+        field_config_search_vector = create_search_vector(
+            field_config_input_type,
+            self.filterset_class_mock,
+        )
+        self.assertEqual(
+            SearchVector('field1', 'field2', config=models.F('russian')),
+            field_config_search_vector,
+        )
+        english_config_input_type = SearchVectorInputType._meta.container({
+            'fields': ['field1', 'field2'],
+            'config': SearchConfigInputType._meta.container({
+                'value': 'english',
+            }),
+        })
+        english_config_search_vector = create_search_vector(
+            english_config_input_type,
+            self.filterset_class_mock,
+        )
+        self.assertEqual(
+            SearchVector('field1', 'field2', config='english'),
+            english_config_search_vector,
+        )
         weight_input_type = SearchVectorInputType._meta.container({
             'fields': ['field1', 'field2'],
             'weight': SearchVectorWeight.A,
@@ -331,26 +384,63 @@ class InputDataFactoriesTests(TestCase):
 
     def test_create_trigram_data(self) -> None:
         """Test the `create_trigram_data` function."""
-        for trigram_class in (TrigramSimilarity, TrigramDistance):
-            with self.subTest(trigram_class=trigram_class):
+        cases = (
+            (TrigramSearchKind.SIMILARITY, TrigramSimilarity('field', 'value'), '%', None),
+            (TrigramSearchKind.DISTANCE, TrigramDistance('field', 'value'), None, '%'),
+            (
+                TrigramSearchKind.WORD_SIMILARITY,
+                TrigramWordSimilarity('value', 'field'),
+                '%>',
+                None,
+            ),
+            (TrigramSearchKind.WORD_DISTANCE, TrigramWordDistance('value', 'field'), None, '%>'),
+        )
+        for kind, trigram, gt_operator, lt_operator in cases:
+            with self.subTest(kind=kind):
                 similarity_input_type = TrigramFilterInputType._meta.container({
-                    'kind': TrigramSearchKind.SIMILARITY
-                    if trigram_class == TrigramSimilarity else TrigramSearchKind.DISTANCE,
-                    'lookups': FloatLookupsInputType._meta.container({'gt': 0.8, 'lt': 0.9}),
+                    'kind': kind,
+                    'lookups': FloatLookupsInputType._meta.container({'gt': 0.8, 'lt': 0.4}),
                     'value': 'value',
                 })
                 trigram_data = create_trigram_data(similarity_input_type, 'field__trigram')
+                self.assertTrue(all(value.match_value is None for value in trigram_data.values()))
+                with override_settings(GRAPHENE_DJANGO_FILTER={
+                    'TRIGRAM_SIMILARITY_THRESHOLD': 0.3,
+                    'TRIGRAM_WORD_SIMILARITY_THRESHOLD': 0.6,
+                }):
+                    trigram_data = create_trigram_data(similarity_input_type, 'field__trigram')
                 expected_trigram_data = {
                     'field__trigram__gt': TrigramFilter.Value(
-                        annotation_value=trigram_class('field', 'value'),
+                        annotation_value=trigram,
                         search_value=0.8,
+                        match_value=gt_operator and TrigramMatch('field', 'value', gt_operator),
                     ),
                     'field__trigram__lt': TrigramFilter.Value(
-                        annotation_value=trigram_class('field', 'value'),
-                        search_value=0.9,
+                        annotation_value=trigram,
+                        search_value=0.4,
+                        match_value=lt_operator and TrigramMatch('field', 'value', lt_operator),
                     ),
                 }
                 self.assertEqual(expected_trigram_data, trigram_data)
+        for kind, operator in (
+            (TrigramSearchKind.DISTANCE, '<->'),
+            (TrigramSearchKind.WORD_SIMILARITY, '<->>'),
+        ):
+            with self.subTest(kind=kind):
+                nearest_input_type = TrigramFilterInputType._meta.container({
+                    'kind': kind,
+                    'nearest': True,
+                    'value': 'value',
+                })
+                self.assertEqual(
+                    {
+                        'field__trigram__nearest': TrigramFilter.Value(
+                            annotation_value=TrigramNearestDistance('field', 'value', operator),
+                            search_value=True,
+                        ),
+                    },
+                    create_trigram_data(nearest_input_type, 'field__trigram'),
+                )
 
     @patch.object(
         SearchRank,
@@ -390,6 +480,20 @@ class InputDataFactoriesTests(TestCase):
                 self.filterset_class_mock,
             )
             create_sq_mock.assert_called_with(self.search_rank_input_type.query)
+            order_input_type = SearchRankFilterInputType._meta.container({
+                'vector': MagicMock(),
+                'query': MagicMock(),
+                'order': True,
+            })
+            self.assertEqual(
+                {
+                    'field__order': SearchRankFilter.Value(
+                        annotation_value=SearchRank(vector=sv_mock, query=sq_mock),
+                        search_value=True,
+                    ),
+                },
+                create_search_rank_data(order_input_type, 'field', self.filterset_class_mock),
+            )
 
     def test_create_search_query_data(self) -> None:
         """Test the `create_search_query_data` function."""
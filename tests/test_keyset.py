@@ -0,0 +1,304 @@
+"""`keyset` module tests."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import graphene
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from graphene_django_filter import AdvancedDjangoFilterConnectionField
+from graphene_django_filter.keyset import (
+    KeysetConnectionField,
+    decode_cursor,
+    encode_cursor,
+    get_keyset_condition,
+    get_keyset_keys,
+)
+from graphql import GraphQLError
+from graphql_relay import from_global_id
+
+from .data_generation import generate_data
+from .models import Task, User
+from .object_types import TaskFilterFieldsType, UserFilterFieldsType
+
+
+class Query(graphene.ObjectType):
+    """Schema queries with keyset pagination."""
+
+    users = AdvancedDjangoFilterConnectionField(UserFilterFieldsType, keyset_pagination=True)
+    users_by_name = KeysetConnectionField(UserFilterFieldsType)
+    users_by_mixed_order = KeysetConnectionField(UserFilterFieldsType)
+    users_by_birthday = KeysetConnectionField(UserFilterFieldsType, ordering=graphene.String())
+    tasks_by_created_at = KeysetConnectionField(TaskFilterFieldsType)
+
+    @staticmethod
+    def resolve_users_by_name(root: Any, info: graphene.ResolveInfo, **kwargs) -> Any:
+        """Return users ordered by their names descending."""
+        return User.objects.order_by('-last_name', '-first_name')
+
+    @staticmethod
+    def resolve_users_by_mixed_order(root: Any, info: graphene.ResolveInfo, **kwargs) -> Any:
+        """Return users ordered by their first name ascending and their id descending."""
+        return User.objects.order_by('first_name', '-id')
+
+    @staticmethod
+    def resolve_users_by_birthday(
+        root: Any,
+        info: graphene.ResolveInfo,
+        ordering: str = 'birthday',
+        **kwargs,
+    ) -> Any:
+        """Return users ordered by their nullable birthdays."""
+        return User.objects.order_by(ordering)
+
+    @staticmethod
+    def resolve_tasks_by_created_at(root: Any, info: graphene.ResolveInfo, **kwargs) -> Any:
+        """Return tasks ordered by their creation time."""
+        return Task.objects.order_by('created_at')
+
+
+schema = graphene.Schema(query=Query)
+
+
+class KeysetTests(TestCase):
+    """The `keyset` module tests."""
+
+    query = """
+        query Users($first: Int, $last: Int, $after: String, $before: String, $offset: Int) {
+            %s(first: $first, last: $last, after: $after, before: $before, offset: $offset,
+                filter: {lastName: {exact: "Dou"}}) {
+                pageInfo {
+                    hasPreviousPage
+                    hasNextPage
+                    startCursor
+                    endCursor
+                }
+                edges {
+                    node {
+                        id
+                    }
+                }
+            }
+        }
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up `KeysetTests` class."""
+        super().setUpClass()
+        generate_data()
+
+    def execute(self, field_name: str, **variables) -> Dict[str, Any]:
+        """Execute the query with a connection field and return the connection data."""
+        execution_result = schema.execute(self.query % field_name, variable_values=variables)
+        self.assertIsNone(execution_result.errors)
+        return execution_result.data[field_name]
+
+    @staticmethod
+    def get_ids(connection: Dict[str, Any]) -> List[int]:
+        """Return primary keys of nodes of a connection."""
+        return [int(from_global_id(edge['node']['id'])[1]) for edge in connection['edges']]
+
+    def test_get_keyset_keys(self) -> None:
+        """Test the `get_keyset_keys` function."""
+        keys = get_keyset_keys(User.objects.order_by('-last_name', 'first_name'))
+        self.assertEqual(
+            [('last_name', True), ('first_name', False), ('pk', False)],
+            [(key.expression.name, key.descending) for key in keys],
+        )
+        keys = get_keyset_keys(User.objects.order_by('first_name', '-id'))
+        self.assertEqual(
+            [('first_name', False), ('id', True)],
+            [(key.expression.name, key.descending) for key in keys],
+        )
+        self.assertEqual(1, len(get_keyset_keys(User.objects.all())))
+        with self.assertRaisesMessage(
+            GraphQLError,
+            'Keyset pagination cannot be used with random ordering.',
+        ):
+            get_keyset_keys(User.objects.order_by('?'))
+
+    def test_cursors(self) -> None:
+        """Test the `encode_cursor` and `decode_cursor` functions."""
+        queryset = User.objects.order_by('birthday')
+        keys = get_keyset_keys(queryset)
+        queryset = queryset.annotate(**{key.name: key.expression for key in keys})
+        user = queryset.exclude(birthday=None).first()
+        cursor = encode_cursor([getattr(user, key.name) for key in keys])
+        self.assertEqual([user.birthday, user.pk], decode_cursor(cursor, keys, queryset))
+        for invalid_cursor in ('invalid', encode_cursor([1]), 'YXJyYXljb25uZWN0aW9uOjE='):
+            with self.assertRaisesMessage(GraphQLError, 'Invalid keyset cursor'):
+                decode_cursor(invalid_cursor, keys, queryset)
+        keys = [keys[0], keys[1]._replace(nullable=False)]
+        for values, after, expected_condition in (
+            ([None, 6], True, Q(birthday=None, pk__gt=6)),
+            ([None, 6], False, Q(birthday__isnull=False) | Q(birthday=None, pk__lt=6)),
+            ([user.birthday, user.pk], True, Q(
+                Q(birthday__gt=user.birthday),
+                Q(birthday=user.birthday, pk__gt=user.pk),
+                Q(birthday=None),
+                _connector=Q.OR,
+            )),
+        ):
+            self.assertEqual(
+                set(User.objects.filter(expected_condition)),
+                set(queryset.filter(get_keyset_condition(keys, values, after))),
+            )
+        with self.assertRaisesMessage(
+            GraphQLError,
+            'Keyset pagination requires ordering values that are not null.',
+        ):
+            get_keyset_condition(keys, [None, None], True)
+
+    def test_microsecond_cursors(self) -> None:
+        """Test pagination by times that differ only in microseconds."""
+        created_at = datetime(2022, 1, 1, 12, tzinfo=timezone.utc)
+        for task in Task.objects.all():
+            task.created_at = created_at + timedelta(microseconds=100 - task.id)
+            task.save(update_fields=['created_at'])
+        ids, cursor = [], None
+        for _ in range(Task.objects.count()):
+            execution_result = schema.execute(
+                """
+                query Tasks($after: String) {
+                    tasksByCreatedAt(first: 7, after: $after) {
+                        pageInfo {
+                            hasNextPage
+                            endCursor
+                        }
+                        edges {
+                            node {
+                                id
+                            }
+                        }
+                    }
+                }
+                """,
+                variable_values={'after': cursor},
+            )
+            self.assertIsNone(execution_result.errors)
+            page = execution_result.data['tasksByCreatedAt']
+            ids.extend(self.get_ids(page))
+            cursor = page['pageInfo']['endCursor']
+            if not page['pageInfo']['hasNextPage']:
+                break
+        self.assertEqual(list(Task.objects.order_by('-id').values_list('id', flat=True)), ids)
+
+    def test_nullable_ordering(self) -> None:
+        """Test pagination by a key with null values."""
+        query = """
+            query Users($first: Int, $last: Int, $after: String, $before: String,
+                $ordering: String) {
+                usersByBirthday(first: $first, last: $last, after: $after, before: $before,
+                    ordering: $ordering) {
+                    pageInfo {
+                        hasPreviousPage
+                        hasNextPage
+                        startCursor
+                        endCursor
+                    }
+                    edges {
+                        node {
+                            id
+                        }
+                    }
+                }
+            }
+        """
+        for ordering in ('birthday', '-birthday'):
+            with self.subTest(ordering=ordering):
+                expected_ids = list(
+                    User.objects.order_by(ordering, 'pk').values_list('pk', flat=True),
+                )
+                for forward in (True, False):
+                    ids, cursor = [], None
+                    for _ in range(len(expected_ids)):
+                        variables = {'ordering': ordering}
+                        if forward:
+                            variables.update(first=4, after=cursor)
+                        else:
+                            variables.update(last=4, before=cursor)
+                        execution_result = schema.execute(query, variable_values=variables)
+                        self.assertIsNone(execution_result.errors)
+                        page = execution_result.data['usersByBirthday']
+                        page_ids = self.get_ids(page)
+                        if forward:
+                            ids.extend(page_ids)
+                            cursor = page['pageInfo']['endCursor']
+                            has_more = page['pageInfo']['hasNextPage']
+                        else:
+                            ids[:0] = page_ids
+                            cursor = page['pageInfo']['startCursor']
+                            has_more = page['pageInfo']['hasPreviousPage']
+                        if not has_more:
+                            break
+                    self.assertEqual(expected_ids, ids)
+
+    def test_forward_pagination(self) -> None:
+        """Test pages requested with `first` and `after`."""
+        with self.assertNumQueries(1), override_settings(GRAPHENE_DJANGO_FILTER={
+            'LAZY_COUNT': True,
+        }):
+            first_page = self.execute('users', first=20)
+        self.assertEqual(list(range(31, 51)), self.get_ids(first_page))
+        self.assertEqual(
+            {'hasPreviousPage': False, 'hasNextPage': True},
+            {
+                key: value for key, value in first_page['pageInfo'].items()
+                if key.startswith('has')
+            },
+        )
+        second_page = self.execute('users', first=20, after=first_page['pageInfo']['endCursor'])
+        self.assertEqual(list(range(51, 71)), self.get_ids(second_page))
+        self.assertTrue(second_page['pageInfo']['hasPreviousPage'])
+        self.assertTrue(second_page['pageInfo']['hasNextPage'])
+        last_page = self.execute('users', first=20, after=second_page['pageInfo']['endCursor'])
+        self.assertEqual(list(range(71, 76)), self.get_ids(last_page))
+        self.assertFalse(last_page['pageInfo']['hasNextPage'])
+        page = self.execute('users', first=20, last=5, after=first_page['pageInfo']['endCursor'])
+        self.assertEqual(list(range(66, 71)), self.get_ids(page))
+        self.assertTrue(page['pageInfo']['hasPreviousPage'])
+
+    def test_backward_pagination(self) -> None:
+        """Test pages requested with `last` and `before`."""
+        last_page = self.execute('users', last=20)
+        self.assertEqual(list(range(56, 76)), self.get_ids(last_page))
+        self.assertTrue(last_page['pageInfo']['hasPreviousPage'])
+        self.assertFalse(last_page['pageInfo']['hasNextPage'])
+        page = self.execute('users', last=20, before=last_page['pageInfo']['startCursor'])
+        self.assertEqual(list(range(36, 56)), self.get_ids(page))
+        self.assertTrue(page['pageInfo']['hasPreviousPage'])
+        self.assertTrue(page['pageInfo']['hasNextPage'])
+        first_page = self.execute('users', last=20, before=page['pageInfo']['startCursor'])
+        self.assertEqual(list(range(31, 36)), self.get_ids(first_page))
+        self.assertFalse(first_page['pageInfo']['hasPreviousPage'])
+
+    def test_ordering(self) -> None:
+        """Test pagination with descending and mixed ordering."""
+        for field_name, expected_ids in (
+            ('usersByName', list(range(51, 76)) + list(range(31, 51))),
+            ('usersByMixedOrder', list(range(50, 30, -1)) + list(range(75, 50, -1))),
+        ):
+            ids, cursor = [], None
+            while True:
+                page = self.execute(field_name, first=7, after=cursor)
+                ids.extend(self.get_ids(page))
+                cursor = page['pageInfo']['endCursor']
+                if not page['pageInfo']['hasNextPage']:
+                    break
+            self.assertEqual(expected_ids, ids)
+            page = self.execute(field_name, last=7, before=self.execute(
+                field_name, first=10,
+            )['pageInfo']['endCursor'])
+            self.assertEqual(expected_ids[2:9], self.get_ids(page))
+
+    def test_offset(self) -> None:
+        """Test that the `offset` argument cannot be used with keyset pagination."""
+        execution_result = schema.execute(
+            self.query % 'users',
+            variable_values={'first': 5, 'offset': 10},
+        )
+        self.assertEqual(
+            'The `offset` argument cannot be used with keyset pagination.',
+            execution_result.errors[0].message,
+        )
@@ -0,0 +1,106 @@
+"""`limits` module tests."""
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from graphene_django_filter.limits import FilterLimitsChecker, check_filter_limits
+
+from .schema import schema
+
+
+class LimitsTests(TestCase):
+    """The `limits` module tests."""
+
+    filter_arg = {
+        'name': {'exact': 'name'},
+        'and': [
+            {'user': {'in': [1, 2, 3]}},
+            {'not': {'description': {'contains': 'description'}}},
+        ],
+        'or': [
+            {'search_query': {'query': {'or': [{'value': 'a'}, {'not': [{'value': 'b'}]}]}}},
+            {'first_name': {'trigram': {'value': 'john', 'lookups': {'gte': 0.8}}}},
+        ],
+    }
+
+    def assert_limit_exceeded(self, limit: str, value: int, message: str) -> None:
+        """Fail if the filter argument does not exceed the limit with the value."""
+        with override_settings(GRAPHENE_DJANGO_FILTER={limit: value}), \
+                self.assertRaisesMessage(ValidationError, message):
+            check_filter_limits(self.filter_arg)
+        with override_settings(GRAPHENE_DJANGO_FILTER={limit: value + 1}):
+            check_filter_limits(self.filter_arg)
+
+    def test_without_limits(self) -> None:
+        """Test the `check_filter_limits` function without limits."""
+        check_filter_limits(self.filter_arg)
+
+    def test_limits(self) -> None:
+        """Test the `check_filter_limits` function with limits."""
+        self.assert_limit_exceeded(
+            'MAX_FILTER_DEPTH', 2,
+            'The filter depth exceeds the limit of 2.',
+        )
+        self.assert_limit_exceeded(
+            'MAX_FILTER_NODES', 5,
+            'The number of filter nodes exceeds the limit of 5.',
+        )
+        self.assert_limit_exceeded(
+            'MAX_FILTER_FAN_OUT', 1,
+            'The number of `and` branches exceeds the limit of 1.',
+        )
+        self.assert_limit_exceeded(
+            'MAX_FILTER_LIST_LENGTH', 2,
+            'The length of the `user__in` list exceeds the limit of 2.',
+        )
+        self.assert_limit_exceeded(
+            'MAX_SEARCH_QUERY_DEPTH', 2,
+            'The search query depth exceeds the limit of 2.',
+        )
+        self.assert_limit_exceeded(
+            'MAX_SEARCH_CLAUSES', 1,
+            'The number of full text and trigram search clauses exceeds the limit of 1.',
+        )
+
+    def test_search_clauses(self) -> None:
+        """Test that only search filters are counted as search clauses."""
+        with override_settings(GRAPHENE_DJANGO_FILTER={'MAX_SEARCH_CLAUSES': 0}):
+            checker = FilterLimitsChecker()
+            checker.check_node({
+                'trigram': {'exact': 'name'},
+                'trigram_name': {'exact': 'name'},
+                'user': {'search_query_count': {'gt': 1}},
+            }, 1)
+            self.assertEqual(0, checker.search_clause_count)
+            with self.assertRaisesMessage(ValidationError, 'search clauses'):
+                checker.check_node({'user': {'last_name': {'trigram': {'value': 'a'}}}}, 1)
+
+    def test_search_query_not(self) -> None:
+        """Test that subqueries of the `not` list of a search query are checked."""
+        filter_arg = {'search_query': {'query': {'value': 'Important', 'not': [{'value': 'task'}]}}}
+        with override_settings(GRAPHENE_DJANGO_FILTER={'MAX_SEARCH_QUERY_DEPTH': 2}):
+            check_filter_limits(filter_arg)
+        with override_settings(GRAPHENE_DJANGO_FILTER={'MAX_SEARCH_QUERY_DEPTH': 1}), \
+                self.assertRaisesMessage(ValidationError, 'The search query depth exceeds'):
+            check_filter_limits(filter_arg)
+
+    def test_execution(self) -> None:
+        """Test that limits are checked during the schema execution."""
+        query = """
+            {
+                usersFields(
+                    filter: {or: [{firstName: {exact: "Bob"}}, {lastName: {exact: "Smith"}}]}
+                ) {
+                    edges {
+                        node {
+                            id
+                        }
+                    }
+                }
+            }
+        """
+        with override_settings(GRAPHENE_DJANGO_FILTER={'MAX_FILTER_FAN_OUT': 1}):
+            execution_result = schema.execute(query)
+        self.assertEqual(
+            ['The number of `or` branches exceeds the limit of 1.'],
+            [error.message for error in execution_result.errors],
+        )
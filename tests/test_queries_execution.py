@@ -2,9 +2,14 @@
 
 from datetime import datetime
 from typing import List
+from unittest.mock import patch
 
-from django.test import TestCase
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import make_aware
+from graphene_django_filter import AdvancedDjangoFilterConnectionField
 from graphql.execution import ExecutionResult
 from graphql_relay import from_global_id
 
@@ -235,6 +240,58 @@ class FullTextSearchTests(QueriesExecutionTests):
         }
     """
     search_rank_fields_query = search_rank_query % 'tasksFields'
+    search_rank_order_query = """
+        {
+            tasksFilterset(
+                filter: {
+                    searchRank: {
+                        vector: {fields: ["name"]}
+                        query: {value: "Important task №"}
+                        lookups: {gte: 0.08}
+                        order: true
+                    }
+                }
+                first: 5
+            ) {
+                edges {
+                    node {
+                        id
+                        searchRank
+                    }
+                }
+            }
+        }
+    """
+    search_rank_nested_order_query = """
+        {
+            tasksFilterset(
+                filter: {
+                    searchRank: {
+                        vector: {fields: ["name"]}
+                        query: {value: "Important task №"}
+                        lookups: {gte: 0.01}
+                    }
+                    and: [
+                        {
+                            searchRank: {
+                                vector: {fields: ["name"]}
+                                query: {value: "Important task №"}
+                                order: true
+                            }
+                        }
+                    ]
+                }
+                first: 5
+            ) {
+                edges {
+                    node {
+                        id
+                        searchRank
+                    }
+                }
+            }
+        }
+    """
     search_rank_filterset_query = search_rank_query % 'tasksFilterset'
     trigram_query = """
         {
@@ -271,6 +328,23 @@ class FullTextSearchTests(QueriesExecutionTests):
     trigram_fields_query = trigram_query % 'usersFields'
     trigram_filterset_query = trigram_query % 'usersFilterset'
 
+    nearest_query = """
+        {
+            usersFields(
+                filter: {firstName: {trigram: {value: "jane", nearest: true}}}
+                first: 22
+                %s
+            ) {
+                edges {
+                    cursor
+                    node {
+                        id
+                    }
+                }
+            }
+        }
+    """
+
     def test_search_query_execution(self) -> None:
         """Test the schema execution by a search query."""
         expected = list(range(1, 31))
@@ -283,8 +357,161 @@ class FullTextSearchTests(QueriesExecutionTests):
         self.assert_query_execution(expected, self.search_rank_fields_query, 'tasksFields')
         self.assert_query_execution(expected, self.search_rank_filterset_query, 'tasksFilterset')
 
+    def test_search_rank_order_execution(self) -> None:
+        """Test the schema execution by a search rank ordering the connection."""
+        with CaptureQueriesContext(connection) as context:
+            execution_result = schema.execute(self.search_rank_order_query)
+        self.assertIsNone(execution_result.errors)
+        sql = context.captured_queries[-1]['sql']
+        self.assertIn(') AS "search_rank"', sql)
+        self.assertIn('DESC, "tests_task"."id" ASC LIMIT 6', sql)
+        self.assertEqual(2, sql.count('ts_rank'))
+        edges = execution_result.data['tasksFilterset']['edges']
+        self.assertEqual(
+            list(range(31, 36)),
+            [int(from_global_id(edge['node']['id'])[1]) for edge in edges],
+        )
+        ranks = [edge['node']['searchRank'] for edge in edges]
+        self.assertTrue(all(rank >= 0.08 for rank in ranks))
+        self.assertEqual(sorted(ranks, reverse=True), ranks)
+        execution_result = schema.execute(self.search_rank_filterset_query)
+        self.assertIsNone(execution_result.errors)
+        execution_result = schema.execute(self.search_rank_nested_order_query)
+        self.assertIsNone(execution_result.errors)
+        edges = execution_result.data['tasksFilterset']['edges']
+        self.assertEqual(
+            list(range(31, 36)),
+            [int(from_global_id(edge['node']['id'])[1]) for edge in edges],
+        )
+        ranks = [edge['node']['searchRank'] for edge in edges]
+        self.assertTrue(all(rank is not None and rank >= 0.01 for rank in ranks))
+        self.assertEqual(sorted(ranks, reverse=True), ranks)
+
+    def test_search_vector_column_execution(self) -> None:
+        """Test that a stored search vector column is used instead of a computed vector."""
+        with CaptureQueriesContext(connection) as context:
+            schema.execute(self.search_rank_filterset_query)
+        sql = '\n'.join(query['sql'] for query in context.captured_queries)
+        self.assertIn('"tests_task"."search_vector"', sql)
+        self.assertNotIn('to_tsvector', sql)
+        with CaptureQueriesContext(connection) as context:
+            schema.execute(self.search_rank_fields_query)
+        sql = '\n'.join(query['sql'] for query in context.captured_queries)
+        self.assertIn('to_tsvector', sql)
+
     def test_trigram_execution(self) -> None:
         """Test the schema execution by a trigram."""
         expected = list(range(31, 76))
         self.assert_query_execution(expected, self.trigram_fields_query, 'usersFields')
         self.assert_query_execution(expected, self.trigram_filterset_query, 'usersFilterset')
+
+    def test_trigram_nearest_execution(self) -> None:
+        """Test the schema execution by a trigram search ordered from the nearest."""
+        with CaptureQueriesContext(connection) as context:
+            execution_result = schema.execute(self.nearest_query % '')
+        sql = '\n'.join(query['sql'] for query in context.captured_queries)
+        self.assertIn('ORDER BY ("tests_user"."first_name" <-> \'jane\') ASC', sql)
+        self.assertIn('LIMIT 23', sql)
+        edges = execution_result.data['usersFields']['edges']
+        self.assertEqual(
+            [*range(31, 51), 51, 52],
+            [int(from_global_id(edge['node']['id'])[1]) for edge in edges],
+        )
+        execution_result = schema.execute(self.nearest_query % f'after: "{edges[19]["cursor"]}"')
+        self.assertEqual(
+            list(range(51, 73)),
+            [
+                int(from_global_id(edge['node']['id'])[1])
+                for edge in execution_result.data['usersFields']['edges']
+            ],
+        )
+
+    def test_alias_filter_annotations_execution(self) -> None:
+        """Test that filter annotations are not selected if they are added as aliases."""
+        with override_settings(GRAPHENE_DJANGO_FILTER={'ALIAS_FILTER_ANNOTATIONS': True}):
+            with CaptureQueriesContext(connection) as context:
+                self.assert_query_execution(
+                    list(range(31, 76)),
+                    self.trigram_fields_query,
+                    'usersFields',
+                )
+            select = context.captured_queries[-1]['sql'].split(' FROM ')[0]
+            self.assertNotIn('SIMILARITY', select)
+            with CaptureQueriesContext(connection) as context:
+                execution_result = schema.execute(self.search_rank_order_query)
+            select = context.captured_queries[-1]['sql'].split(' FROM ')[0]
+            self.assertIn('AS "search_rank"', select)
+            self.assertEqual(1, select.count('ts_rank'))
+            self.assertEqual(5, len(execution_result.data['tasksFilterset']['edges']))
+
+    def test_trigram_operator_execution(self) -> None:
+        """Test that a trigram search filters rows with indexable `pg_trgm` operators."""
+        with CaptureQueriesContext(connection) as context:
+            schema.execute(self.trigram_fields_query)
+        sql = '\n'.join(query['sql'] for query in context.captured_queries)
+        self.assertNotIn(' % ', sql)
+        with override_settings(GRAPHENE_DJANGO_FILTER={
+            'TRIGRAM_SIMILARITY_THRESHOLD': 0.3,
+            'TRIGRAM_WORD_SIMILARITY_THRESHOLD': 0.6,
+        }):
+            with CaptureQueriesContext(connection) as context:
+                schema.execute(self.trigram_fields_query)
+            sql = '\n'.join(query['sql'] for query in context.captured_queries)
+            self.assertIn('"tests_user"."first_name" % \'john\'', sql)
+            self.assertIn('"tests_user"."last_name" % \'dou\'', sql)
+            with CaptureQueriesContext(connection) as context:
+                execution_result = schema.execute(self.trigram_fields_query.replace(
+                    '{gte: 0.85}',
+                    '{gte: 0.85}, kind: WORD_SIMILARITY',
+                ))
+            sql = '\n'.join(query['sql'] for query in context.captured_queries)
+            self.assertIn('"tests_user"."first_name" %> \'john\'', sql)
+            self.assertEqual(list(range(31, 76)), self.get_ids(execution_result, 'usersFields'))
+
+
+class AsyncExecutionTests(QueriesExecutionTests):
+    """Tests for executing queries in an event loop."""
+
+    users_query = """
+        {
+            usersFields(filter: {isActive: {exact: true}}, first: 5, offset: 2) {
+                pageInfo {
+                    hasNextPage
+                    hasPreviousPage
+                }
+                edges {
+                    node {
+                        id
+                    }
+                }
+            }
+        }
+    """
+    tasks_query = """
+        {
+            tasksFields(filter: {user: {in: ["2", "3"]}}, last: 3) {
+                edges {
+                    node {
+                        id
+                    }
+                }
+            }
+        }
+    """
+
+    async def test_async_execution(self) -> None:
+        """Test that the execution in an event loop gives the same results as a synchronous one."""
+        async_resolve_connection = AdvancedDjangoFilterConnectionField.async_resolve_connection
+        for query in (self.users_query, self.tasks_query):
+            with patch.object(
+                AdvancedDjangoFilterConnectionField,
+                'async_resolve_connection',
+                wraps=async_resolve_connection,
+            ) as async_resolve_connection_mock:
+                execution_result = await schema.execute_async(query)
+                async_resolve_connection_mock.assert_called_once()
+            self.assertIsNone(execution_result.errors)
+            self.assertEqual(
+                (await sync_to_async(schema.execute)(query)).data,
+                execution_result.data,
+            )
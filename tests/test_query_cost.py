@@ -0,0 +1,77 @@
+"""`query_cost` module tests."""
+
+import graphene
+from django.test import TestCase
+from graphene_django_filter import AdvancedDjangoFilterConnectionField
+from graphene_django_filter.query_cost import QueryCost, check_query_cost, estimate_query_cost
+from graphql import GraphQLError
+
+from .data_generation import generate_data
+from .models import User
+from .object_types import UserFilterFieldsType
+
+
+class QueryCostTests(TestCase):
+    """The `query_cost` module tests."""
+
+    class Query(graphene.ObjectType):
+        cheap_users = AdvancedDjangoFilterConnectionField(
+            UserFilterFieldsType,
+            filter_input_type_prefix='CheapUser',
+            max_query_cost=10 ** 9,
+            max_query_rows=10 ** 9,
+        )
+        free_users = AdvancedDjangoFilterConnectionField(
+            UserFilterFieldsType,
+            filter_input_type_prefix='FreeUser',
+            max_query_cost=0,
+        )
+
+    query = """
+        {
+            %s(filter: {email: {contains: "alice"}}) {
+                edges {
+                    node {
+                        id
+                    }
+                }
+            }
+        }
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up `QueryCostTests` class."""
+        super().setUpClass()
+        generate_data()
+
+    def test_estimate_query_cost(self) -> None:
+        """Test the `estimate_query_cost` function."""
+        query_cost = estimate_query_cost(User.objects.filter(email__contains='alice'))
+        self.assertIsInstance(query_cost, QueryCost)
+        self.assertGreater(query_cost.cost, 0)
+        self.assertGreater(query_cost.rows, 0)
+
+    def test_check_query_cost(self) -> None:
+        """Test the `check_query_cost` function."""
+        queryset = User.objects.filter(email__contains='alice')
+        check_query_cost(queryset)
+        check_query_cost(queryset, max_cost=10 ** 9, max_rows=10 ** 9)
+        message = 'The filter is too expensive to execute.'
+        with self.assertRaisesMessage(GraphQLError, message) as cm:
+            check_query_cost(queryset, max_cost=0)
+        self.assertEqual('QUERY_COST_EXCEEDED', cm.exception.extensions['code'])
+        self.assertEqual(0, cm.exception.extensions['maxCost'])
+        self.assertIsNone(cm.exception.extensions['maxRows'])
+
+    def test_execution(self) -> None:
+        """Test that query cost thresholds are checked during the schema execution."""
+        schema = graphene.Schema(query=self.Query)
+        execution_result = schema.execute(self.query % 'cheapUsers')
+        self.assertIsNone(execution_result.errors)
+        self.assertEqual(25, len(execution_result.data['cheapUsers']['edges']))
+        execution_result = schema.execute(self.query % 'freeUsers')
+        self.assertEqual(
+            'QUERY_COST_EXCEEDED',
+            execution_result.errors[0].extensions['code'],
+        )
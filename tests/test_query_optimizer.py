@@ -0,0 +1,140 @@
+"""`query_optimizer` module tests."""
+
+from datetime import date, datetime
+
+from django.db import models
+from django.test import TestCase, override_settings
+from graphene_django_filter.query_optimizer import LookupInfo, analyse_lookup, optimize_q
+
+from .data_generation import generate_data
+from .filtersets import TaskFilter
+from .models import Task, User
+
+
+class QueryOptimizerTests(TestCase):
+    """The `query_optimizer` module tests."""
+
+    def test_analyse_lookup(self) -> None:
+        """Test the `analyse_lookup` function."""
+        query = Task.objects.annotate(name_length=models.Value(1)).query
+        self.assertEqual(LookupInfo('name', 'exact', False), analyse_lookup(query, 'name'))
+        self.assertEqual(
+            LookupInfo('user__email', 'in', False),
+            analyse_lookup(query, 'user__email__in'),
+        )
+        self.assertEqual(
+            LookupInfo('taskgroup__priority', 'gt', True),
+            analyse_lookup(query, 'taskgroup__priority__gt'),
+        )
+        self.assertEqual(
+            LookupInfo('name_length', 'gte', False),
+            analyse_lookup(query, 'name_length__gte'),
+        )
+        self.assertEqual(
+            LookupInfo(None, None, False),
+            analyse_lookup(query, 'created_at__year__gt'),
+        )
+        self.assertEqual(LookupInfo(None, None, True), analyse_lookup(query, 'unknown'))
+
+    def test_flatten_and_deduplicate(self) -> None:
+        """Test flattening of nested groups and removing of duplicates."""
+        query = Task.objects.all().query
+        q = models.Q(name='a') & (models.Q(description='b') & models.Q(name='a'))
+        self.assertEqual(models.Q(name='a') & models.Q(description='b'), optimize_q(q, query))
+
+    def test_fold_disjunction(self) -> None:
+        """Test folding of equalities into the `in` lookup."""
+        query = Task.objects.all().query
+        q = models.Q(name='a') | models.Q(name__in=['b', 'a']) | models.Q(description='c')
+        self.assertEqual(
+            models.Q(name__in=['a', 'b']) | models.Q(description='c'),
+            optimize_q(q, query),
+        )
+
+    def test_merge_conjunction(self) -> None:
+        """Test merging of equalities and bounds."""
+        query = User.objects.all().query
+        q = models.Q(id__in=[1, 2, 3]) & models.Q(id__in=[2, 3, 4]) & models.Q(id__gt=2)
+        self.assertEqual(models.Q(id__exact=3), optimize_q(q, query))
+        q = models.Q(birthday__gte=date(2000, 1, 1)) & models.Q(birthday__lte=date(2001, 1, 1)) & \
+            models.Q(birthday__gte=date(2000, 6, 1))
+        self.assertEqual(
+            models.Q(birthday__range=(date(2000, 6, 1), date(2001, 1, 1))),
+            optimize_q(q, query),
+        )
+        q = models.Q(id__gt=1) & models.Q(id__lt=5) & models.Q(id__gt=2)
+        self.assertEqual(models.Q(id__gt=2, id__lt=5), optimize_q(q, query))
+        q = models.Q(email__gt='a') & models.Q(email__gt='b')
+        self.assertEqual(q, optimize_q(q, query))
+        q = models.Q(birthday=date(2000, 1, 1)) & models.Q(birthday__gt=datetime(2000, 1, 1))
+        self.assertEqual(q, optimize_q(q, query))
+        task_query = Task.objects.all().query
+        user = User(pk=1)
+        self.assertEqual(
+            models.Q(user__exact=1),
+            optimize_q(models.Q(user=user) & models.Q(user=1), task_query),
+        )
+        self.assertEqual(
+            models.Q(user__exact=2),
+            optimize_q(models.Q(user__in=[user, User(pk=2)]) & models.Q(user__gte=2), task_query),
+        )
+
+    def test_contradictions(self) -> None:
+        """Test detection of contradictions."""
+        query = User.objects.all().query
+        self.assertIsNone(optimize_q(models.Q(id=1) & models.Q(id=2), query))
+        self.assertIsNone(optimize_q(models.Q(id__gt=5) & models.Q(id__lte=5), query))
+        self.assertIsNone(optimize_q(models.Q(id__in=[]) | models.Q(id__in=[]), query))
+        self.assertEqual(
+            models.Q(email='a'),
+            optimize_q(models.Q(id__in=[]) | models.Q(email='a'), query),
+        )
+        self.assertEqual(models.Q(), optimize_q(~models.Q(id__in=[]), query))
+
+    def test_push_negations(self) -> None:
+        """Test pushing of negations down to the leaves."""
+        query = Task.objects.all().query
+        q = ~(models.Q(name='a') | ~models.Q(description='b'))
+        self.assertEqual(~models.Q(name='a') & models.Q(description='b'), optimize_q(q, query))
+        q = ~(models.Q(name='a') | models.Q(taskgroup__priority=1))
+        self.assertEqual(q, optimize_q(q, query))
+
+    def test_factor_disjunction(self) -> None:
+        """Test factoring of common conjuncts out of disjunctions."""
+        query = Task.objects.all().query
+        q = models.Q(user=1, name='a') | models.Q(user=1, description='b')
+        self.assertEqual(
+            models.Q(user=1) & (models.Q(name='a') | models.Q(description='b')),
+            optimize_q(q, query),
+        )
+        q = models.Q(user=1) | models.Q(user=1, name='a')
+        self.assertEqual(models.Q(user=1), optimize_q(q, query))
+
+    def test_filter_queryset(self) -> None:
+        """Test the `filter_queryset` method with the optimization."""
+        generate_data()
+        data = {
+            'or': [
+                {'name__contains': 'Important'},
+                {'name__contains': 'Important', 'description__contains': 'important'},
+                {'description__contains': 'important'},
+            ],
+            'and': [
+                {'user__in': [1, 2, 3]},
+                {'user__in': [2, 3, 4]},
+            ],
+        }
+        with override_settings(GRAPHENE_DJANGO_FILTER={'OPTIMIZE_FILTERS': False}):
+            expected = list(TaskFilter(data=data, queryset=Task.objects.all()).qs.order_by('pk'))
+        self.assertEqual(60, len(expected))
+        self.assertEqual(
+            expected,
+            list(TaskFilter(data=data, queryset=Task.objects.all()).qs.order_by('pk')),
+        )
+        data = {'and': [{'user': 2}, {'user': 3}]}
+        self.assertTrue(TaskFilter(data=data, queryset=Task.objects.all()).qs.query.is_empty())
+        q = models.Q(user=User.objects.get(pk=1)) & models.Q(user=1)
+        self.assertEqual(
+            Task.objects.filter(user=1).count(),
+            Task.objects.filter(optimize_q(q, Task.objects.all().query)).count(),
+        )
@@ -0,0 +1,162 @@
+"""`search_vectors` module tests."""
+
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.postgres.search import SearchVector
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from graphene_django_filter import AdvancedFilterSet
+from graphene_django_filter.search_vectors import (
+    SIGNAL_COLUMNS,
+    SearchVectorColumn,
+    connect_search_vector_signals,
+    disconnect_search_vector_signals,
+    get_search_vector_columns,
+    get_search_vector_trigger_sql,
+    rebuild_search_vectors,
+)
+
+from .data_generation import generate_data
+from .filtersets import TaskFilter
+from .models import Task
+
+
+class SearchVectorsTests(TestCase):
+    """The `search_vectors` module tests."""
+
+    class WeightedTaskFilter(AdvancedFilterSet):
+        class Meta:
+            model = Task
+            fields = {'name': ('full_text_search',), 'description': ('full_text_search',)}
+            search_vectors = {
+                'search_vector': {
+                    'fields': ('name', 'description'),
+                    'config': 'english',
+                    'weight': 'B',
+                },
+            }
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        """Set up `SearchVectorsTests` data."""
+        generate_data()
+
+    def assert_search_vectors(self, expression: SearchVector) -> None:
+        """Fail if stored search vectors of tasks differ from computed ones."""
+        tasks = Task.objects.annotate(expected=expression).values_list('search_vector', 'expected')
+        for search_vector, expected in tasks:
+            self.assertEqual(expected, search_vector)
+
+    def test_get_search_vector_columns(self) -> None:
+        """Test the `get_search_vector_columns` function."""
+        self.assertEqual(
+            [
+                SearchVectorColumn(Task, 'search_vector', ('name',)),
+                SearchVectorColumn(Task, 'search_vector', ('name', 'description'), 'english', 'B'),
+            ],
+            [
+                *get_search_vector_columns([TaskFilter, TaskFilter]),
+                *get_search_vector_columns([self.WeightedTaskFilter]),
+            ],
+        )
+
+        class RelatedFilter(AdvancedFilterSet):
+            class Meta:
+                model = Task
+                fields = {'user__first_name': ('full_text_search',)}
+                search_vectors = {'search_vector': ('user__first_name',)}
+
+        with self.assertRaises(ImproperlyConfigured):
+            get_search_vector_columns([RelatedFilter])
+
+    def test_signals(self) -> None:
+        """Test updating search vectors of saved instances."""
+        connect_search_vector_signals([TaskFilter])
+        try:
+            task = Task.objects.get(pk=1)
+            task.name = 'Renamed task'
+            task.save()
+            task.description = 'Changed description'
+            task.save(update_fields=['description'])
+        finally:
+            disconnect_search_vector_signals()
+        self.assertEqual(
+            "'renam':1 'task':2",
+            Task.objects.values_list('search_vector', flat=True).get(pk=1),
+        )
+        with patch(
+            'graphene_django_filter.index_advisor.autodiscover_modules',
+        ) as autodiscover_modules_mock, patch(
+            'graphene_django_filter.index_advisor.get_filterset_classes',
+            return_value=[TaskFilter],
+        ):
+            connect_search_vector_signals()
+        try:
+            autodiscover_modules_mock.assert_called_once_with('filtersets', 'schema')
+            self.assertIn(Task, SIGNAL_COLUMNS)
+        finally:
+            disconnect_search_vector_signals()
+        task = Task.objects.get(pk=1)
+        task.name = 'Not updated'
+        task.save()
+        self.assertEqual(
+            "'renam':1 'task':2",
+            Task.objects.values_list('search_vector', flat=True).get(pk=1),
+        )
+
+    def test_rebuild_search_vectors(self) -> None:
+        """Test rebuilding search vectors in batches."""
+        columns = get_search_vector_columns([self.WeightedTaskFilter])
+        progress = list(rebuild_search_vectors(Task, columns, batch_size=20))
+        self.assertEqual([20, 40, 60, 75], [p.rows for p in progress])
+        self.assertEqual([20, 40, 60, 75], [p.last_pk for p in progress])
+        self.assert_search_vectors(
+            SearchVector('name', 'description', config='english', weight='B'),
+        )
+        Task.objects.filter(pk__gt=70).update(search_vector=None)
+        progress = list(
+            rebuild_search_vectors(Task, columns, batch_size=20, start_after=72, missing_only=True),
+        )
+        self.assertEqual([(3, 75)], [(p.rows, p.last_pk) for p in progress])
+        self.assertEqual(2, Task.objects.filter(search_vector=None).count())
+
+    def test_trigger(self) -> None:
+        """Test the trigger maintaining search vectors."""
+        column = get_search_vector_columns([self.WeightedTaskFilter])[0]
+        create_sql, drop_sql = get_search_vector_trigger_sql(column)
+        with connection.cursor() as cursor:
+            cursor.execute(create_sql)
+            Task.objects.update(name='Triggered name')
+            Task.objects.create(
+                name='Created task',
+                description='Description',
+                created_at=timezone.now(),
+                user_id=1,
+            )
+            self.assert_search_vectors(
+                SearchVector('name', 'description', config='english', weight='B'),
+            )
+            cursor.execute(drop_sql)
+        Task.objects.update(name='Untriggered name')
+        self.assertFalse(Task.objects.filter(search_vector__icontains='untrigger').exists())
+
+    def test_commands(self) -> None:
+        """Test the `rebuild_search_vectors` and `search_vector_triggers` commands."""
+        Task.objects.update(search_vector=None)
+        stdout = StringIO()
+        call_command('rebuild_search_vectors', 'tests.Task', batch_size=50, stdout=stdout)
+        self.assertEqual(
+            'tests.Task: 50 rows, last pk 50\n'
+            'tests.Task: 75 rows, last pk 75\n'
+            'tests.Task: rebuilt 75 rows\n',
+            stdout.getvalue(),
+        )
+        self.assert_search_vectors(SearchVector('name'))
+        stdout = StringIO()
+        call_command('search_vector_triggers', stdout=stdout)
+        self.assertIn('migrations.RunSQL(', stdout.getvalue())
+        self.assertIn('CREATE TRIGGER "tests_task_search_vector_trigger"', stdout.getvalue())
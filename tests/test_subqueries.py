@@ -0,0 +1,128 @@
+"""`subqueries` module tests."""
+
+from django.db import models
+from django.test import TestCase, override_settings
+from graphene_django_filter import AdvancedFilterSet
+from graphene_django_filter.subqueries import (
+    MultivaluedPath,
+    get_multivalued_path,
+    has_multivalued_joins,
+    use_exists_subqueries,
+)
+
+from .data_generation import generate_data
+from .filtersets import TaskGroupFilter
+from .models import Task, TaskGroup, User
+
+
+class SubqueriesTests(TestCase):
+    """The `subqueries` module tests."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up `SubqueriesTests` class."""
+        super().setUpClass()
+        generate_data()
+
+    def test_get_multivalued_path(self) -> None:
+        """Test the `get_multivalued_path` function."""
+        self.assertEqual(
+            MultivaluedPath('tasks', Task, 'taskgroup__pk', 'pk', 1),
+            get_multivalued_path(TaskGroup, 'tasks__name__contains'),
+        )
+        self.assertEqual(
+            MultivaluedPath('user__task', Task, 'user__pk', 'user__pk', 2),
+            get_multivalued_path(Task, 'user__task__name'),
+        )
+        self.assertEqual(
+            MultivaluedPath('taskgroup', TaskGroup, 'tasks__pk', 'pk', 1),
+            get_multivalued_path(Task, 'taskgroup'),
+        )
+        self.assertIsNone(get_multivalued_path(Task, 'user__email'))
+        self.assertIsNone(get_multivalued_path(Task, 'name__contains'))
+
+    def test_use_exists_subqueries(self) -> None:
+        """Test the `use_exists_subqueries` function."""
+        query = TaskGroup.objects.all().query
+        q = use_exists_subqueries(
+            models.Q(name='a') & (models.Q(tasks__name='b') | models.Q(tasks__in=[1, 2])),
+            query,
+        )
+        self.assertEqual('a', dict([q.children[0]])['name'])
+        exists = q.children[1].children[0]
+        self.assertIsInstance(exists, models.Exists)
+        self.assertEqual(Task, exists.query.model)
+        q = models.Q(tasks__name='b') & models.Q(models.Q(tasks__user=1) | models.Q(name='a'))
+        self.assertEqual(q, use_exists_subqueries(q, query))
+        q = models.Q(tasks__name='b') & ~models.Q(tasks__user=1)
+        self.assertEqual(q, use_exists_subqueries(q, query))
+        sql = str(TaskGroup.objects.filter(
+            use_exists_subqueries(models.Q(tasks__isnull=True), query),
+        ).query)
+        self.assertIn('WHERE NOT EXISTS', sql)
+        self.assertNotIn('IS NULL', sql)
+        q = models.Q(tasks__name='b', tasks__completed_at__isnull=True)
+        self.assertEqual(q, use_exists_subqueries(q, query))
+
+    def test_has_multivalued_joins(self) -> None:
+        """Test the `has_multivalued_joins` function."""
+        self.assertTrue(has_multivalued_joins(TaskGroup.objects.filter(tasks__name='a').query))
+        self.assertTrue(has_multivalued_joins(User.objects.filter(task__name='a').query))
+        self.assertFalse(has_multivalued_joins(Task.objects.filter(user__email='a').query))
+
+    def test_filter_queryset(self) -> None:
+        """Test the `filter_queryset` method with EXISTS subqueries."""
+        data = {
+            'or': [
+                {'tasks': [1, 2, 6]},
+                {'priority__gte': 14},
+            ],
+        }
+        with override_settings(GRAPHENE_DJANGO_FILTER={'EXISTS_SUBQUERIES': False}):
+            qs = TaskGroupFilter(data=data, queryset=TaskGroup.objects.all()).qs
+            self.assertTrue(qs.query.distinct)
+            expected = list(qs.order_by('pk'))
+        qs = TaskGroupFilter(data=data, queryset=TaskGroup.objects.all()).qs
+        self.assertFalse(qs.query.distinct)
+        self.assertFalse(has_multivalued_joins(qs.query))
+        self.assertIn('EXISTS', str(qs.query))
+        self.assertEqual(4, len(expected))
+        self.assertEqual(expected, list(qs.order_by('pk')))
+
+    def test_isnull_filter_queryset(self) -> None:
+        """Test the `filter_queryset` method with `isnull` lookups of to-many relations."""
+        class TaskGroupNullFilter(AdvancedFilterSet):
+            class Meta:
+                model = TaskGroup
+                fields = {
+                    'name': ('exact',),
+                    'tasks': ('isnull',),
+                    'tasks__completed_at': ('isnull',),
+                }
+
+        TaskGroup.objects.create(name='empty')
+        for data in (
+            {'tasks__isnull': True},
+            {'tasks__isnull': False},
+            {'tasks__isnull': True, 'name': 'empty'},
+            {'tasks__completed_at__isnull': True},
+            {'tasks__completed_at__isnull': False},
+        ):
+            with self.subTest(data=data):
+                expected = list(
+                    TaskGroup.objects.filter(**data).distinct().order_by('pk').values_list(
+                        'name', flat=True,
+                    ),
+                )
+                qs = TaskGroupNullFilter(data=data, queryset=TaskGroup.objects.all()).qs
+                self.assertEqual(
+                    expected,
+                    list(qs.order_by('pk').values_list('name', flat=True)),
+                )
+        self.assertEqual(
+            ['empty'],
+            list(TaskGroupNullFilter(
+                data={'tasks__isnull': True},
+                queryset=TaskGroup.objects.all(),
+            ).qs.values_list('name', flat=True)),
+        )